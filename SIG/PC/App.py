@@ -1,34 +1,80 @@
+import time
+IMPORT_STARTED = time.perf_counter()    # начало отсчёта профиля запуска
+
+import importlib
+import os
+import threading
 import tkinter as tk
 from tkinter import ttk
 
-from frames.MainMenu import MainMenu
-from frames.StatSettings import StatSettings
-from frames.CycleSettings import CycleSettings
-from frames.ManualMode import ManualMode
-from frames.StatMode import StatMode
-from frames.CycleMode import CycleMode
-
 from utils.ModbusSlave import ModbusSlave
+from utils.ImageCache import ImageCache
+from utils.RegisterBank import RegisterBank
+from utils.RegisterMap import RegisterMap
+from utils.RegisterSampler import RegisterSampler
+from utils.SigCsvLogger import SigCsvLogger
+from utils.StartupProfiler import StartupProfiler
+from utils.TimeSeriesStore import TimeSeriesStore
+from utils.TrafficCapture import TrafficCapture
+from utils.UiDispatcher import UiDispatcher
 from utils.constants_for_regs import *
-import bidict
 from utils.math_functions import get_kgs
 
 
 
 class App(tk.Tk):
+    WIDGETS_UPD_MS = 200    # период обновления виджетов по изменённым регистрам
+    MODBUS_TCP_ENABLED = False      # Modbus TCP для SCADA и регистраторов - только если включён
+    MODBUS_TCP_HOST = "127.0.0.1"   # "0.0.0.0" - доступ из сети цеха (без аутентификации!)
+    MODBUS_TCP_PORT = 5020          # 502 в Linux требует прав root
+    MODBUS_TCP_READ_ONLY = True     # клиенты TCP только читают, запустить стенд не могут
+    TRAFFIC_CAPTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traffic.sigcap")
+    TRAFFIC_CAPTURE_MAX_BYTES = 32 * 2 ** 20    # файл захвата до 32 МБ, затем в архив .1 ... .3
+    WINDOW_SIZE = (800, 480)
+    SHARED_REGISTERS_NAME = "sig_registers"     # регистры для других процессов (RegisterBankReader)
+    HISTORY_SERIES = ("PRESSURE_MN1", "PRESSURE_MN2", "SPEED")     # поля RegisterMap в истории графиков
+    SAMPLE_RATE = 20            # частота сбора давлений и скорости, Гц (10-100; None - по каждой записи мастера)
+    PLOTS_UPD_MS = 500          # период перерисовки графиков
+    GRAPH_SPAN = 8 * (SAMPLE_RATE or 1)     # окно графика по умолчанию - 8 секунд
+    GRAPH_BACKEND = "matplotlib"    # отрисовка графиков: "matplotlib" или "tk" (Tk canvas, без matplotlib)
+    HISTORY_CAPACITY = 3600 * (SAMPLE_RATE or 10)   # точек истории в памяти (около часа), старые - в файл
+    HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history")  # вытесненная история, файл на запуск
+    HISTORY_FILE_FORMAT = "%d-%m-%Y_%H-%M-%S.bin"   # как у журналов давлений
+    PRESSURE_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")  # CSV SIG для SIG/Graph
+    PRESSURE_LOG_ROTATE_BYTES = 64 * 2 ** 20    # новый файл журнала после 64 МБ
+    PRESSURE_LOG_ROTATE_SECONDS = 24 * 3600     # или через сутки
+    GRAPH_CLASSES = {
+        "matplotlib": ("utils.PressureGraph", "PressureGraph"),
+        "tk": ("utils.CanvasPressureGraph", "CanvasPressureGraph"),
+    }
+    PRELOAD_GRAPHS = True       # импорт модуля графиков в фоне после первой отрисовки
+    MODE_BUTTON_REGS = {        # фрейм -> регистры кнопок "автомат Н3" и "режим"
+        "ManualMode": (START_AUTOMAT_N3_MANUAL_REG, START_MODE_MANUAL_REG),
+        "StatMode": (START_AUTOMAT_N3_STAT_REG, START_MODE_STAT_REG),
+        "CycleMode": (START_AUTOMAT_N3_CYCLE_REG, START_MODE_CYCLE_REG),
+    }
+    MODBUS_START_TIMEOUT = 5    # с, ожидание потока ModbusStart при закрытии
+    STARTUP_REPORT_TIMEOUT = 10     # с от запуска, после которых отчёт выводится без первого ответа Modbus
+
     def __init__(self):
+        # Этапы запуска: до первой отрисовки и до первого ответа мастеру Modbus
+        self.startup = StartupProfiler(IMPORT_STARTED)
+        self.startup.mark("импорт модулей")
+
         super().__init__()
         self.title("Управление режимами")
-        self.geometry("800x480")
+        self.geometry(f"{self.WINDOW_SIZE[0]}x{self.WINDOW_SIZE[1]}")
 
-        self.screen_numbers = bidict.bidict({
+        # Фрейм <-> номер экрана в CURRENT_FRAME_REG; фрейм - класс frames.<имя>.<имя>
+        self.screen_numbers = {
             "MainMenu": 3,
             "ManualMode": 4,
             "CycleMode": 5,
             "StatMode": 6,
             "StatSettings": 7,
             "CycleSettings": 8,
-        })
+        }
+        self.screen_names = {number: name for name, number in self.screen_numbers.items()}
 
         # Контейнер для всех фреймов
         self.container = tk.Frame(self)
@@ -38,6 +84,7 @@ class App(tk.Tk):
 
         self.after_id = None
         self.plots_upd_id = None
+        self.widgets_upd_id = None
 
         self.style = ttk.Style()
         self.style.theme_use('alt')
@@ -89,70 +136,211 @@ class App(tk.Tk):
         self.mn2_mpa_var.set(0.3)
         self.number_of_cycles_var = tk.IntVar()
         self.number_of_cycles_var.set(0)
+        self.startup.mark("окно Tk, стили")
 
-
+        # Фреймы строятся при первом показе (frame)
         self.frames = {}
 
-        self.slave = ModbusSlave(baudrate=38400, slave_id=2)
+        # Фоны и картинки фреймов: масштабируются один раз на размер
+        self.images = ImageCache()
 
-        self.slave.set_callback(self.slave.WRITE_MULTIPLE_REGISTERS, self.write_registers_callback)
-        self.slave.set_callback(self.slave.WRITE_SINGLE_REGISTER, self.write_registers_callback)
+        # Типы и ограничения регистров
+        self.register_map = RegisterMap(REGISTER_FIELDS)
 
-        # Создаем все экраны
-        for F in (MainMenu, StatSettings, CycleSettings, ManualMode, StatMode, CycleMode):
-            frame = F(self.container, self)
-            self.frames[F.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        # Графики режимов: модуль импортируется с первым фреймом режима (graph_class)
+        self._graph_class = None
 
-        self.show_frame("MainMenu")
-        
+        # Общая история для графиков всех режимов
+        self.history = TimeSeriesStore(self.HISTORY_SERIES, capacity=self.HISTORY_CAPACITY,
+                                       spill_path=os.path.join(self.HISTORY_DIR,
+                                                               time.strftime(self.HISTORY_FILE_FORMAT)))
+
+        # Обмен с ПР200 пишется в файл захвата, читать: python -m utils.TrafficCapture traffic.sigcap
+        self.capture = TrafficCapture(self.TRAFFIC_CAPTURE_FILE, verbosity=TrafficCapture.VERBOSITY_CAPTURE,
+                                      max_bytes=self.TRAFFIC_CAPTURE_MAX_BYTES)
         try:
-            self.slave.start()
-        except Exception as e:
-            print(e)
+            registers = RegisterBank(256, shared_name=self.SHARED_REGISTERS_NAME)
+        except OSError as e:
+            print(f"Не удалось создать разделяемую память регистров: {e}")
+            registers = RegisterBank(256)
+        self.slave = ModbusSlave(baudrate=38400, slave_id=2, rx_mode=ModbusSlave.RX_MODE_FRAME,
+                                 registers=registers, capture=self.capture)
+
+        # Сбор давлений и скорости с постоянной частотой или по каждой записи мастера
+        self.sampler = RegisterSampler(registers, self.register_map, self.HISTORY_SERIES, rate=self.SAMPLE_RATE)
+
+        # Журнал давлений: каждая точка сборщика, запись на диск в своём потоке
+        self.pressure_log = SigCsvLogger(self.PRESSURE_LOG_DIR, rotate_bytes=self.PRESSURE_LOG_ROTATE_BYTES,
+                                         rotate_seconds=self.PRESSURE_LOG_ROTATE_SECONDS)
+        self.sampler.subscribe(self.pressure_log.log)
+
+        # Колбэки слейва вызываются из потока Modbus - точка истории снимается
+        # сразу, остальное переносится в поток Tk
+        self.dispatcher = UiDispatcher(self)
+        registers_written = self.dispatcher.wrap(self.write_registers_callback)
+
+        def on_write(request):
+            if self.SAMPLE_RATE is None:
+                self.sampler.on_write(request)
+            registers_written(request)
+
+        for function_code in ModbusSlave.WRITE_FUNCTIONS:
+            self.slave.set_callback(function_code, on_write)
+
+        self.tcp_server = None
+        self.startup.mark("регистры, история, Modbus")
+
+        # Сначала только главное меню, остальные фреймы - при первом показе
+        self.show_frame("MainMenu")
+        self.startup.mark("главное меню")
+        self.dispatcher.start()
+        self.pressure_log.start()
+        self.sampler.start()
+
+        # Автоопределение порта занимает секунды - в своём потоке, окно его не ждёт
+        self.startup_reported = False
+        self.modbus_starter = threading.Thread(target=self._start_modbus, name="ModbusStart", daemon=True)
+        self.modbus_starter.start()
 
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self._center_window()
-        self.plots_upd_id = self.after(1000, self.plots_upd)
+        self.first_expose_id = self.bind("<Expose>", self._on_first_expose, add="+")
+        self.plots_upd_id = self.after(self.PLOTS_UPD_MS, self.plots_upd)
+        self.widgets_upd_id = self.after(self.WIDGETS_UPD_MS, self.widgets_upd)
+        self.startup.mark("центрирование окна")
+
+    def _start_modbus(self):
+        """Запуск Modbus TCP и RTU-слейва (в потоке ModbusStart)"""
+        self.startup.begin()
+
+        # Modbus TCP с тем же банком регистров; asyncio импортируется здесь, не в потоке Tk
+        if self.MODBUS_TCP_ENABLED:
+            from utils.ModbusTcpServer import ModbusTcpServer
+            tcp_server = ModbusTcpServer(self.slave, host=self.MODBUS_TCP_HOST, port=self.MODBUS_TCP_PORT,
+                                         read_only=self.MODBUS_TCP_READ_ONLY)
+            try:
+                tcp_server.start()
+                self.tcp_server = tcp_server
+            except Exception as e:
+                print(f"{e}. Modbus TCP отключён: проверьте MODBUS_TCP_HOST и MODBUS_TCP_PORT "
+                      f"(порты ниже 1024 в Linux - только с правами root)")
+            self.startup.mark("Modbus TCP")
 
+        try:
+            self.slave.start()
+        except Exception as e:
+            print(e)
+        self.startup.mark("автоопределение порта")
+
+    def _on_first_expose(self, event):
+        # Перерисовка виджетов уже поставлена в очередь idle - веха после неё
+        self.unbind("<Expose>", self.first_expose_id)
+        self.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.startup.milestone("первая отрисовка")
+        if self.PRELOAD_GRAPHS:
+            # Модуль графиков (для matplotlib - секунда на панельном ПК) готов
+            # к первому открытию режима; сами фреймы строятся при показе
+            module = self.GRAPH_CLASSES[self.GRAPH_BACKEND][0]
+            threading.Thread(target=importlib.import_module, args=(module,), name="GraphPreload",
+                             daemon=True).start()
+
+    def _report_startup(self):
+        """Вывод профиля запуска, когда известны первая отрисовка и первый ответ Modbus"""
+        if (self.startup_reported or self.modbus_starter.is_alive()
+                or "первая отрисовка" not in self.startup.milestones):
+            return
+        if self.slave.first_response_at is not None:
+            self.startup.milestone("первый ответ Modbus", self.slave.first_response_at)
+        elif self.slave.running and time.perf_counter() - self.startup.origin < self.STARTUP_REPORT_TIMEOUT:
+            return
+        self.startup_reported = True
+        print(self.startup.report())
+
+    @property
+    def graph_class(self):
+        """Класс графиков режимов; его модуль импортируется при первом обращении"""
+        if self._graph_class is None:
+            module, class_name = self.GRAPH_CLASSES[self.GRAPH_BACKEND]
+            self._graph_class = getattr(importlib.import_module(module), class_name)
+        return self._graph_class
+
+    def frame(self, name):
+        """Фрейм по имени, при первом обращении строится"""
+        frame = self.frames.get(name)
+        if frame is None:
+            frame_class = getattr(importlib.import_module(f"frames.{name}"), name)
+            frame = frame_class(self.container, self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[name] = frame
+            # Записи мастера до постройки фрейма не потеряны - кнопки по текущим регистрам
+            if name in self.MODE_BUTTON_REGS:
+                frame.update_button_state_by_register(*self.MODE_BUTTON_REGS[name])
+        return frame
+
+    def widgets_upd(self):
+        # Обновляются только виджеты видимого фрейма, чьи регистры изменились
+        dirty = self.slave.registers.take_dirty()
+        self.current_frame.refresh_changed(dirty)
+        self._report_startup()
+        self.widgets_upd_id = self.after(self.WIDGETS_UPD_MS, self.widgets_upd)
 
     def plots_upd(self):
-        pressure = self.frames["ManualMode"].get_float_from_registers(PRESSURE_MN1)
-
-        self.frames["ManualMode"].pressure_graph.update_data(pressure)
-        self.frames["StatMode"].pressure_graph.update_data(pressure)
-        self.frames["CycleMode"].pressure_graph.update_data(pressure)
+        # Точки сборщика переносятся в общую историю пачкой,
+        # графики режимов обновляются по подписке один раз
+        self.sampler.drain(self.history)
         # UPD
-        self.plots_upd_id = self.after(1000, self.plots_upd)
+        self.plots_upd_id = self.after(self.PLOTS_UPD_MS, self.plots_upd)
 
 
     def on_close(self):
+        self.dispatcher.stop()
+        self.sampler.stop()
+        self.pressure_log.stop()
+        for after_id in (self.plots_upd_id, self.widgets_upd_id):
+            if after_id:
+                self.after_cancel(after_id)
         for frame in self.frames.values():
             frame.event_generate("<<HideFrame>>")
 
+        # Порт ещё может определяться: stop() прерывает автоопределение, и ModbusStart
+        # закрывает найденный порт сам, не запуская поток слейва
         try:
             self.slave.stop()
         except Exception as e:
             print(e)
+        self.modbus_starter.join(self.MODBUS_START_TIMEOUT)
 
-        self.frames["ManualMode"].pressure_graph.cleanup() if hasattr(self.frames["ManualMode"],
-                                                                      'pressure_graph') else None
-        self.frames["StatMode"].pressure_graph.cleanup() if hasattr(self.frames["StatMode"],
-                                                                    'pressure_graph') else None
-        self.frames["CycleMode"].pressure_graph.cleanup() if hasattr(self.frames["CycleMode"],
-                                                                     'pressure_graph') else None
+        if self.tcp_server is not None:
+            try:
+                self.tcp_server.stop()
+            except Exception as e:
+                print(e)
+
+        try:
+            self.slave.registers.close()
+        except Exception as e:
+            print(e)
+        self.history.close()
+        self.images.close()
+
+        # Графики есть только у построенных фреймов режимов
+        for frame in self.frames.values():
+            if hasattr(frame, 'pressure_graph'):
+                frame.pressure_graph.cleanup()
         self.destroy()
 
     def write_registers_callback(self, request):
         # Обновление экрана
-        if self.slave.data_store["holding_registers"][CURRENT_FRAME_REG] != self.screen_numbers[self.current_frame.__class__.__name__]:
-            self.show_frame(self.screen_numbers.inverse[self.slave.data_store["holding_registers"][CURRENT_FRAME_REG]])
+        if self.slave.registers[CURRENT_FRAME_REG] != self.screen_numbers[self.current_frame.__class__.__name__]:
+            self.show_frame(self.screen_names[self.slave.registers[CURRENT_FRAME_REG]])
             
-        # Обновление состояния кнопок
-        self.frames["ManualMode"].update_button_state_by_register(START_AUTOMAT_N3_MANUAL_REG, START_MODE_MANUAL_REG)
-        self.frames["StatMode"].update_button_state_by_register(START_AUTOMAT_N3_STAT_REG, START_MODE_STAT_REG)
-        self.frames["CycleMode"].update_button_state_by_register(START_AUTOMAT_N3_CYCLE_REG, START_MODE_CYCLE_REG)
+        # Обновление состояния кнопок (ещё не построенные фреймы возьмут его из регистров)
+        for name, registers in self.MODE_BUTTON_REGS.items():
+            if name in self.frames:
+                self.frames[name].update_button_state_by_register(*registers)
 
     def show_frame(self, cont):
         """Показ фрейма с обработкой переключения"""
@@ -160,11 +348,12 @@ class App(tk.Tk):
         if self.current_frame:
             self.current_frame.event_generate("<<HideFrame>>")
 
-        # Получаем новый фрейм
-        frame = self.frames[cont]
+        # Получаем новый фрейм (при первом показе он строится)
+        frame = self.frame(cont)
 
         # Уведомляем новый фрейм о показе
         frame.event_generate("<<ShowFrame>>")
+        frame.update_widgets()
         frame.tkraise()
 
         # Обновляем текущий фрейм
@@ -0,0 +1,98 @@
+"""
+Масштабирование фонов фреймов HMI: при запуске и при переключении фреймов.
+
+Шесть фонов imgs/*.png (1002x602) под окно 800x480. Моделируется
+обработчик <Configure> фрейма:
+- было: на каждое событие копия исходного PNG и thumbnail LANCZOS;
+- стало: ImageCache - фоновое масштабирование, запущенное из
+  set_background, готовое изображение из кэша и пропуск событий, если
+  размер не изменился.
+
+Запуск: каждый фрейм открывает фон, затем получает STARTUP_EVENTS событий
+<Configure> одного размера. Пока строятся остальные фреймы, в HMI идёт
+работа потока Tk - здесь она моделируется паузой FRAME_BUILD на фрейм.
+Переключение: событие <Configure> того же размера на tkraise.
+
+В замер не входит создание PhotoImage (нужен Tk с дисплеем) - раньше оно
+тоже выполнялось на каждое событие, теперь один раз на фон и размер.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_backgrounds
+"""
+import glob
+import os
+import time
+
+from PIL import Image
+
+from utils.ImageCache import ImageCache
+
+SIZE = (800, 480)
+STARTUP_EVENTS = 3
+FRAME_BUILD = 0.03      # с, построение виджетов одного фрейма
+SWITCHES = 50
+
+
+def before(paths):
+    """Прежний BaseFrame: thumbnail на каждое событие"""
+    def configure(raw):
+        image = raw.copy()
+        image.thumbnail(SIZE, Image.Resampling.LANCZOS)
+        return image
+
+    start = time.perf_counter()
+    raws = []
+    for path in paths:
+        raws.append(Image.open(path))
+        time.sleep(FRAME_BUILD)
+    for raw in raws:
+        for _ in range(STARTUP_EVENTS):
+            configure(raw)
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(SWITCHES):
+        configure(raws[i % len(raws)])
+    return startup, (time.perf_counter() - start) / SWITCHES
+
+
+def after(paths):
+    """BaseFrame с ImageCache: фоновое масштабирование и пропуск того же размера"""
+    cache = ImageCache()
+    sizes = {}
+
+    def configure(path):
+        if sizes.get(path) == SIZE:
+            return
+        cache.image(path, SIZE)
+        sizes[path] = SIZE
+
+    start = time.perf_counter()
+    for path in paths:
+        cache.prefetch(path, SIZE)
+        time.sleep(FRAME_BUILD)
+    for path in paths:
+        for _ in range(STARTUP_EVENTS):
+            configure(path)
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(SWITCHES):
+        configure(paths[i % len(paths)])
+    switch = (time.perf_counter() - start) / SWITCHES
+    cache.close()
+    return startup, switch
+
+
+def main():
+    paths = sorted(glob.glob(os.path.join("imgs", "*.png")))
+    print(f"фонов: {len(paths)}, окно {SIZE[0]}x{SIZE[1]}, событий при запуске на фрейм: {STARTUP_EVENTS}, "
+          f"построение фрейма {FRAME_BUILD * 1e3:.0f} мс")
+    print(f"{'':<20}{'запуск, мс':>12}{'переключение, мс':>18}")
+    for name, func in (("thumbnail на событие", before), ("ImageCache", after)):
+        startup, switch = func(paths)
+        print(f"{name:<20}{startup * 1e3:>12.0f}{switch * 1e3:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Бенчмарк времени шины на полный цикл обновления HMI при 38400 бод.
+
+Классический цикл ПР200 (как в bench_read_cache): три чтения 0x03 и запись
+давлений 0x10. Новый цикл: одна транзакция 0x17 пишет давления и читает
+все регистры 1-33. Отдельно сравнивается изменение одного бита флага
+без затирания остальных: чтение 0x03 + запись 0x06 против одной 0x16.
+
+Время транзакции: байты запроса и ответа по времени символа 8E1,
+пауза 3.5 символа (1.75 мс) после каждого кадра и измеренное время
+обработки запроса слейвом.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_bus_cycle
+"""
+import struct
+import timeit
+
+from utils.ModbusSlave import ModbusSlave
+from utils.constants_for_regs import *
+
+from benchmarks.bench_read_cache import frame, read_request, write_request
+
+
+def read_write_request(slave, read_address, read_quantity, write_address, values):
+    payload = struct.pack(f">{len(values)}H", *values)
+    header = struct.pack(">BBHHHHB", slave.slave_id, 0x17, read_address, read_quantity,
+                         write_address, len(values), len(payload))
+    return frame(slave, header + payload)
+
+
+def mask_write_request(slave, address, and_mask, or_mask):
+    return frame(slave, struct.pack(">BBHHH", slave.slave_id, 0x16, address, and_mask, or_mask))
+
+
+def transaction_time(slave, request, number=5000):
+    """Время транзакции на шине, с: передача запроса и ответа, паузы, обработка"""
+    response = bytes(slave._process_request(request))
+    handling = min(timeit.repeat(lambda: slave._process_request(request), number=number, repeat=5)) / number
+    wire = (len(request) + len(response)) * slave.char_time + 2 * slave.frame_silence
+    return wire + handling, len(request) + len(response)
+
+
+def cycle_time(slave, requests):
+    total = 0.0
+    total_bytes = 0
+    for request in requests:
+        elapsed, size = transaction_time(slave, request)
+        total += elapsed
+        total_bytes += size
+    return total, total_bytes
+
+
+def main():
+    slave = ModbusSlave(baudrate=38400, slave_id=2)
+    pressures = [0, 0x4120, 0, 0x4100, 0, 0x4040]
+
+    cycles = {
+        "0x03 x3 + 0x10": [
+            read_request(slave, CURRENT_FRAME_REG, START_MODE_CYCLE_REG),
+            read_request(slave, FREQ_MANUAL, CYCLES_NEED_CYCLE - FREQ_MANUAL + 1),
+            write_request(slave, PRESSURE_MN1, pressures),
+            read_request(slave, NUMBER_OF_CYCLES, WORK - NUMBER_OF_CYCLES + 1),
+        ],
+        "0x17": [
+            read_write_request(slave, CURRENT_FRAME_REG, CYCLES_NEED_CYCLE, PRESSURE_MN1, pressures),
+        ],
+        "бит: 0x03 + 0x06": [
+            read_request(slave, WARNING_SCREENS, 1),
+            frame(slave, struct.pack(">BBHH", slave.slave_id, 0x06, WARNING_SCREENS, 0x0004)),
+        ],
+        "бит: 0x16": [
+            mask_write_request(slave, WARNING_SCREENS, 0xFFFB, 0x0004),
+        ],
+    }
+
+    print(f"{'цикл':<20}{'транзакций':>12}{'байт':>8}{'мс на шине':>12}{'циклов/с':>10}")
+    for name, requests in cycles.items():
+        elapsed, size = cycle_time(slave, requests)
+        print(f"{name:<20}{len(requests):>12}{size:>8}{elapsed * 1e3:>12.2f}{1 / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
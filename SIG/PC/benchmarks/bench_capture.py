@@ -0,0 +1,57 @@
+"""
+Стоимость журналирования обмена на горячем пути ModbusSlave._handle_request.
+
+Сравниваются уровни подробности TrafficCapture: вывод каждого кадра
+в консоль (как раньше), запись в кольцевой буфер и отключённый захват.
+Вывод в консоль перенаправляется в файл, поэтому реальная консоль
+(особенно Windows) будет медленнее показанного.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_capture
+"""
+import contextlib
+import os
+import tempfile
+import timeit
+
+from utils.ModbusSlave import ModbusSlave
+from utils.TrafficCapture import TrafficCapture, read_capture
+
+
+class NullSerial:
+    def write(self, data):
+        return len(data)
+
+
+def main(number=20000):
+    path = os.path.join(tempfile.mkdtemp(), "bench.sigcap")
+    levels = {
+        "print": TrafficCapture.VERBOSITY_PRINT,
+        "capture": TrafficCapture.VERBOSITY_CAPTURE,
+        "off": TrafficCapture.VERBOSITY_OFF,
+    }
+
+    print(f"{'уровень':<10}{'мкс/запрос':>12}")
+    captured = None
+    for name, verbosity in levels.items():
+        capture = TrafficCapture(path if verbosity == TrafficCapture.VERBOSITY_CAPTURE else None, verbosity)
+        slave = ModbusSlave(slave_id=2, capture=capture, read_cache_size=0)
+        slave.serial = NullSerial()
+        request = bytearray([2, 3, 0, 1, 0, 7])
+        request += slave._calculate_crc(request)
+        request = bytes(request)
+
+        capture.start()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            elapsed = min(timeit.repeat(lambda: slave._handle_request(request), number=number, repeat=3)) / number
+        capture.stop()
+        if verbosity == TrafficCapture.VERBOSITY_CAPTURE:
+            captured = capture
+        print(f"{name:<10}{elapsed * 1e6:>12.2f}")
+
+    records = sum(1 for _ in read_capture(path))
+    print(f"записей в файле захвата: {records}, потеряно при переполнении кольца: {captured.lost}")
+
+
+if __name__ == "__main__":
+    main()
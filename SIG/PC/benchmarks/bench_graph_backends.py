@@ -0,0 +1,103 @@
+"""
+Графики давления на matplotlib (PressureGraph) и на Tk canvas (CanvasPressureGraph).
+
+Каждый вариант запускается отдельным интерпретатором, как HMI:
+- запуск: импорт модуля графика, окно Tk и три графика на своих фреймах
+  (как ManualMode, StatMode и CycleMode) до первой отрисовки;
+- память: RSS процесса после запуска (resource, Linux/macOS);
+- обновление: точка в общей истории и перерисовка всех трёх графиков
+  с выводом на экран (update_idletasks), среднее и p99.
+Строка "без графиков" - окно Tk с тремя пустыми фреймами, для отсчёта.
+
+Нужен дисплей (на панельном ПК или с X-сервером).
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_graph_backends
+"""
+import json
+import subprocess
+import sys
+import time
+
+BACKENDS = {
+    "без графиков": None,
+    "matplotlib": ("utils.PressureGraph", "PressureGraph"),
+    "tk canvas": ("utils.CanvasPressureGraph", "CanvasPressureGraph"),
+}
+GRAPHS = 3
+TICKS = 200
+
+
+def rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / 2 ** 20 if sys.platform == "darwin" else usage / 2 ** 10
+
+
+def child(name):
+    import importlib
+    import tkinter as tk
+
+    start = time.perf_counter()
+    root = tk.Tk()
+    root.geometry("800x480")
+    frames = []
+    for _ in range(GRAPHS):
+        frame = tk.Frame(root, width=800, height=480)
+        frame.place(x=0, y=0)
+        frames.append(frame)
+
+    graphs = []
+    store = None
+    if BACKENDS[name] is not None:
+        from utils.TimeSeriesStore import TimeSeriesStore
+
+        module, class_name = BACKENDS[name]
+        graph_class = getattr(importlib.import_module(module), class_name)
+        store = TimeSeriesStore(("pressure",))
+        for frame in frames:
+            graph = graph_class(frame, store=store)
+            graph.visible = True
+            graphs.append(graph)
+        store.append({"pressure": 0.0})
+    root.update()
+    startup = time.perf_counter() - start
+    rss = rss_mb()
+
+    times = []
+    if store is not None:
+        for i in range(TICKS):
+            tick = time.perf_counter()
+            store.append({"pressure": 20 + (i % 10)})
+            root.update_idletasks()
+            times.append(time.perf_counter() - tick)
+    times.sort()
+    mean = sum(times) / len(times) if times else float("nan")
+    p99 = times[int(len(times) * 0.99)] if times else float("nan")
+
+    for graph in graphs:
+        graph.cleanup()
+    root.destroy()
+    print(json.dumps([startup, rss, mean, p99]))
+
+
+def main():
+    print(f"{'графики':<14}{'запуск, мс':>12}{'RSS, МБ':>10}{'обновление, мс':>16}{'p99, мс':>10}")
+    for name in BACKENDS:
+        result = subprocess.run([sys.executable, "-m", "benchmarks.bench_graph_backends", "--child", name],
+                                capture_output=True, text=True)
+        if result.returncode:
+            print(f"{name:<14}ошибка: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        startup, rss, mean, p99 = json.loads(result.stdout)
+        print(f"{name:<14}{startup * 1e3:>12.0f}{rss:>10.1f}{mean * 1e3:>16.2f}{p99 * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child(sys.argv[sys.argv.index("--child") + 1])
+    else:
+        main()
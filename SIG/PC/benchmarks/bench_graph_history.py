@@ -0,0 +1,65 @@
+"""
+Память и время добавления точки в историю трёх графиков режимов.
+
+Сравниваются:
+- свои данные: у каждого из трёх PressureGraph своё хранилище, точка
+  добавляется трижды (как было в App.plots_upd);
+- общее хранилище: один TimeSeriesStore с рядами МН1, МН2 и скорости,
+  три графика показывают ряд МН1.
+
+Графики скрыты (visible=False), поэтому замеряется только накопление
+истории, без отрисовки. Память - буферы хранилищ. Сутки опроса раз
+в секунду - 86400 точек.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_graph_history
+"""
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from utils.PressureGraph import PressureGraph
+from utils.TimeSeriesStore import TimeSeriesStore
+
+POINTS = 86400
+VIEWS = 3
+SERIES = ("PRESSURE_MN1", "PRESSURE_MN2", "SPEED")
+
+
+def run(shared):
+    store = TimeSeriesStore(SERIES) if shared else None
+    graphs = [PressureGraph(None, store=store, series="PRESSURE_MN1") for _ in range(VIEWS)]
+    for graph in graphs:
+        graph.visible = False
+    start_time = 1_767_225_600 * 10 ** 9   # 2026-01-01, нс
+
+    start = time.perf_counter()
+    for i in range(POINTS):
+        timestamp = start_time + i * 10 ** 9
+        pressure = 20.0 + (i % 100) * 0.1
+        if shared:
+            store.append({"PRESSURE_MN1": pressure, "PRESSURE_MN2": pressure, "SPEED": 0.5}, timestamp)
+        else:
+            for graph in graphs:
+                graph.store.append({graph.series: pressure}, timestamp)
+    elapsed = time.perf_counter() - start
+    stores = {id(graph.store): graph.store for graph in graphs}.values()
+    memory = sum(store.times.nbytes + sum(data.nbytes for data in store.series.values()) for store in stores)
+
+    for graph in graphs:
+        graph.cleanup()
+    return elapsed / POINTS, memory
+
+
+def main():
+    print(f"точек: {POINTS}, графиков: {VIEWS}")
+    print(f"{'история':<20}{'рядов':>7}{'мкс/точка':>11}{'память, МБ':>12}")
+    for name, shared, series in (("свои данные", False, 1), ("общее хранилище", True, len(SERIES))):
+        per_point, memory = run(shared)
+        print(f"{name:<20}{series:>7}{per_point * 1e6:>11.2f}{memory / 2 ** 20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
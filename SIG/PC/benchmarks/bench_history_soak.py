@@ -0,0 +1,101 @@
+"""
+Память истории графиков на многосуточном циклическом испытании.
+
+Моделируется 72 часа опроса раз в секунду (3 ряда: МН1, МН2, скорость):
+- списки: как было в PressureGraph - datetime и значение в списках
+  Python без ограничения;
+- кольцо: TimeSeriesStore на сутки точек, вытесняемые точки пишутся
+  в файл.
+
+Каждые 12 часов модельного времени выводятся занятая память
+(tracemalloc, вместе с самим хранилищем), время добавления точки и
+выборки последних 8 и 3600 точек окна (для списков - с подписями
+времени, как рисовал график). В конце проверяется, что в файле вся
+история.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_history_soak
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from utils.TimeSeriesStore import TimeSeriesStore
+
+HOURS = 72
+RATE = 1    # точек в секунду
+REPORT_HOURS = 12
+SERIES = ("PRESSURE_MN1", "PRESSURE_MN2", "SPEED")
+START = datetime(2026, 1, 1)
+
+
+class ListHistory:
+    """Прежнее хранение: неограниченные списки datetime и значений"""
+
+    def __init__(self):
+        self.times = []
+        self.series = {name: [] for name in SERIES}
+
+    def append(self, values, timestamp):
+        self.times.append(timestamp)
+        for name, data in self.series.items():
+            data.append(values[name])
+
+    def window(self, name, start, end):
+        return [t.strftime("%H:%M:%S") for t in self.times[start:end]], self.series[name][start:end]
+
+    def __len__(self):
+        return len(self.times)
+
+
+def window_time(history, size, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        history.window("PRESSURE_MN1", len(history) - size, len(history))
+    return (time.perf_counter() - start) / repeat
+
+
+def soak(name, factory, timestamp):
+    print(name)
+    print(f"{'часы':>6}{'точек':>10}{'память, МБ':>12}{'мкс/точка':>11}{'окно 8, мкс':>13}{'окно 3600, мкс':>16}")
+    tracemalloc.start()
+    history = factory()
+    report = REPORT_HOURS * 3600 * RATE
+    start = time.perf_counter()
+    for i in range(HOURS * 3600 * RATE):
+        pressure = 20.0 + (i % 600) * 0.05
+        history.append({"PRESSURE_MN1": pressure, "PRESSURE_MN2": pressure - 0.1, "SPEED": 0.5}, timestamp(i))
+        if (i + 1) % report == 0:
+            per_point = (time.perf_counter() - start) / report
+            memory = tracemalloc.get_traced_memory()[0]
+            print(f"{(i + 1) // (3600 * RATE):>6}{len(history):>10}{memory / 2 ** 20:>12.1f}{per_point * 1e6:>11.2f}"
+                  f"{window_time(history, 8) * 1e6:>13.1f}{window_time(history, 3600) * 1e6:>16.1f}")
+            start = time.perf_counter()
+    tracemalloc.stop()
+    return history
+
+
+def main():
+    soak("списки", ListHistory, lambda i: START + timedelta(seconds=i / RATE))
+
+    start_ns = int(START.timestamp()) * 10 ** 9
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.bin")
+        capacity = 24 * 3600 * RATE
+        store = soak(f"кольцо на {capacity} точек + файл",
+                     lambda: TimeSeriesStore(SERIES, capacity=capacity, spill_path=path),
+                     lambda i: start_ns + i * 10 ** 9 // RATE)
+
+        store.close()
+        spilled = store.read_spill()
+        assert len(spilled) == store.count
+        assert np.all(np.diff(spilled["time"]) == 10 ** 9 // RATE)
+        print(f"в файле {len(spilled)} точек, {os.path.getsize(store.spill_path) / 2 ** 20:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
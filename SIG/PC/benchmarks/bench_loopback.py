@@ -0,0 +1,246 @@
+"""
+Стенд без ПР200: ModbusSlave на одном конце псевдотерминала, нагрузочный
+мастер на другом.
+
+Мастер работает в дочернем процессе и отправляет запросы из заданной
+смеси функций с заданной частотой и размером пачки, при необходимости
+добавляя шум на линии (случайные байты перед запросом) и запросы с
+испорченным CRC. После каждого запроса мастер ждёт ответ (RTU -
+полудуплекс), поэтому пачка - это запросы подряд без паузы между ними.
+
+Выводятся: запросы в секунду, задержки ответа p50/p90/p99/max, запросы
+без ответа (кроме запросов с испорченным CRC), ответы сразу после шума
+или ошибки CRC (слейв восстановил приём), счётчики приёмника слейва и
+загрузка процессора процессом слейва.
+
+Только для Linux/macOS (pty), порт 8N1. Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_loopback
+    python -m benchmarks.bench_loopback --mix 03:4,10:1,17:1 --rate 200 --burst 4 --noise 0.05 --crc-errors 0.05
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import struct
+import threading
+import time
+
+import serial
+
+from benchmarks.bench_port_detect import open_ptys
+from utils.ModbusSlave import ModbusSlave
+from utils.constants_for_regs import *
+
+SLAVE_ID = 2
+BAUDRATE = 38400
+
+
+def build_requests(slave):
+    """Запросы смеси: имя -> (кадр, ожидаемая длина ответа)"""
+    def frame(data):
+        data = bytearray(data)
+        data += slave._calculate_crc(data)
+        return bytes(data)
+
+    pressures = struct.pack(">6H", 0, 0x4120, 0, 0x4100, 0, 0x4040)
+    return {
+        "03": (frame(struct.pack(">BBHH", SLAVE_ID, 0x03, CURRENT_FRAME_REG, 7)), 5 + 7 * 2),
+        "03x33": (frame(struct.pack(">BBHH", SLAVE_ID, 0x03, CURRENT_FRAME_REG, 33)), 5 + 33 * 2),
+        "04": (frame(struct.pack(">BBHH", SLAVE_ID, 0x04, PRESSURE_MN1, 6)), 5 + 6 * 2),
+        "06": (frame(struct.pack(">BBHH", SLAVE_ID, 0x06, WARNING_SCREENS, 4)), 8),
+        "10": (frame(struct.pack(">BBHHB", SLAVE_ID, 0x10, PRESSURE_MN1, 6, 12) + pressures), 8),
+        "16": (frame(struct.pack(">BBHHH", SLAVE_ID, 0x16, WARNING_SCREENS, 0xFFFB, 0x0004)), 10),
+        "17": (frame(struct.pack(">BBHHHHB", SLAVE_ID, 0x17, CURRENT_FRAME_REG, 33, PRESSURE_MN1, 6, 12)
+                     + pressures), 5 + 33 * 2),
+    }
+
+
+def parse_mix(mix):
+    """"03:4,10:1" -> {"03": 4, "10": 1}"""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition(":")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def read_response(fd, expected, timeout):
+    """Чтение ответа: ожидаемая длина или 5 байт исключения. None - нет ответа"""
+    response = bytearray()
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            response += os.read(fd, 256)
+        except BlockingIOError:
+            time.sleep(0.0002)
+            continue
+        if len(response) >= 2 and response[1] & 0x80 and len(response) >= 5:
+            return bytes(response)
+        if len(response) >= expected:
+            return bytes(response)
+    return None
+
+
+def master(fd, options, results):
+    """Нагрузочный мастер (дочерний процесс)"""
+    rng = random.Random(options["seed"])
+    requests = build_requests(ModbusSlave(slave_id=SLAVE_ID))
+    weights = parse_mix(options["mix"])
+    names = list(weights)
+    period = options["burst"] / options["rate"] if options["rate"] else 0.0
+
+    os.set_blocking(fd, False)
+    latencies = []
+    stats = {"sent": 0, "answered": 0, "missed": 0, "corrupted": 0, "noise": 0, "recovered": 0}
+    after_error = False
+
+    start = time.perf_counter()
+    end = start + options["duration"]
+    next_burst = start
+    while time.perf_counter() < end:
+        for _ in range(options["burst"]):
+            request, expected = requests[rng.choices(names, [weights[name] for name in names])[0]]
+
+            if rng.random() < options["noise"]:
+                os.write(fd, bytes(rng.randrange(256) for _ in range(rng.randint(1, 8))))
+                stats["noise"] += 1
+                after_error = True
+                time.sleep(options["noise_gap"])
+
+            corrupt = rng.random() < options["crc_errors"]
+            if corrupt:
+                request = request[:-1] + bytes([request[-1] ^ 0x01])
+                stats["corrupted"] += 1
+
+            sent = time.perf_counter()
+            os.write(fd, request)
+            stats["sent"] += 1
+            response = read_response(fd, expected, options["timeout"])
+
+            if corrupt:
+                # Ответа нет; следующий кадр - после паузы, как у настоящего мастера
+                after_error = True
+                continue
+            if response is None:
+                stats["missed"] += 1
+                continue
+
+            latencies.append(time.perf_counter() - sent)
+            stats["answered"] += 1
+            if after_error:
+                stats["recovered"] += 1
+                after_error = False
+
+        if period:
+            next_burst += period
+            time.sleep(max(next_burst - time.perf_counter(), 0))
+
+    stats["elapsed"] = time.perf_counter() - start
+    latencies.sort()
+    stats["latencies"] = latencies
+    results.put(stats)
+
+
+def attach_slave(name, rx_mode):
+    """ModbusSlave на конце псевдотерминала без автоопределения порта"""
+    slave = ModbusSlave(baudrate=BAUDRATE, parity="N", slave_id=SLAVE_ID, rx_mode=rx_mode)
+    slave.serial = serial.Serial(name, baudrate=BAUDRATE, parity="N", timeout=1)
+    slave.port = name
+    slave.running = True
+    loop = slave._rtu_frame_loop if rx_mode == ModbusSlave.RX_MODE_FRAME else slave._rtu_loop
+    slave.thread = threading.Thread(target=loop, daemon=True)
+    slave.thread.start()
+    return slave
+
+
+def run_loopback(rx_mode=ModbusSlave.RX_MODE_FRAME, mix="03:4,10:1", rate=0, burst=1, noise=0.0,
+                 noise_gap=0.025, crc_errors=0.0, duration=3.0, timeout=0.05, seed=1):
+    """
+    Прогон нагрузки через псевдотерминал
+
+    :param rx_mode: режим приёма слейва
+    :param mix: смесь запросов "имя:вес,..." (имена из build_requests)
+    :param rate: запросов в секунду (0 - без ограничения)
+    :param burst: запросов в пачке
+    :param noise: вероятность шума перед запросом
+    :param noise_gap: пауза после шума, с
+    :param crc_errors: вероятность испорченного CRC запроса
+    :param duration: длительность, с
+    :param timeout: ожидание ответа, с
+    :return: словарь статистики
+    """
+    (fd, name), = open_ptys(1)
+    slave = attach_slave(name, rx_mode)
+    time.sleep(0.1)
+
+    options = dict(mix=mix, rate=rate, burst=burst, noise=noise, noise_gap=noise_gap,
+                   crc_errors=crc_errors, duration=duration, timeout=timeout, seed=seed)
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=master, args=(fd, options, results))
+
+    cpu = time.process_time()
+    process.start()
+    stats = results.get()
+    process.join()
+    stats["cpu"] = time.process_time() - cpu
+
+    slave.running = False
+    slave.thread.join()
+    slave.serial.close()
+    os.close(fd)
+
+    receiver = slave.receiver
+    stats["slave_crc_errors"] = receiver.crc_errors if receiver else None
+    stats["slave_dropped"] = receiver.dropped if receiver else None
+    stats["slave_recovered"] = receiver.recovered if receiver else None
+    stats["slave_lost"] = receiver.lost if receiver else None
+    return stats
+
+
+def percentile(values, fraction):
+    if not values:
+        return float("nan")
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def report(stats):
+    latencies = stats["latencies"]
+    print(f"запросов: {stats['sent']}, ответов: {stats['answered']}, "
+          f"{stats['answered'] / stats['elapsed']:.0f} запр/с")
+    print("задержка, мс: " + ", ".join(
+        f"p{int(fraction * 100)} {percentile(latencies, fraction) * 1e3:.2f}" for fraction in (0.5, 0.9, 0.99)
+    ) + f", max {(latencies[-1] if latencies else float('nan')) * 1e3:.2f}")
+    print(f"без ответа: {stats['missed']}, шум: {stats['noise']}, испорчен CRC: {stats['corrupted']}, "
+          f"восстановлений приёма: {stats['recovered']}")
+    if stats["slave_crc_errors"] is not None:
+        print(f"приёмник слейва: ошибок CRC {stats['slave_crc_errors']}, "
+              f"сброшено незавершённых кадров {stats['slave_dropped']}, "
+              f"найдено после помех {stats['slave_recovered']}, потеряно {stats['slave_lost']}")
+    print(f"процессор слейва: {stats['cpu'] / stats['elapsed'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rx-mode", default=ModbusSlave.RX_MODE_FRAME,
+                        choices=[ModbusSlave.RX_MODE_FRAME, ModbusSlave.RX_MODE_BYTE])
+    parser.add_argument("--mix", default="03:4,10:1", help="смесь запросов, например 03:4,10:1,17:1")
+    parser.add_argument("--rate", type=float, default=0, help="запросов в секунду (0 - без ограничения)")
+    parser.add_argument("--burst", type=int, default=1, help="запросов в пачке")
+    parser.add_argument("--noise", type=float, default=0.0, help="вероятность шума перед запросом")
+    parser.add_argument("--noise-gap", type=float, default=0.025, help="пауза после шума, с")
+    parser.add_argument("--crc-errors", type=float, default=0.0, help="вероятность испорченного CRC")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--timeout", type=float, default=0.05, help="ожидание ответа, с")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    report(run_loopback(
+        rx_mode=args.rx_mode, mix=args.mix, rate=args.rate, burst=args.burst, noise=args.noise,
+        noise_gap=args.noise_gap, crc_errors=args.crc_errors, duration=args.duration,
+        timeout=args.timeout, seed=args.seed,
+    ))
+
+
+if __name__ == "__main__":
+    main()
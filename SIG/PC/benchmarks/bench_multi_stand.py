@@ -0,0 +1,147 @@
+"""
+Загрузка процессора на один стенд при росте числа стендов.
+
+Каждый стенд опрашивается мастером со скоростью RATE запросов в секунду
+(чтение 7 регистров 0x03, как ПР200 при 38400 бод). Сравниваются:
+- "потоки": по ModbusSlave с собственным потоком на каждый порт;
+- "хост": ModbusHost, все порты в одном потоке;
+- "хост, 1 линия": ModbusHost, все стенды адресами на одном порту.
+
+Мастера работают в дочернем процессе, поэтому время процессора
+родительского процесса - это только обработка на стороне слейвов.
+
+Только для Linux/macOS (pty), порты 8N1.
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_multi_stand
+"""
+import multiprocessing
+import os
+import threading
+import time
+
+import serial
+
+from benchmarks.bench_port_detect import open_ptys
+from utils.ModbusHost import ModbusHost
+from utils.ModbusSlave import ModbusSlave
+
+STANDS = (1, 2, 4, 8, 16)
+RATE = 80           # запросов в секунду на стенд
+DURATION = 3.0
+RESPONSE_LENGTH = 5 + 7 * 2
+
+
+def request_for(slave_id):
+    slave = ModbusSlave(slave_id=slave_id)
+    request = bytearray([slave_id, 0x03, 0, 1, 0, 7])
+    request += slave._calculate_crc(request)
+    return bytes(request)
+
+
+def master_line(fd, unit_ids, responses):
+    """Мастер одной линии: опрос устройств по очереди с частотой RATE на устройство"""
+    requests = [request_for(unit) for unit in unit_ids]
+    period = 1 / (RATE * len(unit_ids))
+    end = time.perf_counter() + DURATION
+    next_time = time.perf_counter()
+    os.set_blocking(fd, False)
+    while time.perf_counter() < end:
+        for request in requests:
+            os.write(fd, request)
+            received = 0
+            deadline = time.perf_counter() + 0.1
+            while received < RESPONSE_LENGTH and time.perf_counter() < deadline:
+                try:
+                    received += len(os.read(fd, 256))
+                except BlockingIOError:
+                    time.sleep(0.0005)
+            if received >= RESPONSE_LENGTH:
+                with responses.get_lock():
+                    responses.value += 1
+            next_time += period
+            time.sleep(max(next_time - time.perf_counter(), 0))
+
+
+def masters(lines, responses):
+    threads = [threading.Thread(target=master_line, args=(fd, units, responses)) for fd, units in lines]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run(lines, start, stop):
+    """Запуск слейвов, мастеров в дочернем процессе и замер процессора"""
+    responses = multiprocessing.get_context("fork").Value("i", 0)
+    start()
+    time.sleep(0.2)
+    process = multiprocessing.get_context("fork").Process(target=masters, args=(lines, responses))
+    cpu = time.process_time()
+    process.start()
+    process.join()
+    cpu = time.process_time() - cpu
+    stop()
+    return cpu, responses.value
+
+
+def threads_mode(count):
+    ptys = open_ptys(count)
+    slaves = []
+    threads = []
+
+    def start():
+        for _, name in ptys:
+            slave = ModbusSlave(baudrate=38400, parity="N", slave_id=2, rx_mode=ModbusSlave.RX_MODE_FRAME)
+            slave.serial = serial.Serial(name, baudrate=38400, parity="N", timeout=1)
+            slave.running = True
+            thread = threading.Thread(target=slave._rtu_frame_loop, daemon=True)
+            thread.start()
+            slaves.append(slave)
+            threads.append(thread)
+
+    def stop():
+        for slave in slaves:
+            slave.running = False
+        for thread in threads:
+            thread.join()
+        for slave in slaves:
+            slave.serial.close()
+
+    return run([(fd, [2]) for fd, _ in ptys], start, stop)
+
+
+def host_mode(count, one_line=False):
+    ptys = open_ptys(1 if one_line else count)
+    host = ModbusHost()
+    for _, name in ptys:
+        host.add_port(name, baudrate=38400, parity="N")
+
+    if one_line:
+        units = list(range(1, count + 1))
+        for unit in units:
+            host.add_unit(ptys[0][1], unit)
+        lines = [(ptys[0][0], units)]
+    else:
+        for _, name in ptys:
+            host.add_unit(name, 2)
+        lines = [(fd, [2]) for fd, _ in ptys]
+
+    return run(lines, host.start, host.stop)
+
+
+def main():
+    modes = {
+        "потоки": threads_mode,
+        "хост": host_mode,
+        "хост, 1 линия": lambda count: host_mode(count, one_line=True),
+    }
+    print(f"{'режим':<16}{'стендов':>8}{'ответов':>9}{'% CPU':>8}{'% CPU/стенд':>13}")
+    for name, mode in modes.items():
+        for count in STANDS:
+            cpu, responses = mode(count)
+            load = cpu / DURATION * 100
+            print(f"{name:<16}{count:>8}{responses:>9}{load:>8.2f}{load / count:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
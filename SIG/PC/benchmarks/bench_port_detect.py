@@ -0,0 +1,88 @@
+"""
+Время от запуска ModbusSlave до первого ответа мастеру при автоопределении порта.
+
+Создаются PORTS псевдотерминалов, мастер опрашивает слейв только через
+последний из них (худший случай для перебора по очереди), остальные
+молчат. Список портов системы подменяется этими псевдотерминалами.
+Запуск выполняется дважды: второй раз с запомненным портом.
+
+Только для Linux/macOS (pty). Псевдотерминал Linux не даёт повторно
+включить контроль чётности, поэтому используется 8N1.
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_port_detect
+"""
+import os
+import tempfile
+import threading
+import time
+import tty
+from types import SimpleNamespace
+
+import serial.tools.list_ports
+
+from utils.ModbusSlave import ModbusSlave
+
+PORTS = 4
+POLL_PERIOD = 0.05
+
+
+def open_ptys(count):
+    ptys = []
+    for _ in range(count):
+        master, slave = os.openpty()
+        tty.setraw(master)
+        tty.setraw(slave)
+        ptys.append((master, os.ttyname(slave)))
+    return ptys
+
+
+def poll(master_fd, request, stop, first_response):
+    """Мастер: запрос раз в POLL_PERIOD, фиксирует время первого ответа"""
+    os.set_blocking(master_fd, False)
+    while not stop.is_set():
+        os.write(master_fd, request)
+        deadline = time.perf_counter() + POLL_PERIOD
+        while time.perf_counter() < deadline:
+            try:
+                if os.read(master_fd, 256) and not first_response:
+                    first_response.append(time.perf_counter())
+            except BlockingIOError:
+                pass
+            time.sleep(0.001)
+
+
+def run_once(ptys, cache_file):
+    slave = ModbusSlave(baudrate=38400, slave_id=2, parity="N", rx_mode=ModbusSlave.RX_MODE_FRAME)
+    slave.PORT_CACHE_FILE = cache_file
+    request = bytearray([2, 0x03, 0, 1, 0, 7])
+    request += slave._calculate_crc(request)
+
+    stop = threading.Event()
+    first_response = []
+    master = threading.Thread(target=poll, args=(ptys[-1][0], bytes(request), stop, first_response))
+    master.start()
+
+    start = time.perf_counter()
+    slave.start()
+    while not first_response and time.perf_counter() - start < 30:
+        time.sleep(0.001)
+    stop.set()
+    master.join()
+    slave.stop()
+    return (first_response[0] - start) if first_response else None
+
+
+def main():
+    ptys = open_ptys(PORTS)
+    ports = [SimpleNamespace(device=name) for _, name in ptys]
+    serial.tools.list_ports.comports = lambda: ports
+
+    cache_file = os.path.join(tempfile.mkdtemp(), "port.json")
+    for attempt in ("первый запуск", "повторный запуск"):
+        elapsed = run_once(ptys, cache_file)
+        result = f"{elapsed:.3f} с" if elapsed is not None else "нет ответа"
+        print(f"{attempt}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Время перерисовки PressureGraph на одно обновление данных.
+
+Графики строятся на холсте Agg в памяти (parent=None), поэтому в замер
+не входит передача готового изображения в Tk (для blit - только область
+графика, для полной перерисовки - тоже, но после рендера всей фигуры).
+
+Режимы: полная перерисовка canvas.draw() (как было), blit поверх
+кэшированного фона и скрытый график (только накопление данных).
+
+Затем - blit при разной длине истории (до 72 часов опроса раз в
+секунду) и разном масштабе окна: время должно зависеть только от
+числа интервалов огибающей, но не от истории и не от длины окна.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_pressure_graph
+"""
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from utils.PressureGraph import PressureGraph
+from utils.TimeSeriesStore import TimeSeriesStore
+
+TICKS = 200
+HISTORY_HOURS = (1, 24, 72)
+
+
+def measure(graph):
+    for i in range(graph.max_visible_points):
+        graph.update_data(i)
+
+    times = []
+    for i in range(TICKS):
+        start = time.perf_counter()
+        graph.update_data(20 + (i % 10))
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return sum(times) / len(times), times[int(len(times) * 0.99)]
+
+
+def main():
+    modes = {
+        "canvas.draw()": dict(blit=False),
+        "blit": dict(blit=True),
+    }
+    print(f"{'режим':<16}{'мс/обновление':>15}{'p99, мс':>10}")
+    for name, options in modes.items():
+        graph = PressureGraph(None, **options)
+        mean, p99 = measure(graph)
+        graph.cleanup()
+        print(f"{name:<16}{mean * 1e3:>15.2f}{p99 * 1e3:>10.2f}")
+
+    graph = PressureGraph(None)
+    graph.visible = False
+    mean, p99 = measure(graph)
+    graph.cleanup()
+    print(f"{'скрыт':<16}{mean * 1e3:>15.3f}{p99 * 1e3:>10.3f}")
+
+    print()
+    print(f"{'история, ч':<12}{'окно, точек':>12}{'мс/обновление':>15}{'p99, мс':>10}")
+    start_ns = 1_767_225_600 * 10 ** 9
+    for hours in HISTORY_HOURS:
+        store = TimeSeriesStore(("pressure",), capacity=86400)
+        for i in range(hours * 3600):
+            store.append({"pressure": 20.0 + (i % 600) * 0.05}, start_ns + i * 10 ** 9)
+        graph = PressureGraph(None, store=store)
+        for span in sorted({8, 3600, store.count}):
+            graph.span = span
+            mean, p99 = measure(graph)
+            print(f"{hours:<12}{span:>12}{mean * 1e3:>15.2f}{p99 * 1e3:>10.2f}")
+        graph.cleanup()
+
+
+if __name__ == "__main__":
+    main()
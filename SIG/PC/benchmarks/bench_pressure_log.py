@@ -0,0 +1,164 @@
+"""
+Журнал давлений SigCsvLogger: сутки при 100 Гц и влияние на HMI.
+
+1. Сутки при 100 Гц (8 640 000 точек) с ускоренным временем: точки
+   подаются пачками по FLUSH_INTERVAL, как их копит сборщик, и пишутся
+   _flush в текущем потоке - это вся работа фонового потока записи.
+   Ротация - каждый час. Выводятся время на точку, доля одного ядра при
+   100 Гц, число и размер файлов. Затем файлы читаются обратно: заголовок,
+   число строк, разбор Date + " " + Time (как у pandas.to_datetime в
+   SIG/Graph) и шаг 10 мс между соседними строками.
+2. Влияние в реальном времени: сборщик 100 Гц без журнала и с журналом.
+   Одновременно поток "Modbus" каждые 5 мс обрабатывает запись давлений
+   (0x10) через ModbusSlave._process_request, а главный поток, как цикл
+   Tk, просыпается каждые 10 мс. Выводятся время ответа Modbus и
+   опоздание цикла Tk (среднее, p99, наибольшее), потерянные точки.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_pressure_log
+"""
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from utils.ModbusSlave import ModbusSlave
+from utils.RegisterBank import RegisterBank
+from utils.RegisterMap import RegisterMap
+from utils.RegisterSampler import RegisterSampler
+from utils.SigCsvLogger import SigCsvLogger
+from utils.constants_for_regs import *
+
+RATE = 100                  # Гц
+DAY_POINTS = 24 * 3600 * RATE
+ROTATE_SECONDS = 3600
+CHECK_EVERY = 1000          # разбирается каждая такая строка
+DURATION = 15               # с на вариант в реальном времени
+MODBUS_PERIOD = 0.005
+TK_PERIOD = 0.010
+SERIES = ("PRESSURE_MN1", "PRESSURE_MN2", "SPEED")
+
+
+def simulated_day(directory):
+    logger = SigCsvLogger(directory, rotate_seconds=ROTATE_SECONDS)
+    start_ns = int(datetime(2026, 10, 18, 8, 0).timestamp()) * 1_000_000_000
+    step_ns = 1_000_000_000 // RATE
+    batch = int(RATE * SigCsvLogger.FLUSH_INTERVAL)
+
+    started = time.perf_counter()
+    for first in range(0, DAY_POINTS, batch):
+        for i in range(first, first + batch):
+            pressure = 25.0 + (i % 500) / 100
+            logger.log(start_ns + i * step_ns, {"PRESSURE_MN1": pressure, "PRESSURE_MN2": pressure - 0.5})
+        logger._flush()
+    logger.stop()
+    elapsed = time.perf_counter() - started
+
+    per_point = elapsed / DAY_POINTS
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    print(f"сутки при {RATE} Гц: {elapsed:.1f} с, {per_point * 1e6:.2f} мкс на точку, "
+          f"{per_point * RATE * 100:.2f} % ядра при {RATE} Гц")
+    print(f"  файлов: {logger.files}, всего {size / 2 ** 20:.0f} МБ, потеряно точек: {logger.lost}, "
+          f"ошибок записи: {logger.errors}")
+    return start_ns
+
+
+def check_files(directory, start_ns):
+    """Обратное чтение: заголовок, число строк, разбор времени и шаг 10 мс"""
+    rows = 0
+    bad = 0
+    previous = None
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), encoding="ascii") as file:
+            if file.readline() != SigCsvLogger.HEADER:
+                bad += 1
+            for line in file:
+                date, clock, first, second = line.rstrip("\n").split(";")
+                float(first), float(second)
+                if rows % CHECK_EVERY == 0 or previous is None:
+                    moment = datetime.strptime(f"{date} {clock}", "%Y-%m-%d %H:%M:%S.%f")
+                    expected = datetime.fromtimestamp((start_ns + rows * 1_000_000_000 // RATE) / 1e9)
+                    if previous is not None and moment != expected:
+                        bad += 1
+                    previous = moment
+                rows += 1
+    print(f"  прочитано строк: {rows} из {DAY_POINTS}, файлов: {len(os.listdir(directory))}, "
+          f"несовпадений: {bad}")
+
+
+def realtime(with_log, directory):
+    register_map = RegisterMap(REGISTER_FIELDS)
+    bank = RegisterBank(256)
+    slave = ModbusSlave(slave_id=2, registers=bank, read_cache_size=0)
+    sampler = RegisterSampler(bank, register_map, SERIES, rate=RATE)
+    logger = SigCsvLogger(directory) if with_log else None
+    if logger is not None:
+        sampler.subscribe(logger.log)
+        logger.start()
+    sampler.start()
+
+    stop = threading.Event()
+    turnaround = []
+
+    def modbus():
+        i = 0
+        while not stop.wait(MODBUS_PERIOD):
+            pressure = 25.0 + (i % 100) / 10
+            payload = struct.pack(">ffff", pressure, pressure - 0.5, 0.5, 0.0)
+            data = bytearray([slave.slave_id, 0x10, 0, PRESSURE_MN1, 0, 8, 16]) + payload
+            data += slave._calculate_crc(data)
+            tick = time.perf_counter()
+            slave._process_request(data)
+            turnaround.append(time.perf_counter() - tick)
+            i += 1
+
+    thread = threading.Thread(target=modbus, daemon=True)
+    thread.start()
+
+    lateness = []
+    end = time.perf_counter() + DURATION
+    while time.perf_counter() < end:
+        tick = time.perf_counter()
+        time.sleep(TK_PERIOD)
+        lateness.append(time.perf_counter() - tick - TK_PERIOD)
+
+    stop.set()
+    thread.join()
+    sampler.stop()
+    if logger is not None:
+        logger.stop()
+    return (np.array(turnaround), np.array(lateness), sampler.sampled,
+            logger.written if logger else 0, logger.lost if logger else 0)
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="sig_log_")
+    try:
+        start_ns = simulated_day(directory)
+        check_files(directory, start_ns)
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"\nреальное время, {DURATION} с, сбор {RATE} Гц, запрос Modbus каждые {MODBUS_PERIOD * 1e3:.0f} мс, "
+          f"цикл Tk {TK_PERIOD * 1e3:.0f} мс")
+    print(f"{'':<12}{'ответ, мкс':>12}{'p99':>8}{'макс':>8}{'опоздание Tk, мс':>18}{'p99':>8}{'макс':>8}"
+          f"{'точек':>8}{'в файле':>9}{'потеряно':>10}")
+    for name, with_log in (("без журнала", False), ("с журналом", True)):
+        directory = tempfile.mkdtemp(prefix="sig_log_")
+        try:
+            turnaround, lateness, sampled, written, lost = realtime(with_log, directory)
+        finally:
+            shutil.rmtree(directory)
+        print(f"{name:<12}{turnaround.mean() * 1e6:>12.1f}{np.percentile(turnaround, 99) * 1e6:>8.1f}"
+              f"{turnaround.max() * 1e6:>8.0f}{lateness.mean() * 1e3:>18.3f}"
+              f"{np.percentile(lateness, 99) * 1e3:>8.3f}{lateness.max() * 1e3:>8.2f}"
+              f"{sampled:>8}{written:>9}{lost:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Бенчмарк кэша ответов на чтение на типичном цикле опроса ПР200.
+
+Цикл: чтение экрана и кнопок, чтение уставок, запись давлений и скорости,
+чтение счётчика циклов и статуса. Раз в несколько циклов оператор меняет
+уставку на HMI. Сравниваются слейв без кэша и с кэшем.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_read_cache
+"""
+import struct
+import timeit
+
+from utils.ModbusSlave import ModbusSlave
+from utils.constants_for_regs import *
+
+
+def frame(slave, data):
+    data = bytearray(data)
+    data += slave._calculate_crc(data)
+    return bytes(data)
+
+
+def read_request(slave, address, quantity):
+    return frame(slave, [slave.slave_id, 0x03, 0, address, 0, quantity])
+
+
+def write_request(slave, address, values):
+    payload = struct.pack(f">{len(values)}H", *values)
+    return frame(slave, bytes([slave.slave_id, 0x10, 0, address, 0, len(values), len(payload)]) + payload)
+
+
+def poll_cycle(slave, hmi_every=20):
+    """Функция, выполняющая один цикл опроса"""
+    reads = [
+        read_request(slave, CURRENT_FRAME_REG, START_MODE_CYCLE_REG),
+        read_request(slave, FREQ_MANUAL, CYCLES_NEED_CYCLE - FREQ_MANUAL + 1),
+        read_request(slave, NUMBER_OF_CYCLES, WORK - NUMBER_OF_CYCLES + 1),
+    ]
+    writes = [write_request(slave, PRESSURE_MN1, [i, 0x4120, i, 0x4100, i, 0x4040]) for i in range(16)]
+    counter = [0]
+
+    def cycle():
+        n = counter[0]
+        counter[0] += 1
+        slave._process_request(reads[0])
+        slave._process_request(reads[1])
+        slave._process_request(writes[n % len(writes)])
+        slave._process_request(reads[2])
+        if n % hmi_every == 0:
+            slave.registers.set_float(PRESSURE_END_STAT, n * 0.1)
+
+    return cycle
+
+
+def main(number=20000):
+    print(f"{'кэш':<8}{'мкс/цикл':>10}{'попадания':>12}{'промахи':>10}")
+    for size in (0, 32):
+        slave = ModbusSlave(slave_id=2, read_cache_size=size)
+        cycle = poll_cycle(slave)
+        elapsed = min(timeit.repeat(cycle, number=number, repeat=5)) / number
+        hits = slave.read_cache.hits if slave.read_cache else 0
+        misses = slave.read_cache.misses if slave.read_cache else 0
+        print(f"{size:<8}{elapsed * 1e6:>10.2f}{hits:>12}{misses:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Декодирование всех float полей регистров HMI: по одному полю и снимком.
+
+Сравниваются:
+- struct: исходный путь get_float_from_registers - два регистра,
+  сдвиг и struct.pack/unpack на каждое поле;
+- get_float: RegisterBank.get_float() на каждое поле (своё
+  согласованное чтение на поле);
+- RegisterMap.read: все поля (float и целые) одним согласованным
+  struct.unpack_from прямо из банка;
+- decode_floats: векторное декодирование NumPy, одного снимка и истории
+  из 1000 снимков (на снимок).
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_register_map
+"""
+import struct
+import timeit
+
+import numpy as np
+
+from utils.RegisterBank import RegisterBank
+from utils.RegisterMap import RegisterMap
+from utils.constants_for_regs import *
+
+
+def struct_float(registers, start_reg):
+    """Исходный путь: два регистра -> uint32 -> struct.pack/unpack"""
+    register0 = registers[start_reg]
+    register1 = registers[start_reg + 1]
+    uint32 = (register1 << 16) | register0
+    return struct.unpack('<f', struct.pack('<I', uint32))[0]
+
+
+def main(number=20000):
+    register_map = RegisterMap(REGISTER_FIELDS)
+    bank = RegisterBank(256)
+    for index, name in enumerate(register_map.f32_names):
+        bank.set_float(register_map[name]["address"], index * 1.5)
+    addresses = [register_map[name]["address"] for name in register_map.f32_names]
+
+    paths = {
+        "struct": lambda: [struct_float(bank, address) for address in addresses],
+        "get_float": lambda: [bank.get_float(address) for address in addresses],
+        "RegisterMap.read": lambda: register_map.read(bank),
+        "decode_floats": lambda: register_map.decode_floats(
+            np.frombuffer(bank.snapshot(0, register_map.span), dtype=np.uint16)),
+    }
+
+    expected = [index * 1.5 for index in range(len(addresses))]
+    print(f"float полей: {len(addresses)}, всего полей: {len(register_map.fields)}")
+    print(f"{'путь':<18}{'мкс/снимок':>12}")
+    for name, func in paths.items():
+        result = func()
+        values = [result[field] for field in register_map.f32_names] if isinstance(result, dict) else list(result)
+        assert np.allclose(values, expected), name
+        elapsed = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print(f"{name:<18}{elapsed * 1e6:>12.2f}")
+
+    history = np.tile(np.frombuffer(bank.snapshot(0, register_map.span), dtype=np.uint16), (1000, 1))
+    assert np.allclose(register_map.decode_floats(history)[-1], expected)
+    elapsed = min(timeit.repeat(lambda: register_map.decode_floats(history), number=200, repeat=5)) / 200
+    print(f"{'decode_floats x1000':<18}{elapsed / 1000 * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
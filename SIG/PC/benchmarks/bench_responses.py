@@ -0,0 +1,66 @@
+"""
+Микробенчмарк формирования ответов ModbusSlave по кодам функций.
+
+Для каждого запроса выводится время обработки и объём памяти,
+выделяемой за один вызов _process_request (по tracemalloc).
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_responses
+"""
+import struct
+import timeit
+import tracemalloc
+
+from utils.ModbusSlave import ModbusSlave
+
+
+def build_requests(slave):
+    """Типичные запросы ПР200 для каждого кода функции"""
+    def frame(data):
+        data = bytearray(data)
+        data += slave._calculate_crc(data)
+        return bytes(data)
+
+    payload = bytes(range(40))
+    return {
+        "0x03 x4": frame([slave.slave_id, 0x03, 0, 8, 0, 4]),
+        "0x03 x40": frame([slave.slave_id, 0x03, 0, 0, 0, 40]),
+        "0x06": frame([slave.slave_id, 0x06, 0, 3, 0, 1]),
+        "0x10 x20": frame(bytes([slave.slave_id, 0x10, 0, 0, 0, 20, 40]) + payload),
+        "0x04 x4": frame([slave.slave_id, 0x04, 0, 8, 0, 4]),
+        "0x16": frame([slave.slave_id, 0x16, 0, 30, 0xFF, 0xFB, 0, 4]),
+        "0x17 33/6": frame(bytes([slave.slave_id, 0x17, 0, 1, 0, 33, 0, 8, 0, 6, 12]) + payload[:12]),
+        "exception": frame([slave.slave_id, 0x03, 0, 250, 0, 10]),
+    }
+
+
+def measure_allocations(func, repeat=1000):
+    """Средний объём выделенной памяти за вызов, байт"""
+    func()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    total = 0
+    for _ in range(repeat):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - current
+    tracemalloc.stop()
+    return total / repeat
+
+
+def main(number=20000):
+    slave = ModbusSlave(slave_id=2)
+
+    print(f"{'запрос':<12}{'мкс/запрос':>12}{'байт/запрос':>14}")
+    for name, request in build_requests(slave).items():
+        func = lambda: slave._process_request(request)
+        elapsed = min(timeit.repeat(func, number=number, repeat=5)) / number
+        allocated = measure_allocations(func)
+        print(f"{name:<12}{elapsed * 1e6:>12.2f}{allocated:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
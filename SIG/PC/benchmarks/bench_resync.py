@@ -0,0 +1,32 @@
+"""
+Доля успешных опросов при шуме на линии вплотную к запросу.
+
+Перед запросом с заданной вероятностью на линию попадают 1-8 случайных
+байт без паузы - как помеха на RS-485 в момент начала передачи. Мастер
+(bench_loopback) опрашивает слейв 200 раз в секунду; успешный опрос -
+ответ в пределах таймаута.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_resync
+"""
+from benchmarks.bench_loopback import run_loopback
+from utils.ModbusSlave import ModbusSlave
+
+NOISE = (0.0, 0.05, 0.2, 0.5)
+
+
+def main(duration=3.0):
+    print(f"{'приём':<8}{'шум':>6}{'запросов':>10}{'успешно':>10}{'%':>8}{'восстановлено':>15}{'потеряно':>10}")
+    for rx_mode in (ModbusSlave.RX_MODE_FRAME, ModbusSlave.RX_MODE_BYTE):
+        for noise in NOISE:
+            stats = run_loopback(rx_mode=rx_mode, mix="03:4,10:1,17:1", rate=200, noise=noise, noise_gap=0.0,
+                                 duration=duration)
+            success = stats["answered"] / stats["sent"] * 100
+            recovered = stats.get("slave_recovered")
+            lost = stats.get("slave_lost")
+            print(f"{rx_mode:<8}{noise:>6.2f}{stats['sent']:>10}{stats['answered']:>10}{success:>8.1f}"
+                  f"{'-' if recovered is None else recovered:>15}{'-' if lost is None else lost:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Какие переходные процессы давления видит история при разной частоте сбора.
+
+Поток "ПЛК" пишет МН1, МН2 и скорость в банк регистров 200 раз в секунду
+(как мастер по Modbus) и после каждой записи вызывает колбэк записи.
+Давление держится на 25 МПа, а каждые RESET_PERIOD секунд на RESET_DIP
+секунд падает до 5 МПа (сброс давления клапаном).
+
+Одновременно работают:
+- 1 Гц: чтение раз в секунду таймером, как было в App.plots_upd;
+- RegisterSampler с частотой 10, 50 и 100 Гц;
+- RegisterSampler только по записи мастера (on_write).
+
+Для каждого выводятся число точек, сколько сбросов давления попало в
+историю, наименьшее увиденное давление, разброс периода сбора и
+задержка метки времени точки относительно записи ПЛК.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_sampler
+"""
+import bisect
+import threading
+import time
+
+import numpy as np
+
+from utils.RegisterBank import RegisterBank
+from utils.RegisterMap import RegisterMap
+from utils.RegisterSampler import RegisterSampler
+from utils.constants_for_regs import *
+
+DURATION = 20           # с
+WRITE_RATE = 200        # записей ПЛК в секунду
+RESET_PERIOD = 2.3      # с (не кратно секунде - сбросы в разной фазе опроса)
+RESET_DIP = 0.15        # с
+SERIES = ("PRESSURE_MN1", "PRESSURE_MN2", "SPEED")
+
+
+class Collector:
+    """Хранилище точек для drain(): только список (время, значения)"""
+
+    def __init__(self):
+        self.points = []
+
+    def extend(self, points):
+        self.points.extend(points)
+
+
+def pressure_at(elapsed):
+    return 5.0 if elapsed % RESET_PERIOD < RESET_DIP else 25.0
+
+
+def plc(bank, register_map, samplers, stop, write_times):
+    start = time.monotonic()
+    deadline = start
+    while not stop.is_set():
+        value = pressure_at(time.monotonic() - start)
+        register_map.encode_many(bank, {"PRESSURE_MN1": value, "PRESSURE_MN2": value, "SPEED": 0.5})
+        write_times.append(time.monotonic_ns())
+        for sampler in samplers:
+            sampler.on_write()
+        deadline += 1 / WRITE_RATE
+        time.sleep(max(0.0, deadline - time.monotonic()))
+
+
+def one_hertz(bank, register_map, stop, points):
+    """Прежний сбор: раз в секунду, время - в момент чтения"""
+    while not stop.wait(1.0):
+        fields = register_map.read(bank)
+        points.append((time.time_ns(), {name: fields[name] for name in SERIES}))
+
+
+def report(name, points, clock_offset, write_times):
+    values = np.array([values["PRESSURE_MN1"] for _, values in points])
+    times = np.array([timestamp for timestamp, _ in points], dtype=np.int64)
+    low = values < 15.0
+    dips = int(np.count_nonzero(low[1:] & ~low[:-1]) + (low[0] if len(low) else 0))
+    periods = np.diff(times) / 1e6
+    jitter = np.percentile(np.abs(periods - np.median(periods)), 99) if len(periods) > 1 else 0.0
+
+    # Задержка метки от последней записи ПЛК перед ней
+    lags = []
+    for timestamp in times.tolist():
+        index = bisect.bisect_right(write_times, timestamp - clock_offset) - 1
+        if index >= 0:
+            lags.append((timestamp - clock_offset - write_times[index]) / 1e3)
+    lag = np.median(lags) if lags else float("nan")
+
+    print(f"{name:<12}{len(points):>8}{dips:>8} / {int(-(-DURATION // RESET_PERIOD)):<4}{values.min():>10.1f}"
+          f"{jitter:>14.2f}{lag:>14.0f}")
+
+
+def main():
+    register_map = RegisterMap(REGISTER_FIELDS)
+    bank = RegisterBank(256)
+    stop = threading.Event()
+
+    samplers = {f"{rate} Гц": RegisterSampler(bank, register_map, SERIES, rate=rate) for rate in (10, 50, 100)}
+    on_write = RegisterSampler(bank, register_map, SERIES, rate=None)
+    samplers["по записи"] = on_write
+
+    write_times = []
+    old_points = []
+    threads = [
+        threading.Thread(target=plc, args=(bank, register_map, [on_write], stop, write_times)),
+        threading.Thread(target=one_hertz, args=(bank, register_map, stop, old_points)),
+    ]
+    for thread in threads:
+        thread.start()
+    while not write_times:
+        time.sleep(0.001)   # сбор - после первой записи ПЛК
+    for sampler in samplers.values():
+        sampler.start()
+
+    collectors = {name: Collector() for name in samplers}
+    start = time.monotonic()
+    while time.monotonic() - start < DURATION:
+        time.sleep(0.5)     # перерисовка графиков: перенос накопленных точек
+        for name, sampler in samplers.items():
+            sampler.drain(collectors[name])
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    for name, sampler in samplers.items():
+        sampler.stop()
+        sampler.drain(collectors[name])
+
+    print(f"запись ПЛК {WRITE_RATE} раз/с, сброс давления {RESET_DIP * 1e3:.0f} мс каждые {RESET_PERIOD} с, "
+          f"{DURATION} с")
+    print(f"{'сбор':<12}{'точек':>8}{'сбросов':>15}{'мин, МПа':>10}{'разброс p99, мс':>16}{'задержка, мкс':>14}")
+    report("1 Гц", old_points, time.time_ns() - time.monotonic_ns(), write_times)
+    for name, sampler in samplers.items():
+        report(name, collectors[name].points, sampler.clock_offset, write_times)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Задержка чтения банка регистров из другого процесса через разделяемую память.
+
+Процесс HMI (этот) пишет давления МН1 и МН2 одним значением в одной
+транзакции (без записи и 1000 раз в секунду); читатель в отдельном процессе
+снимает копию регистров 0-33, читает float и проверяет, что
+МН1 и МН2 из одного согласованного чтения совпадают. Читатель запускается
+отдельным интерпретатором, как внешний регистратор или SIG/Graph.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_shared_registers
+"""
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from utils.RegisterBank import RegisterBank
+from utils.RegisterBankReader import RegisterBankReader
+from utils.constants_for_regs import *
+
+SHARED_NAME = "sig_registers_bench"
+READS = 20000
+
+
+def percentiles(values):
+    values = sorted(values)
+    return [values[min(int(len(values) * fraction), len(values) - 1)] * 1e6 for fraction in (0.5, 0.99)]
+
+
+def reader_process():
+    reader = RegisterBankReader(SHARED_NAME)
+
+    snapshot_times = []
+    for _ in range(READS):
+        start = time.perf_counter()
+        reader.snapshot(0, CYCLES_NEED_CYCLE + 1)
+        snapshot_times.append(time.perf_counter() - start)
+
+    float_times = []
+    for _ in range(READS):
+        start = time.perf_counter()
+        reader.get_float(PRESSURE_MN1)
+        float_times.append(time.perf_counter() - start)
+
+    mn1 = reader.words[PRESSURE_MN1:PRESSURE_MN1 + 2].view("<f4")
+    mn2 = reader.words[PRESSURE_MN2:PRESSURE_MN2 + 2].view("<f4")
+    torn = 0
+    for _ in range(READS):
+        first, second = reader.consistent(lambda: (float(mn1[0]), float(mn2[0])))
+        torn += first != second
+
+    print(json.dumps([percentiles(snapshot_times), percentiles(float_times), torn, reader.retries]))
+    del mn1, mn2
+    reader.close()
+
+
+def writer(bank, stop, rate):
+    value = 0.0
+    while not stop.is_set():
+        value += 0.001
+        with bank.transaction():
+            bank.set_float(PRESSURE_MN1, value)
+            bank.set_float(PRESSURE_MN2, value)
+        if rate:
+            time.sleep(1 / rate)
+
+
+def main():
+    bank = RegisterBank(256, shared_name=SHARED_NAME)
+
+    print(f"{'запись/с':<10}{'копия p50/p99, мкс':>20}{'float p50/p99, мкс':>20}{'разорвано':>11}{'повторов':>10}")
+    for rate in (0, 1000):
+        stop = threading.Event()
+        thread = threading.Thread(target=writer, args=(bank, stop, rate)) if rate else None
+        if thread:
+            thread.start()
+
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_shared_registers", "--reader"],
+                                capture_output=True, text=True, check=True).stdout
+        snapshot, get_float, torn, retries = json.loads(output)
+
+        stop.set()
+        if thread:
+            thread.join()
+        print(f"{rate:<10}{snapshot[0]:>11.2f} /{snapshot[1]:>7.2f}{get_float[0]:>11.2f} /{get_float[1]:>7.2f}"
+              f"{torn:>11}{retries:>10}")
+
+    bank.close()
+
+
+if __name__ == "__main__":
+    if "--reader" in sys.argv:
+        reader_process()
+    else:
+        main()
@@ -0,0 +1,81 @@
+"""
+Запуск HMI: импорт App и время до первой отрисовки и первого ответа Modbus.
+
+Каждый замер - отдельный интерпретатор, как при запуске main.py:
+- импорт: время импорта модуля App и какие тяжёлые модули он подтягивает
+  (их импорт - часть времени до появления окна);
+- запуск: App() до mainloop и отчёт StartupProfiler, который HMI выводит
+  сам: этапы потока Tk и потока ModbusStart, вехи "первая отрисовка" и
+  "первый ответ Modbus". Без мастера на порту первого ответа не будет -
+  отчёт выводится после автоопределения порта (или STARTUP_REPORT_TIMEOUT).
+
+Запуск открывает COM-порты и порт Modbus TCP, как настоящий HMI, и нужен
+дисплей; без дисплея выполняется только замер импорта.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_startup
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("matplotlib", "PIL", "bidict", "asyncio", "frames.ManualMode")
+RUNS = 5
+STARTUP_LIMIT = 30      # с, закрытие HMI, если отчёт так и не выведен
+
+
+def child_import():
+    start = time.perf_counter()
+    import App  # noqa: F401
+    elapsed = time.perf_counter() - start
+    print(json.dumps([elapsed, [name for name in HEAVY_MODULES if name in sys.modules]]))
+
+
+def child_startup():
+    from App import App
+
+    app = App()
+    started = time.perf_counter()
+
+    def poll():
+        if app.startup_reported or time.perf_counter() - started > STARTUP_LIMIT:
+            app.on_close()
+        else:
+            app.after(100, poll)
+
+    app.after(100, poll)
+    app.mainloop()
+
+
+def has_display():
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def main():
+    times = []
+    loaded = []
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", "import"],
+                                capture_output=True, text=True)
+        if result.returncode:
+            print(f"ошибка импорта: {result.stderr.strip().splitlines()[-1]}")
+            return
+        elapsed, loaded = json.loads(result.stdout)
+        times.append(elapsed)
+    times.sort()
+    print(f"импорт App: медиана {times[len(times) // 2] * 1e3:.0f} мс из {RUNS}, "
+          f"тяжёлые модули: {', '.join(loaded) or 'нет'}")
+
+    if not has_display():
+        print("нет дисплея - запуск App не замеряется")
+        return
+    subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", "startup"])
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child_import() if sys.argv[sys.argv.index("--child") + 1] == "import" else child_startup()
+    else:
+        main()
@@ -0,0 +1,76 @@
+"""
+Нагрузочный тест ModbusTcpServer на локальном интерфейсе.
+
+Клиенты asyncio читают блок регистров давлений (0x03), держа в полёте
+PIPELINE запросов на соединение. Для 1, 10 и 100 клиентов выводятся
+запросы в секунду и задержки p50/p99. Клиенты и сервер работают в одном
+процессе (сервер в своём потоке), поэтому делят GIL.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_tcp
+"""
+import asyncio
+import struct
+import time
+from collections import deque
+
+from utils.ModbusSlave import ModbusSlave
+from utils.ModbusTcpServer import ModbusTcpServer
+from utils.constants_for_regs import *
+
+PIPELINE = 4
+DURATION = 3.0
+
+
+async def client(port, unit, duration, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    in_flight = deque()
+    transaction = 0
+    end = time.perf_counter() + duration
+
+    while time.perf_counter() < end or in_flight:
+        while len(in_flight) < PIPELINE and time.perf_counter() < end:
+            transaction = (transaction + 1) & 0xFFFF
+            writer.write(struct.pack(">HHHBBHH", transaction, 0, 6, unit, 0x03, PRESSURE_MN1, 6))
+            in_flight.append(time.perf_counter())
+        await writer.drain()
+
+        header = await reader.readexactly(7)
+        length = struct.unpack_from(">H", header, 4)[0]
+        await reader.readexactly(length - 1)
+        latencies.append(time.perf_counter() - in_flight.popleft())
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(port, unit, clients):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, unit, DURATION, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (
+        len(latencies) / elapsed,
+        latencies[len(latencies) // 2],
+        latencies[int(len(latencies) * 0.99)],
+    )
+
+
+def main():
+    slave = ModbusSlave(slave_id=2)
+    slave.registers.set_float(PRESSURE_MN1, 12.5)
+    server = ModbusTcpServer(slave, host="127.0.0.1", port=0)
+    server.start()
+
+    print(f"{'клиенты':<10}{'запр/с':>10}{'p50, мс':>10}{'p99, мс':>10}")
+    try:
+        for clients in (1, 10, 100):
+            rate, p50, p99 = asyncio.run(run(server.port, slave.slave_id, clients))
+            print(f"{clients:<10}{rate:>10.0f}{p50 * 1e3:>10.2f}{p99 * 1e3:>10.2f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
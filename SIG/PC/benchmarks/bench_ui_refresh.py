@@ -0,0 +1,117 @@
+"""
+Бенчмарк стоимости одного тика обновления виджетов ManualMode.
+
+"До": каждый тик перечитываются все регистры и переустанавливаются все
+Tk переменные (как в прежних update_widgets), что вызывает trace пересчёта
+кгс/см2. "После": тик забирает маску изменённых регистров и вызывает
+только подписанные на них обработчики, переменная меняется только при
+изменении значения.
+
+Виджеты эмулируются переменными Tcl (tkinter.Tcl не требует дисплея),
+поэтому время отрисовки самих виджетов сюда не входит.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.bench_ui_refresh
+"""
+import struct
+import timeit
+import tkinter as tk
+
+from utils.ModbusSlave import ModbusSlave
+from utils.RegisterSubscriptions import RegisterSubscriptions
+from utils.constants_for_regs import *
+from utils.math_functions import get_kgs
+
+
+class FakeManualMode:
+    """Переменные ManualMode и App, связанные с регистрами"""
+
+    def __init__(self, root, registers):
+        self.registers = registers
+        self.traces = 0
+        self.mn1_mpa_var = tk.DoubleVar(root)
+        self.mn1_kgs_var = tk.DoubleVar(root)
+        self.mn2_mpa_var = tk.DoubleVar(root)
+        self.mn2_kgs_var = tk.DoubleVar(root)
+        self.speed_mpa_var = tk.DoubleVar(root)
+        self.frequency = tk.StringVar(root)
+        self.work = tk.IntVar(root)
+        self.mn1_mpa_var.trace_add("write", lambda *args: self.update_kgs(self.mn1_mpa_var, self.mn1_kgs_var))
+        self.mn2_mpa_var.trace_add("write", lambda *args: self.update_kgs(self.mn2_mpa_var, self.mn2_kgs_var))
+
+        self.subscriptions = RegisterSubscriptions()
+        self.subscriptions.subscribe(PRESSURE_MN1, lambda: self.refresh_float_var(self.mn1_mpa_var, PRESSURE_MN1), 2)
+        self.subscriptions.subscribe(PRESSURE_MN2, lambda: self.refresh_float_var(self.mn2_mpa_var, PRESSURE_MN2), 2)
+        self.subscriptions.subscribe(SPEED, lambda: self.refresh_float_var(self.speed_mpa_var, SPEED), 2)
+        self.subscriptions.subscribe(FREQ_MANUAL, self.refresh_frequency)
+        self.subscriptions.subscribe(WORK, self.refresh_work)
+
+    def update_kgs(self, mpa_var, kgs_var):
+        self.traces += 1
+        kgs_var.set(round(get_kgs(mpa_var.get()), 1))
+
+    def refresh_float_var(self, var, reg):
+        value = round(self.registers.get_float(reg), 1)
+        if var.get() != value:
+            var.set(value)
+
+    def refresh_frequency(self):
+        value = str(self.registers[FREQ_MANUAL])
+        if self.frequency.get() != value:
+            self.frequency.set(value)
+
+    def refresh_work(self):
+        value = self.registers[WORK]
+        if self.work.get() != value:
+            self.work.set(value)
+
+    def tick_before(self):
+        self.mn1_mpa_var.set(round(self.registers.get_float(PRESSURE_MN1), 1))
+        self.mn2_mpa_var.set(round(self.registers.get_float(PRESSURE_MN2), 1))
+        self.speed_mpa_var.set(round(self.registers.get_float(SPEED), 1))
+        self.frequency.set(str(self.registers[FREQ_MANUAL]))
+        self.work.set(self.registers[WORK])
+
+    def tick_after(self):
+        self.subscriptions.dispatch(self.registers.take_dirty())
+
+
+def master_writes(slave):
+    """Запись давлений мастером между тиками: давление меняется раз в 4 тика"""
+    def frame(data):
+        data = bytearray(data)
+        data += slave._calculate_crc(data)
+        return bytes(data)
+
+    requests = []
+    for i in range(16):
+        values = struct.unpack("<6H", struct.pack("<3f", 10.0 + i // 4, 12.0, 3.2))
+        payload = struct.pack(">6H", *values)
+        requests.append(frame(bytes([slave.slave_id, 0x10, 0, PRESSURE_MN1, 0, 6, 12]) + payload))
+    return requests
+
+
+def main(number=20000):
+    root = tk.Tcl()
+    print(f"{'вариант':<10}{'мкс/тик':>10}{'trace/тик':>12}")
+    for name in ("до", "после"):
+        slave = ModbusSlave(slave_id=2)
+        fake = FakeManualMode(root, slave.registers)
+        tick = fake.tick_before if name == "до" else fake.tick_after
+        requests = master_writes(slave)
+        counter = [0]
+
+        def step():
+            slave._process_request(requests[counter[0] % len(requests)])
+            counter[0] += 1
+            tick()
+
+        write_only = lambda: slave._process_request(requests[counter[0] % len(requests)])
+        base = min(timeit.repeat(write_only, number=number, repeat=3)) / number
+        fake.traces = 0
+        elapsed = min(timeit.repeat(step, number=number, repeat=3)) / number - base
+        print(f"{name:<10}{elapsed * 1e6:>10.2f}{fake.traces / (number * 3):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
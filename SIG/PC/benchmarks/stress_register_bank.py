@@ -0,0 +1,73 @@
+"""
+Стресс-тест RegisterBank: поток "Modbus" и поток "Tk" одновременно
+пишут float-пары, читатели проверяют, что не видят разорванных значений.
+
+Каждое записываемое значение - пара одинаковых 16-битных слов, поэтому
+разорванный float (слова из разных записей) сразу виден. Писатели
+нарочно пишут пару двумя отдельными присваиваниями внутри транзакции -
+так, как это делалось до появления банка. Для сравнения считается, сколько
+разрывов увидел бы читатель без sequence lock.
+
+Запуск из каталога SIG/PC:
+    python -m benchmarks.stress_register_bank
+"""
+import struct
+import sys
+import threading
+import time
+
+from utils.RegisterBank import RegisterBank
+from utils.constants_for_regs import *
+
+
+def is_torn(value):
+    low, high = struct.unpack("<HH", struct.pack("<f", value))
+    return low != high
+
+
+def writer(bank, address, values, stop):
+    while not stop.is_set():
+        for value in values:
+            with bank.transaction():
+                bank[address] = value
+                bank[address + 1] = value
+
+
+def main(duration=5.0):
+    sys.setswitchinterval(1e-6)     # как можно чаще переключать потоки
+
+    bank = RegisterBank()
+    stop = threading.Event()
+    # Значения без NaN/Inf, чтобы float сохранял битовый образ
+    serial_values = list(range(0x0101, 0x3f00, 0x0101))
+    tk_values = list(range(0x4040, 0x7f00, 0x0101))
+
+    threads = [
+        threading.Thread(target=writer, args=(bank, PRESSURE_MN1, serial_values, stop)),
+        threading.Thread(target=writer, args=(bank, PRESSURE_MN1, tk_values, stop)),
+    ]
+    for thread in threads:
+        thread.start()
+
+    reads = torn = raw_torn = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        if is_torn(bank.get_float(PRESSURE_MN1)):
+            torn += 1
+        low, high = bank[PRESSURE_MN1], bank[PRESSURE_MN1 + 1]
+        if low != high:
+            raw_torn += 1
+        reads += 1
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"чтений: {reads}")
+    print(f"разорванных float через get_float(): {torn}")
+    print(f"разорванных пар при чтении без блокировки: {raw_torn}")
+    return torn == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,9 +1,8 @@
-import struct
 import tkinter as tk
 import os
-from PIL import Image, ImageTk
 from tkinter import simpledialog
 from utils.constants_for_regs import *
+from utils.RegisterSubscriptions import RegisterSubscriptions
 import sys
 
 
@@ -18,9 +17,13 @@ class BaseFrame(tk.Frame):
 
         self.after_id = None
 
+        # Обработчики обновления виджетов по изменённым регистрам
+        self.subscriptions = RegisterSubscriptions()
+
         # Переменные для фона
         self.bg_image = None
-        self.bg_image_raw = None
+        self.bg_path = None
+        self.bg_size = None     # размер, под который масштабирован текущий фон
         self.bg_label = tk.Label(self)
         self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
@@ -34,10 +37,7 @@ class BaseFrame(tk.Frame):
         """Универсальная загрузка изображений с обработкой ошибок"""
         try:
             path = os.path.join(self.resources_dir, filename)
-            img = Image.open(path)
-            if size:
-                img = img.resize(size, Image.Resampling.LANCZOS)
-            return ImageTk.PhotoImage(img)
+            return self.controller.images.photo(path, size, fit=False)
         except Exception as e:
             print(f"Ошибка загрузки {filename}: {e}")
             return None
@@ -45,17 +45,17 @@ class BaseFrame(tk.Frame):
     def on_show_frame(self, event=None):
         # Метод, вызываемый при показе фрейма
         if self.__class__.__name__ == "MainMenu":
-            self.controller.slave.data_store["holding_registers"][CURRENT_FRAME_REG] = 3
+            self.controller.slave.registers[CURRENT_FRAME_REG] = 3
         if self.__class__.__name__ == "ManualMode":
-            self.controller.slave.data_store["holding_registers"][CURRENT_FRAME_REG] = 4
+            self.controller.slave.registers[CURRENT_FRAME_REG] = 4
         if self.__class__.__name__ == "CycleMode":
-            self.controller.slave.data_store["holding_registers"][CURRENT_FRAME_REG] = 5
+            self.controller.slave.registers[CURRENT_FRAME_REG] = 5
         if self.__class__.__name__ == "StatMode":
-            self.controller.slave.data_store["holding_registers"][CURRENT_FRAME_REG] = 6
+            self.controller.slave.registers[CURRENT_FRAME_REG] = 6
         if self.__class__.__name__ == "StatSettings":
-            self.controller.slave.data_store["holding_registers"][CURRENT_FRAME_REG] = 7
+            self.controller.slave.registers[CURRENT_FRAME_REG] = 7
         if self.__class__.__name__ == "CycleSettings":
-            self.controller.slave.data_store["holding_registers"][CURRENT_FRAME_REG] = 8
+            self.controller.slave.registers[CURRENT_FRAME_REG] = 8
 
     def on_hide_frame(self, event=None):
         """Вызывается при скрытии фрейма"""
@@ -63,28 +63,35 @@ class BaseFrame(tk.Frame):
 
     def set_background(self, image_path):
         """Установка фонового изображения с автоматическим масштабированием"""
+        self.bg_path = image_path
+        self.bg_size = None
+        # Фон под размер окна масштабируется в фоне, пока строятся остальные фреймы
         try:
-            self.bg_image_raw = Image.open(image_path)
-            self._resize_background()
+            self.controller.images.prefetch(image_path, self.controller.WINDOW_SIZE)
         except Exception as e:
             print(f"Ошибка загрузки фона: {e}")
+        self._resize_background()
 
     def _resize_background(self, event=None):
         """Масштабирование фонового изображения под текущий размер окна"""
-        if self.bg_image_raw:
+        if self.bg_path:
             # Получаем текущие размеры окна
             width = self.winfo_width()
             height = self.winfo_height()
 
-            if width > 0 and height > 0:
-                # Масштабируем изображение с сохранением пропорций
-                image = self.bg_image_raw.copy()
-                image.thumbnail((width, height), Image.Resampling.LANCZOS)
-
-                # Создаем изображение для Tkinter
-                self.bg_image = ImageTk.PhotoImage(image)
-                self.bg_label.config(image=self.bg_image)
-                self.bg_label.lower()  # Отправляем фон на задний план
+            # Размер не изменился (повторный Configure, tkraise) или фрейм ещё не размещён
+            if (width, height) == self.bg_size or width <= 1 or height <= 1:
+                return
+
+            try:
+                # Масштабированный с сохранением пропорций фон - из общего кэша
+                self.bg_image = self.controller.images.photo(self.bg_path, (width, height))
+            except Exception as e:
+                print(f"Ошибка загрузки фона: {e}")
+                return
+            self.bg_size = (width, height)
+            self.bg_label.config(image=self.bg_image)
+            self.bg_label.lower()  # Отправляем фон на задний план
                 
     def ask_value_in_range(self, title, prompt, initial_value, min_value, max_value, ask_float=False):
         """Диалог ввода числа в заданном диапазоне."""
@@ -118,27 +125,20 @@ class BaseFrame(tk.Frame):
         )
 
         if new_value is not None:
-
-            if ask_float:
-                f_bytes = struct.pack('<f', new_value)  # Упаковка float в байты
-                f_uint = struct.unpack('<I', f_bytes)[0]  # Преобразование в unsigned int
-                f_hex = f"{f_uint:08x}"  # Форматирование в 8-значный hex (с ведущими нулями)
-
-                # Теперь можно безопасно разбивать:
-                self.controller.slave.data_store["holding_registers"][regs] = int(f_hex[4:8], 16)  # Младшие 2 байта
-                self.controller.slave.data_store["holding_registers"][regs + 1] = int(f_hex[0:4], 16)  # Старшие 2 байта
-
+            # Тип регистра берётся из описания регистров
+            field = self.controller.register_map.by_address.get(regs)
+            if field is not None:
+                self.controller.register_map.encode(self.controller.slave.registers, field["name"], new_value)
+            elif ask_float:
+                self.controller.slave.registers.set_float(regs, new_value)
             else:
-                self.controller.slave.data_store["holding_registers"][regs] = new_value
+                self.controller.slave.registers[regs] = new_value
 
     def get_float_from_registers(self, start_reg):
         """Получение float значения из двух 16-битных регистров"""
         try:
-            register0 = self.controller.slave.data_store["holding_registers"][start_reg]
-            register1 = self.controller.slave.data_store["holding_registers"][start_reg + 1]
-            uint32 = (register1 << 16) | register0
-            return struct.unpack('<f', struct.pack('<I', uint32))[0]
-        except (KeyError, IndexError, struct.error) as e:
+            return self.controller.slave.registers.get_float(start_reg)
+        except IndexError as e:
             print(f"Error reading registers {start_reg}-{start_reg+1}: {e}")
             return 0.0  # Значение по умолчанию при ошибке
 
@@ -146,38 +146,70 @@ class BaseFrame(tk.Frame):
         if button.cget("style") == "NonActive.TButton":
 
             if reg in [START_AUTOMAT_N3_CYCLE_REG, START_AUTOMAT_N3_MANUAL_REG, START_AUTOMAT_N3_STAT_REG]:
-                self.controller.slave.data_store["holding_registers"][START_AUTOMAT_N3_CYCLE_REG] = 1
-                self.controller.slave.data_store["holding_registers"][START_AUTOMAT_N3_MANUAL_REG] = 1
-                self.controller.slave.data_store["holding_registers"][START_AUTOMAT_N3_STAT_REG] = 1
+                # Флаги всех режимов меняются одной транзакцией
+                with self.controller.slave.registers.transaction():
+                    self.controller.slave.registers[START_AUTOMAT_N3_CYCLE_REG] = 1
+                    self.controller.slave.registers[START_AUTOMAT_N3_MANUAL_REG] = 1
+                    self.controller.slave.registers[START_AUTOMAT_N3_STAT_REG] = 1
             else:
-                self.controller.slave.data_store["holding_registers"][reg] = 1
+                self.controller.slave.registers[reg] = 1
             button.configure(style="Active.TButton")
         else:
             if reg in [START_AUTOMAT_N3_CYCLE_REG, START_AUTOMAT_N3_MANUAL_REG, START_AUTOMAT_N3_STAT_REG]:
 
-                self.controller.slave.data_store["holding_registers"][START_AUTOMAT_N3_CYCLE_REG] = 0
-                self.controller.slave.data_store["holding_registers"][START_AUTOMAT_N3_MANUAL_REG] = 0
-                self.controller.slave.data_store["holding_registers"][START_AUTOMAT_N3_STAT_REG] = 0
+                # Флаги всех режимов меняются одной транзакцией
+                with self.controller.slave.registers.transaction():
+                    self.controller.slave.registers[START_AUTOMAT_N3_CYCLE_REG] = 0
+                    self.controller.slave.registers[START_AUTOMAT_N3_MANUAL_REG] = 0
+                    self.controller.slave.registers[START_AUTOMAT_N3_STAT_REG] = 0
             else:
-                self.controller.slave.data_store["holding_registers"][reg] = 0
+                self.controller.slave.registers[reg] = 0
             button.configure(style="NonActive.TButton")
 
     def update_button_state_by_register(self,  start_n3_reg, start_mode_reg):
-        if self.controller.slave.data_store["holding_registers"][start_n3_reg] == 1:
+        if self.controller.slave.registers[start_n3_reg] == 1:
             self.start_automat_n3.configure(style="Active.TButton")
-        if self.controller.slave.data_store["holding_registers"][start_n3_reg] == 0:
+        if self.controller.slave.registers[start_n3_reg] == 0:
             self.start_automat_n3.configure(style="NonActive.TButton")
 
-        if self.controller.slave.data_store["holding_registers"][start_mode_reg] == 1:
+        if self.controller.slave.registers[start_mode_reg] == 1:
             self.start_mode.configure(style="Active.TButton")
-        if self.controller.slave.data_store["holding_registers"][start_mode_reg] == 0:
+        if self.controller.slave.registers[start_mode_reg] == 0:
             self.start_mode.configure(style="NonActive.TButton")
 
+    def subscribe(self, reg, handler, count=1):
+        """Вызов handler при изменении регистров reg..reg+count-1, пока фрейм на экране"""
+        self.subscriptions.subscribe(reg, handler, count)
+
+    def subscribe_float_var(self, var, reg):
+        """Подписка Tk переменной на float из двух регистров"""
+        self.subscribe(reg, lambda: self.refresh_float_var(var, reg), count=2)
+
+    def subscribe_entry(self, entry, reg, is_float):
+        """Подписка поля ввода на регистр (или пару регистров для float)"""
+        self.subscribe(reg, lambda: self.refresh_entry(entry, reg, is_float), count=2 if is_float else 1)
+
+    def refresh_changed(self, dirty):
+        """Обновление виджетов, чьи регистры есть в маске dirty"""
+        self.subscriptions.dispatch(dirty)
+
+    def update_widgets(self):
+        """Полное обновление всех подписанных виджетов"""
+        self.refresh_changed(RegisterSubscriptions.ALL)
+
+    def refresh_float_var(self, var, reg):
+        # Переменная не трогается без изменения значения, чтобы не вызывать её trace
+        new_value = round(self.get_float_from_registers(reg), 1)
+        if var.get() != new_value:
+            var.set(new_value)
+
     def refresh_entry(self, entry, reg, is_float):
         if is_float:
             new_value = self.get_float_from_registers(reg)
         else:
-            new_value = self.controller.slave.data_store["holding_registers"][reg]
+            new_value = self.controller.slave.registers[reg]
+        if entry.get() == str(new_value):
+            return
         entry.config(state="normal")
         entry.delete(0, tk.END)
         entry.insert(0, str(new_value))
@@ -185,7 +217,7 @@ class BaseFrame(tk.Frame):
 
     def update_back_button_state(self, btn):
         # Получаем значение из хранилища
-        work_value = self.controller.slave.data_store["holding_registers"][WORK]
+        work_value = self.controller.slave.registers[WORK]
 
         # Устанавливаем состояние кнопки
         if work_value == 0:
@@ -1,7 +1,6 @@
 from frames.BaseFrame import BaseFrame
 from tkinter import ttk
 
-from utils.PressureGraph import PressureGraph
 from utils.constants_for_regs import *
 
 
@@ -54,22 +53,17 @@ class CycleMode(BaseFrame):
         self.cycles.place(x=655, y=97, width=68)
 
         # Инициализация графика
-        self.pressure_graph = PressureGraph(self)
-
-
-    def update_widgets(self):
-        mn1_value = self.get_float_from_registers(PRESSURE_MN1)
-        self.controller.mn1_mpa_var.set(round(mn1_value, 1))
-
-        # Обновление MN2
-        mn2_value = self.get_float_from_registers(PRESSURE_MN2)
-        self.controller.mn2_mpa_var.set(round(mn2_value, 1))
-
-        # Обновление скорости
-        speed_value = self.get_float_from_registers(SPEED)
-        self.controller.speed_mpa_var.set(round(speed_value, 1))
-
-        # Обновление циклов
-        self.controller.number_of_cycles_var.set(self.controller.slave.data_store["holding_registers"][NUMBER_OF_CYCLES])
-
-        self.update_back_button_state(self.btn_settings)
+        self.pressure_graph = self.controller.graph_class(self, store=self.controller.history,
+                                                          series="PRESSURE_MN1", span=self.controller.GRAPH_SPAN)
+
+        # Обновление виджетов по изменению регистров
+        self.subscribe_float_var(self.controller.mn1_mpa_var, PRESSURE_MN1)
+        self.subscribe_float_var(self.controller.mn2_mpa_var, PRESSURE_MN2)
+        self.subscribe_float_var(self.controller.speed_mpa_var, SPEED)
+        self.subscribe(NUMBER_OF_CYCLES, self.refresh_cycles)
+        self.subscribe(WORK, lambda: self.update_back_button_state(self.btn_settings))
+
+    def refresh_cycles(self):
+        cycles = self.controller.slave.registers[NUMBER_OF_CYCLES]
+        if self.controller.number_of_cycles_var.get() != cycles:
+            self.controller.number_of_cycles_var.set(cycles)
@@ -73,11 +73,11 @@ class CycleSettings(BaseFrame):
         btn_back.place(x=10, y=10, width=120, height=50)
         btn_start.place(x=601, y=12, width=120, height=50)
 
-    def reset_cycle_set_func(self):
-        self.controller.slave.data_store["holding_registers"][DROP_NUMBER_OF_CYCLES] = 1
+        # Обновление полей по изменению регистров
+        self.subscribe_entry(self.ent_pressure_end, PRESSURE_END_CYCLE, is_float=True)
+        self.subscribe_entry(self.ent_pressure_speed, PRESSURE_SPEED_CYCLE, is_float=True)
+        self.subscribe_entry(self.ent_time_pause, TIME_PAUSE_CYCLE, is_float=False)
+        self.subscribe_entry(self.cycle_need, CYCLES_NEED_CYCLE, is_float=False)
 
-    def update_widgets(self):
-        self.refresh_entry(self.ent_pressure_end, PRESSURE_END_CYCLE, is_float=True)
-        self.refresh_entry(self.ent_pressure_speed, PRESSURE_SPEED_CYCLE, is_float=True)
-        self.refresh_entry(self.ent_time_pause, TIME_PAUSE_CYCLE, is_float=False)
-        self.refresh_entry(self.cycle_need, CYCLES_NEED_CYCLE, is_float=False)
+    def reset_cycle_set_func(self):
+        self.controller.slave.registers[DROP_NUMBER_OF_CYCLES] = 1
@@ -19,6 +19,3 @@ class MainMenu(BaseFrame):
         btn_stat.place(x=200, y=130, width=395, height=68)
         btn_cycle.place(x=200, y=240, width=395, height=68)
         btn_manual.place(x=200, y=350, width=395, height=68)
-
-    def update_widgets(self):
-        pass
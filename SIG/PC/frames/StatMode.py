@@ -1,7 +1,6 @@
 from frames.BaseFrame import BaseFrame
 from tkinter import ttk
 
-from utils.PressureGraph import PressureGraph
 from utils.constants_for_regs import *
 
 
@@ -44,20 +43,11 @@ class StatMode(BaseFrame):
         self.start_valve.place(x=630, y=400, width=120, height=50)
 
         # Инициализация графика
-        self.pressure_graph = PressureGraph(self)
-
-
-    def update_widgets(self):
-        mn1_value = self.get_float_from_registers(PRESSURE_MN1)
-        self.controller.mn1_mpa_var.set(round(mn1_value, 1))
-
-        # Обновление MN2
-        mn2_value = self.get_float_from_registers(PRESSURE_MN2)
-        self.controller.mn2_mpa_var.set(round(mn2_value, 1))
-
-        # Обновление скорости
-        speed_value = self.get_float_from_registers(SPEED)
-        self.controller.speed_mpa_var.set(round(speed_value, 1))
-
-        self.update_back_button_state(self.btn_settings)
-
+        self.pressure_graph = self.controller.graph_class(self, store=self.controller.history,
+                                                          series="PRESSURE_MN1", span=self.controller.GRAPH_SPAN)
+
+        # Обновление виджетов по изменению регистров
+        self.subscribe_float_var(self.controller.mn1_mpa_var, PRESSURE_MN1)
+        self.subscribe_float_var(self.controller.mn2_mpa_var, PRESSURE_MN2)
+        self.subscribe_float_var(self.controller.speed_mpa_var, SPEED)
+        self.subscribe(WORK, lambda: self.update_back_button_state(self.btn_settings))
@@ -78,10 +78,9 @@ class StatSettings(BaseFrame):
 
         self.time_wait_2.place(x=454, y=414, width=112)
 
-    def update_widgets(self):
-        self.refresh_entry(self.ent_pressure_end, PRESSURE_END_STAT, is_float=True)
-        self.refresh_entry(self.ent_pressure_mid, PRESSURE_MID_STAT, is_float=True)
-        self.refresh_entry(self.ent_speed, PRESSURE_SPEED_STAT, is_float=True)
-        self.refresh_entry(self.time_wait_1, TIME_WAIT_1_STAT, is_float=False)
-        self.refresh_entry(self.time_wait_2, TIME_WAIT_2_STAT, is_float=False)
-
+        # Обновление полей по изменению регистров
+        self.subscribe_entry(self.ent_pressure_end, PRESSURE_END_STAT, is_float=True)
+        self.subscribe_entry(self.ent_pressure_mid, PRESSURE_MID_STAT, is_float=True)
+        self.subscribe_entry(self.ent_speed, PRESSURE_SPEED_STAT, is_float=True)
+        self.subscribe_entry(self.time_wait_1, TIME_WAIT_1_STAT, is_float=False)
+        self.subscribe_entry(self.time_wait_2, TIME_WAIT_2_STAT, is_float=False)
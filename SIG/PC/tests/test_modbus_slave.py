@@ -0,0 +1,110 @@
+"""
+Тесты запуска и остановки ModbusSlave.
+
+Запуск из каталога SIG/PC:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import serial
+
+from utils.ModbusSlave import ModbusSlave
+
+SLAVE_ID = 2
+
+
+class StartStopTest(unittest.TestCase):
+    def setUp(self):
+        self.slave = ModbusSlave(slave_id=SLAVE_ID)
+        self.detections = 0
+
+    def detect(self, stop=False):
+        def auto_detect_port():
+            self.detections += 1
+            if stop:
+                # Окно закрыли, пока порт определялся
+                self.slave.stop()
+            return True
+        self.slave._auto_detect_port = auto_detect_port
+
+    def test_stop_without_start(self):
+        self.slave.stop()
+        self.assertIsNone(self.slave.thread)
+        self.assertFalse(self.slave.running)
+
+    def test_start_after_stop(self):
+        self.detect()
+        self.slave.stop()
+        self.slave.start()
+        self.assertEqual(self.detections, 0)
+        self.assertIsNone(self.slave.thread)
+
+    def test_stop_during_detection(self):
+        self.detect(stop=True)
+        self.slave.start()
+        self.assertEqual(self.detections, 1)
+        self.assertIsNone(self.slave.thread)
+        self.assertFalse(self.slave.running)
+        self.assertFalse(self.slave.serial.is_open)
+
+
+class ProbeSerial:
+    """Порт проверки: на "good" сразу приходит запрос, остальные молчат до таймаута чтения"""
+
+    request = b""
+
+    def __init__(self, port, timeout, **settings):
+        self.port = port
+        self.timeout = timeout
+        self.is_open = True
+        self.pending = self.request if port == "good" else b""
+
+    @property
+    def in_waiting(self):
+        return len(self.pending)
+
+    def read(self, size=1):
+        if not self.pending:
+            time.sleep(self.timeout)
+            return b""
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def close(self):
+        self.is_open = False
+
+
+class ProbePortsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="sig_probe_")
+        self.slave = ModbusSlave(slave_id=SLAVE_ID)
+        self.slave.PORT_CACHE_FILE = os.path.join(self.directory, "port.json")
+        self.slave.PROBE_READ_TIMEOUT = 0.2
+        request = bytearray([SLAVE_ID, 0x03, 0, 8, 0, 4])
+        ProbeSerial.request = bytes(request + self.slave._calculate_crc(request))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_detected_request_is_fresh(self):
+        # Молчащие порты заняты чтением ещё 0.2 с - найденный порт их не ждёт
+        with mock.patch.object(serial, "Serial", ProbeSerial):
+            self.assertTrue(self.slave._probe_ports(["quiet1", "good", "quiet2"], timeout=1.0))
+        self.assertEqual(self.slave.port, "good")
+        self.assertEqual(self.slave.detected_requests, [ProbeSerial.request])
+        self.assertLess(time.perf_counter() - self.slave.detected_at, ModbusSlave.DETECTED_REQUEST_MAX_AGE)
+
+    def test_no_request_on_any_port(self):
+        self.slave.PROBE_READ_TIMEOUT = 0.01
+        with mock.patch.object(serial, "Serial", ProbeSerial):
+            self.assertFalse(self.slave._probe_ports(["quiet1", "quiet2"], timeout=0.05))
+        self.assertIsNone(self.slave.port)
+
+
+if __name__ == "__main__":
+    unittest.main()
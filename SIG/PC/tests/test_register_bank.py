@@ -0,0 +1,95 @@
+"""
+Тесты разделяемой памяти RegisterBank.
+
+Запуск из каталога SIG/PC:
+    python -m pytest tests
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+from utils.RegisterBank import RegisterBank
+from utils.RegisterBankReader import RegisterBankReader
+
+SHARED_NAME = f"sig_test_registers_{os.getpid()}"
+
+OWNER = f"""
+import sys
+from utils.RegisterBank import RegisterBank
+bank = RegisterBank(16, shared_name={SHARED_NAME!r})
+bank[0] = 7
+print("ready", flush=True)
+sys.stdin.readline()
+bank.close()
+"""
+
+# Владелец начинает запись и завершается (или ждёт), не закончив её
+STALLED_WRITER = f"""
+import os
+import sys
+from utils.RegisterBank import RegisterBank
+bank = RegisterBank(16, shared_name={SHARED_NAME!r})
+bank.__enter__()
+print("ready", flush=True)
+if sys.stdin.readline().strip() == "die":
+    os._exit(0)
+bank.__exit__(None, None, None)
+bank.close()
+"""
+
+PC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SharedRegisterBankTest(unittest.TestCase):
+    def test_live_segment_is_not_taken_over(self):
+        owner = subprocess.Popen([sys.executable, "-c", OWNER], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                 text=True, cwd=PC_DIR)
+        try:
+            self.assertEqual(owner.stdout.readline().strip(), "ready")
+            with self.assertRaises(FileExistsError):
+                RegisterBank(16, shared_name=SHARED_NAME)
+
+            reader = RegisterBankReader(SHARED_NAME)
+            self.assertEqual(reader.words[0], 7)
+            reader.close()
+        finally:
+            owner.communicate("\n", timeout=10)
+        self.assertEqual(owner.returncode, 0)
+
+    def test_close_after_segment_removed(self):
+        bank = RegisterBank(16, shared_name=SHARED_NAME)
+        subprocess.run([sys.executable, "-c",
+                        "from multiprocessing import shared_memory\n"
+                        f"segment = shared_memory.SharedMemory({SHARED_NAME!r})\n"
+                        "segment.close()\n"
+                        "segment.unlink()\n"], check=True)
+        bank.close()
+        self.assertIsNone(bank.shared)
+
+    def stalled_reader(self):
+        writer = subprocess.Popen([sys.executable, "-c", STALLED_WRITER], stdin=subprocess.PIPE,
+                                  stdout=subprocess.PIPE, text=True, cwd=PC_DIR)
+        self.assertEqual(writer.stdout.readline().strip(), "ready")
+        reader = RegisterBankReader(SHARED_NAME)
+        reader.WRITE_TIMEOUT = 0.05
+        self.addCleanup(reader.close)
+        return writer, reader
+
+    def test_write_by_live_owner_times_out(self):
+        writer, reader = self.stalled_reader()
+        try:
+            with self.assertRaisesRegex(TimeoutError, "не завершилась"):
+                reader.get_float(0)
+        finally:
+            writer.communicate("\n", timeout=10)
+
+    def test_owner_died_during_write(self):
+        writer, reader = self.stalled_reader()
+        writer.communicate("die\n", timeout=10)
+        with self.assertRaisesRegex(TimeoutError, "завершился"):
+            reader.snapshot()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Тесты сборщика кадров RtuReceiver с длинами кадров ModbusSlave.
+
+Запуск из каталога SIG/PC:
+    python -m pytest tests
+"""
+import unittest
+
+from utils.ModbusSlave import ModbusSlave
+
+SLAVE_ID = 2
+
+
+class RtuReceiverTest(unittest.TestCase):
+    def setUp(self):
+        self.slave = ModbusSlave(slave_id=SLAVE_ID)
+        self.receiver = self.slave._create_receiver()
+        self.silence = self.receiver.frame_silence
+
+    def frame(self, *data):
+        data = bytearray(data)
+        return bytes(data + self.slave._calculate_crc(data))
+
+    def read_request(self):
+        return self.frame(SLAVE_ID, 0x03, 0, 8, 0, 4)
+
+    def test_frames_back_to_back(self):
+        request = self.read_request()
+        self.assertEqual(self.receiver.feed(request + request, 1.0), [request, request])
+        self.assertTrue(self.receiver.idle)
+
+    def test_frame_split_between_reads(self):
+        request = self.read_request()
+        self.assertEqual(self.receiver.feed(request[:3], 1.0), [])
+        self.assertEqual(self.receiver.feed(request[3:], 1.001), [request])
+
+    def test_implausible_write_header_is_noise(self):
+        # 0x10 на 16 регистров со счётчиком 0xFF - не ждём 264 байта
+        request = self.read_request()
+        frames = self.receiver.feed(b"\x02\x10\x00\x00\x00\x10\xff" + request, 1.0)
+        self.assertEqual(frames, [request])
+        self.assertEqual(self.receiver.recovered, 1)
+        self.assertEqual(self.receiver.check_silence(1.0 + self.silence), [])
+        self.assertEqual(self.receiver.lost, 0)
+
+    def test_implausible_read_write_header_is_noise(self):
+        request = self.read_request()
+        noise = bytes([SLAVE_ID, 0x17, 0, 0, 0, 4, 0, 0, 0, 122, 244])
+        self.assertEqual(self.receiver.feed(noise + request, 1.0), [request])
+
+    def test_silence_recovers_frame_behind_plausible_noise(self):
+        # Правдоподобный заголовок 0x10 обещает 41 байт - кадр за ним ждёт паузы
+        request = self.read_request()
+        self.assertEqual(self.receiver.feed(b"\x02\x10\x00\x00\x00\x10\x20" + request, 1.0), [])
+        self.assertIsNone(self.receiver.check_silence(1.0 + self.silence / 2))
+        self.assertEqual(self.receiver.check_silence(1.0 + self.silence), [request])
+        self.assertEqual(self.receiver.recovered, 1)
+        self.assertTrue(self.receiver.idle)
+
+    def test_silence_drops_incomplete_frame(self):
+        request = self.read_request()
+        self.assertEqual(self.receiver.feed(request[:5], 1.0), [])
+        self.assertEqual(self.receiver.check_silence(1.0 + self.silence), [])
+        self.assertEqual(self.receiver.dropped, 1)
+        self.assertTrue(self.receiver.idle)
+
+    def test_write_multiple_length(self):
+        request = self.frame(SLAVE_ID, 0x10, 0, 8, 0, 2, 4, 0x41, 0xC8, 0, 0)
+        self.assertEqual(self.slave._get_expected_rtu_length(request), len(request))
+        self.assertEqual(self.receiver.feed(request, 1.0), [request])
+
+
+if __name__ == "__main__":
+    unittest.main()
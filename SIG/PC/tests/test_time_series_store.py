@@ -0,0 +1,94 @@
+"""
+Тесты файла вытеснения истории TimeSeriesStore.
+
+Запуск из каталога SIG/PC:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from utils.GraphView import GraphView
+from utils.TimeSeriesStore import TimeSeriesStore, read_spill
+
+POINTS = 25
+
+
+class SpillFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="sig_history_")
+        self.path = os.path.join(self.directory, "history.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_session(self, series):
+        store = TimeSeriesStore(series, capacity=10, spill_path=self.path, spill_block=4)
+        for i in range(POINTS):
+            store.append({name: i for name in series}, timestamp=i)
+        store.close()
+        return store
+
+    def test_new_file_per_session(self):
+        first = self.run_session(("A",))
+        second = self.run_session(("A", "B"))
+        self.assertEqual(first.spill_path, self.path)
+        self.assertNotEqual(second.spill_path, first.spill_path)
+
+        # История прошлого запуска (например, до сбоя) не затирается
+        previous = read_spill(first.spill_path)
+        self.assertEqual(len(previous), POINTS)
+        self.assertEqual(previous.dtype.names, ("time", "A"))
+
+        history = second.read_spill()
+        self.assertEqual(len(history), POINTS)
+        self.assertEqual(history.dtype.names, ("time", "A", "B"))
+        self.assertEqual(list(history["time"][:3]), [0, 1, 2])
+
+    def test_layout_from_header(self):
+        self.run_session(("A", "B"))
+        history = read_spill(self.path)
+        self.assertEqual(history.dtype.names, ("time", "A", "B"))
+        self.assertEqual(history["B"][-1], POINTS - 1)
+
+    def test_empty_session(self):
+        store = TimeSeriesStore(("A",), spill_path=self.path)
+        store.close()
+        self.assertEqual(len(store.read_spill()), 0)
+
+    def test_foreign_file_rejected(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            read_spill(self.path)
+
+
+class HeadlessGraph(GraphView):
+    def _render(self, x, y):
+        pass
+
+
+class LabelTest(unittest.TestCase):
+    def test_millisecond_labels(self):
+        store = TimeSeriesStore(("A",))
+        moment = datetime(2026, 10, 18, 8, 30, 15)
+        timestamp = int(moment.timestamp()) * 1_000_000_000
+        self.assertEqual(store.label(timestamp + 50_000_000), "08:30:15")
+        self.assertEqual(store.label(timestamp + 50_000_000, "%M:%S.%f"), "30:15.050")
+        self.assertEqual(store.label(timestamp + 999_999_999, "%M:%S.%f"), "30:15.999")
+
+    def test_sub_second_zoom_labels_differ(self):
+        # 8 точек при 20 Гц - 0.4 с на всё окно
+        view = HeadlessGraph(None, store=TimeSeriesStore(("pressure",)), span=8)
+        start = int(datetime(2026, 10, 18, 8, 30, 15).timestamp()) * 1_000_000_000
+        step = 1_000_000_000 // 20
+        for i in range(8):
+            view.store.append({"pressure": 25.0}, timestamp=start + i * step)
+        view._trace()
+        self.assertEqual(len(set(view.labels)), len(view.labels))
+
+
+if __name__ == "__main__":
+    unittest.main()
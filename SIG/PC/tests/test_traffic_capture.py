@@ -0,0 +1,65 @@
+"""
+Тесты записи захвата TrafficCapture.
+
+Запуск из каталога SIG/PC:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.TrafficCapture import TrafficCapture, read_capture
+
+SLOTS = 8
+
+
+class OvertakingView:
+    """Кольцо, в которое поток Modbus пишет новые кадры, пока поток записи копирует слоты"""
+
+    def __init__(self, capture, frames):
+        self.capture = capture
+        self.view = capture.ring_view
+        self.frames = list(frames)
+
+    def __getitem__(self, item):
+        if self.frames:
+            self.capture.record(TrafficCapture.TX, self.frames.pop(0))
+        return self.view[item]
+
+
+class TrafficCaptureTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="sig_capture_")
+        self.path = os.path.join(self.directory, "traffic.sigcap")
+        self.capture = TrafficCapture(self.path, slots=SLOTS)
+        self.capture._open_file()
+
+    def tearDown(self):
+        self.capture.stop()
+        shutil.rmtree(self.directory)
+
+    def test_flush_all_records(self):
+        for i in range(SLOTS - 1):
+            self.capture.record(TrafficCapture.RX, bytes([i]) * (i + 1))
+        self.capture.stop()
+        frames = [frame for _, _, _, _, frame in read_capture(self.path)]
+        self.assertEqual(frames, [bytes([i]) * (i + 1) for i in range(SLOTS - 1)])
+
+    def test_overtaken_slots_are_dropped(self):
+        # Кольцо заполнено; во время копирования приходят ещё 3 кадра другой длины
+        for i in range(SLOTS):
+            self.capture.record(TrafficCapture.RX, bytes([i]) * 4)
+        self.capture.ring_view = OvertakingView(self.capture, [b"\xee" * 200] * 3)
+        self.capture._flush()
+        self.capture.ring_view = self.capture.ring_view.view
+        self.capture.stop()
+
+        # Перезаписаны слоты 0-2, слот 3 мог бы писаться следующим - тоже отброшен
+        frames = [frame for _, _, _, _, frame in read_capture(self.path)]
+        self.assertEqual(frames, [bytes([i]) * 4 for i in range(4, SLOTS)] + [b"\xee" * 200] * 3)
+        self.assertEqual(self.capture.lost, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
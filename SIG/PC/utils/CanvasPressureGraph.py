@@ -0,0 +1,104 @@
+import tkinter as tk
+
+import numpy as np
+
+from utils.GraphView import GraphView
+
+
+class CanvasPressureGraph(GraphView):
+    """
+    График давления элементами Tk canvas, без matplotlib.
+
+    Рамка, сетка, подписи оси давления и заголовки рисуются один раз
+    (и заново только при изменении размера холста). Линия давления - один
+    элемент line, при обновлении у него меняются только координаты;
+    подписи времени - восемь элементов text, текст меняется, только
+    если подпись изменилась. Растеризацию и вывод делает сам Tk, фигуры
+    matplotlib нет совсем - быстрее запуск и меньше память.
+
+    Данные, прокрутка, масштаб и пропуск скрытых графиков - в GraphView.
+    """
+
+    MARGINS = (48, 10, 10, 34)  # отступы области графика: слева, справа, сверху, снизу, пикс.
+    Y_STEP = 10                 # шаг сетки по давлению
+    FONT = ("Arial", 8)
+
+    def __init__(self, parent, x=10, y=230, width=500, height=210, store=None, series="pressure", span=None):
+        """
+        :param parent: фрейм графика
+        :param store: общее хранилище истории (None - своё, данные через update_data)
+        :param series: имя показываемого ряда в хранилище
+        :param span: точек в окне по умолчанию (None - по точке на деление)
+        """
+        super().__init__(parent, x, y, width, height, store=store, series=series, span=span)
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg="white", highlightthickness=0)
+        self.canvas.place(x=x, y=y, width=width, height=height)
+
+        self.line = self.canvas.create_line(0, 0, 0, 0, fill="blue", width=2)
+        self.tick_texts = [self.canvas.create_text(0, 0, text="", anchor="n", font=self.FONT)
+                           for _ in range(self.max_visible_points)]
+        self.shown_labels = [""] * self.max_visible_points
+        self._layout(width, height)
+        self.canvas.bind("<Configure>", self._on_configure)
+
+    def _layout(self, width, height):
+        """Статичная часть графика и положения подписей времени"""
+        self.width, self.height = width, height
+        left, right, top, bottom = self.MARGINS
+        self.plot = (left, top, width - right, height - bottom)
+        x0, y0, x1, y1 = self.plot
+
+        self.canvas.delete("static")
+        for value in range(self.Y_LIMITS[0], self.Y_LIMITS[1] + 1, self.Y_STEP):
+            y = self._y_px(value)
+            self.canvas.create_line(x0, y, x1, y, fill="#b0b0b0", tags="static")
+            self.canvas.create_text(x0 - 4, y, text=str(value), anchor="e", font=self.FONT, tags="static")
+        for i in range(self.max_visible_points):
+            x = self._x_px(i)
+            self.canvas.create_line(x, y0, x, y1, fill="#b0b0b0", tags="static")
+            self.canvas.coords(self.tick_texts[i], x, y1 + 3)
+        self.canvas.create_rectangle(x0, y0, x1, y1, outline="black", tags="static")
+        self.canvas.create_text(x0 + (x1 - x0) / 2, height - 2, text="Время", anchor="s", font=self.FONT,
+                                tags="static")
+        self.canvas.create_text(10, y0 + (y1 - y0) / 2, text="Давление (МПа)", angle=90, font=self.FONT,
+                                tags="static")
+        self.canvas.tag_raise(self.line)
+
+    def _on_configure(self, event):
+        if (event.width, event.height) != (self.width, self.height):
+            self._layout(event.width, event.height)
+            self._update_graph()
+
+    def _x_px(self, x):
+        x0, _, x1, _ = self.plot
+        return x0 + x * (x1 - x0) / (self.max_visible_points - 1)
+
+    def _y_px(self, y):
+        _, y0, _, y1 = self.plot
+        low, high = self.Y_LIMITS
+        return y1 - (np.clip(y, low, high) - low) * (y1 - y0) / (high - low)
+
+    def _render(self, x, y):
+        finite = np.isfinite(y)
+        if not finite.all():
+            x, y = x[finite], y[finite]
+        if len(x):
+            coords = np.column_stack((self._x_px(x), self._y_px(y))).ravel().tolist()
+            if len(coords) == 2:
+                coords *= 2     # у линии Tk не меньше двух точек
+        else:
+            coords = [0, 0, 0, 0]
+        self.canvas.coords(self.line, coords)
+        self.canvas.itemconfigure(self.line, state="normal" if len(x) else "hidden")
+
+        for i, item in enumerate(self.tick_texts):
+            label = self.labels[i] if i < len(self.labels) else ""
+            if self.shown_labels[i] != label:
+                self.canvas.itemconfigure(item, text=label)
+                self.shown_labels[i] = label
+
+    def cleanup(self):
+        """Очистка ресурсов"""
+        super().cleanup()
+        if self.canvas.winfo_exists():
+            self.canvas.destroy()
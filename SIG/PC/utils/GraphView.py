@@ -0,0 +1,189 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from utils.TimeSeriesStore import TimeSeriesStore
+
+
+class GraphView:
+    """
+    Общая часть графиков давления, не зависящая от способа отрисовки.
+
+    Данные графика - один ряд общего TimeSeriesStore: несколько графиков
+    показывают одну историю, каждый со своим смещением прокрутки и
+    масштабом. Окно любой длины, от 8 точек до всего испытания, строится
+    по огибающей min/max пирамиды хранилища. Здесь же кнопки прокрутки и
+    масштаба и пропуск отрисовки, пока фрейм графика скрыт: данные
+    накапливаются, а при показе график догоняет их одной перерисовкой.
+
+    Наследники (PressureGraph - matplotlib, CanvasPressureGraph - Tk canvas)
+    реализуют только _render(x, y): вывод линии и подписей self.labels.
+    Координата x линии - в делениях оси времени (0 ... max_visible_points - 1),
+    y - значение ряда.
+    """
+
+    Y_LIMITS = (0, 50)
+    MAX_INTERVALS = 300     # интервалов огибающей на окно - время отрисовки не зависит от истории
+    ZOOM_FACTOR = 4
+    # (шаг делений меньше, с; формат); %f - миллисекунды (TimeSeriesStore.label)
+    LABEL_FORMATS = ((1, "%M:%S.%f"), (60, "%H:%M:%S"), (3 * 3600, "%H:%M"), (None, "%d %H:%M"))
+
+    def __init__(self, parent, x=10, y=230, width=500, height=210, store=None, series="pressure", span=None):
+        """
+        :param parent: фрейм графика (None - без Tk)
+        :param store: общее хранилище истории (None - своё, данные через update_data)
+        :param series: имя показываемого ряда в хранилище
+        :param span: точек в окне по умолчанию (None - по точке на деление)
+        """
+        self.parent = parent
+        self.store = store if store is not None else TimeSeriesStore((series,))
+        self.series = series
+        self.store.add_series(series)
+        self.store.subscribe(self._on_append)
+        self.current_x_offset = 0
+        self.max_visible_points = 8     # делений оси времени
+        self.default_span = span or self.max_visible_points
+        self.span = self.default_span   # точек в окне (масштаб)
+        self.labels = []
+        self.visible = parent is None   # фрейм с графиком показывается событием <<ShowFrame>>
+        self.stale = False              # есть данные, не выведенные на экран
+
+        if parent is not None:
+            parent.bind("<<ShowFrame>>", self._on_show, add="+")
+            parent.bind("<<HideFrame>>", self._on_hide, add="+")
+
+            # Кнопки управления
+            self._create_controls(x, y + height + 10, width)
+
+    def _create_controls(self, x, y, width):
+        control_frame = ttk.Frame(self.parent)
+        control_frame.place(x=x, y=y, width=width)
+
+        self.btn_left = ttk.Button(control_frame, text="← Влево", command=self.scroll_left)
+        self.btn_left.pack(side=tk.LEFT, padx=5)
+
+        self.btn_right = ttk.Button(control_frame, text="→ Вправо", command=self.scroll_right)
+        self.btn_right.pack(side=tk.LEFT, padx=5)
+
+        self.btn_zoom_in = ttk.Button(control_frame, text="+ Ближе", command=self.zoom_in)
+        self.btn_zoom_in.pack(side=tk.LEFT, padx=5)
+
+        self.btn_zoom_out = ttk.Button(control_frame, text="− Дальше", command=self.zoom_out)
+        self.btn_zoom_out.pack(side=tk.LEFT, padx=5)
+
+        self.btn_reset = ttk.Button(control_frame, text="Сброс", command=self.reset_view)
+        self.btn_reset.pack(side=tk.LEFT, padx=5)
+
+    def _on_show(self, event=None):
+        self.visible = True
+        if self.stale:
+            self._update_graph()
+
+    def _on_hide(self, event=None):
+        self.visible = False
+
+    def update_data(self, new_pressure):
+        """Добавление точки в ряд графика (вызывается извне)"""
+        self.store.append({self.series: new_pressure})
+
+    def _on_append(self):
+        if self.current_x_offset == 0:
+            self._update_graph()
+
+    def _visible_range(self):
+        """Окно [start, end) в номерах точек от начала истории"""
+        end_idx = self.store.count - self.current_x_offset
+        start_idx = max(0, end_idx - self.span)
+        return start_idx, end_idx
+
+    def _update_graph(self):
+        """Внутренний метод обновления графика"""
+        if not self.store.count:
+            return
+
+        # Скрытый график не рисуется - догонит при показе
+        if not self.visible:
+            self.stale = True
+            return
+        self.stale = False
+
+        self._render(*self._trace())
+
+    def _render(self, x, y):
+        raise NotImplementedError
+
+    def _trace(self):
+        """
+        Линия и подписи времени видимого окна
+
+        Окно из span точек растягивается на max_visible_points делений.
+        Данные берутся огибающей хранилища не более чем из MAX_INTERVALS
+        интервалов; для интервала из нескольких точек линия проходит через
+        его минимум и максимум, так что пики видны при любом масштабе.
+
+        :return: (x в делениях, y) линии; подписи - в self.labels
+        """
+        start_idx, end_idx = self._visible_range()
+        envelope = self.store.envelope(self.series, start_idx, end_idx, self.MAX_INTERVALS)
+        index = envelope["index"]
+        scale = (self.max_visible_points - 1) / max(1, self.span - 1)
+
+        if len(index) > 1 and index[1] - index[0] > 1:
+            centers = index + (index[1] - index[0] - 1) / 2
+            x = np.repeat((centers - start_idx) * scale, 2)
+            y = np.column_stack((envelope["min"], envelope["max"])).ravel()
+        else:
+            x = (index - start_idx) * scale
+            y = envelope["min"]
+
+        points = [start_idx + round(i / scale) for i in range(self.max_visible_points)]
+        times = [self.store.time_at(point) for point in points if point < end_idx]
+        fmt = self._label_format((times[-1] - times[0]) / max(1, len(times) - 1))
+        self.labels = [self.store.label(timestamp, fmt) for timestamp in times]
+        return x, y
+
+    def _label_format(self, step_ns):
+        """
+        Формат подписей по шагу между делениями: при крупном шаге подписи
+        грубее и меняются реже, а не каждую секунду; при шаге меньше
+        секунды (крупный масштаб при частом опросе) - с миллисекундами
+        """
+        for max_step, fmt in self.LABEL_FORMATS:
+            if max_step is None or step_ns < max_step * 1_000_000_000:
+                return fmt
+
+    def _scroll_step(self):
+        return max(1, self.span // self.max_visible_points)
+
+    def scroll_left(self):
+        if self.store.count > self.span:
+            self.current_x_offset = min(
+                self.current_x_offset + self._scroll_step(),
+                self.store.count - self.span
+            )
+            self._update_graph()
+
+    def scroll_right(self):
+        self.current_x_offset = max(0, self.current_x_offset - self._scroll_step())
+        self._update_graph()
+
+    def zoom_in(self):
+        """Приблизить: окно в ZOOM_FACTOR раз короче, правый край на месте"""
+        self.span = max(self.max_visible_points, self.span // self.ZOOM_FACTOR)
+        self._update_graph()
+
+    def zoom_out(self):
+        """Отдалить: окно в ZOOM_FACTOR раз длиннее, не больше всего испытания"""
+        self.span = max(self.max_visible_points, min(self.span * self.ZOOM_FACTOR, self.store.count))
+        self.current_x_offset = min(self.current_x_offset, max(0, self.store.count - self.span))
+        self._update_graph()
+
+    def reset_view(self):
+        self.current_x_offset = 0
+        self.span = self.default_span
+        self._update_graph()
+
+    def cleanup(self):
+        """Очистка ресурсов"""
+        self.store.unsubscribe(self._on_append)
@@ -0,0 +1,120 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PIL import Image, ImageTk
+
+
+class ImageCache:
+    """
+    Общий кэш изображений HMI: фоны фреймов и картинки кнопок.
+
+    Каждый файл читается и декодируется один раз, масштабирование под
+    размер (file, size) выполняется один раз - повторный запрос того же
+    размера отдаёт готовое изображение. Масштабирование можно заранее
+    поставить в фоновый поток (prefetch): Pillow отпускает GIL на время
+    resize, и пока строятся фреймы, фоны уже готовятся под размер окна.
+    PhotoImage для Tk создаются только в потоке Tk и тоже кэшируются.
+    Хранится не больше MAX_ENTRIES размеров, старые вытесняются (например,
+    при перетаскивании границы окна).
+    """
+
+    MAX_ENTRIES = 64
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.originals = {}     # путь -> декодированное изображение
+        self.scaled = {}        # (путь, размер, fit) -> Future с масштабированным изображением
+        self.photos = {}        # (путь, размер, fit) -> PhotoImage
+        self.executor = None
+
+        # Счётчики
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path, size, fit):
+        return os.path.abspath(path), tuple(size) if size else None, fit
+
+    def _original(self, path):
+        with self.lock:
+            image = self.originals.get(path)
+        if image is None:
+            image = Image.open(path)
+            image.load()
+            with self.lock:
+                image = self.originals.setdefault(path, image)
+        return image
+
+    def _scale(self, key):
+        path, size, fit = key
+        image = self._original(path)
+        if size is None:
+            return image
+        if fit:
+            # Вписать с сохранением пропорций, не увеличивая (как Image.thumbnail)
+            image = image.copy()
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+            return image
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+    def _future(self, key, background):
+        """Future масштабирования key: уже поставленное или новое"""
+        with self.lock:
+            future = self.scaled.get(key)
+            if future is not None:
+                self.hits += 1
+                return future
+            self.misses += 1
+            if background:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ImageCache")
+                future = self.executor.submit(self._scale, key)
+                self._store(self.scaled, key, future)
+                return future
+
+        # Масштабирование в текущем потоке
+        future = Future()
+        try:
+            future.set_result(self._scale(key))
+        except Exception as e:
+            future.set_exception(e)
+            return future
+        with self.lock:
+            if key in self.scaled:
+                return self.scaled[key]
+            self._store(self.scaled, key, future)
+        return future
+
+    def _store(self, cache, key, value):
+        if len(cache) >= self.MAX_ENTRIES:
+            cache.pop(next(iter(cache)))
+        cache[key] = value
+
+    def prefetch(self, path, size, fit=True):
+        """Поставить масштабирование в фоновый поток (из любого потока)"""
+        self._future(self._key(path, size, fit), background=True)
+
+    def image(self, path, size=None, fit=True):
+        """
+        Масштабированное изображение Pillow (общее - не изменять)
+
+        :param path: путь к файлу
+        :param size: (ширина, высота) или None - исходный размер
+        :param fit: True - вписать с сохранением пропорций, False - ровно size
+        """
+        return self._future(self._key(path, size, fit), background=False).result()
+
+    def photo(self, path, size=None, fit=True):
+        """PhotoImage для Tk (только из потока Tk), один на файл и размер"""
+        key = self._key(path, size, fit)
+        photo = self.photos.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self._future(key, background=False).result())
+            self._store(self.photos, key, photo)
+        return photo
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,155 @@
+import io
+import selectors
+import threading
+import time
+
+import serial
+
+from utils.ModbusSlave import ModbusSlave
+
+
+class ModbusHost:
+    """
+    Хост нескольких Modbus Slave (стендов) в одном процессе.
+
+    К хосту добавляются последовательные порты, а к каждому порту - адреса
+    устройств. Каждый адрес обслуживается своим ModbusSlave со своим банком
+    регистров, кэшем, колбэками и записью обмена. Все порты читает один
+    поток: он ждёт данные сразу на всех портах через selectors, кадры
+    собирает RtuReceiver порта и передаёт слейву по адресу из кадра.
+
+    На платформах, где у порта нет файлового дескриптора (Windows), поток
+    опрашивает in_waiting всех портов раз в POLL_INTERVAL.
+    """
+
+    IDLE_TIMEOUT = 0.1      # наибольшее ожидание данных, с (проверка остановки)
+    POLL_INTERVAL = 0.001   # период опроса портов без дескриптора, с
+
+    def __init__(self):
+        self.ports = {}     # имя порта -> параметры, слейвы, порт и сборщик кадров
+        self.thread = None
+        self.running = False
+
+    def add_port(self, port, baudrate=9600, bytesize=8, parity="E", stopbits=1):
+        """
+        Добавление последовательного порта (линии RS-485)
+
+        :param port: имя порта
+        :param baudrate: скорость
+        """
+        self.ports[port] = {
+            "settings": {"baudrate": baudrate, "bytesize": bytesize, "parity": parity, "stopbits": stopbits},
+            "units": {},
+            "serial": None,
+            "receiver": None,
+        }
+
+    def add_unit(self, port, slave_id, **kwargs):
+        """
+        Добавление устройства на линию
+
+        :param port: имя порта, добавленного через add_port()
+        :param slave_id: адрес устройства на линии
+        :param kwargs: остальные параметры ModbusSlave (registers, capture, ...)
+        :return: ModbusSlave устройства - для колбэков и доступа к регистрам
+        """
+        line = self.ports[port]
+        if slave_id in line["units"]:
+            raise ValueError(f"Адрес {slave_id} уже занят на порту {port}")
+
+        slave = ModbusSlave(slave_id=slave_id, rx_mode=ModbusSlave.RX_MODE_FRAME, **line["settings"], **kwargs)
+        slave.port = port
+        line["units"][slave_id] = slave
+        return slave
+
+    def start(self):
+        """Открытие портов и запуск общего потока обработки"""
+        for port, line in self.ports.items():
+            if not line["units"]:
+                continue
+            try:
+                line["serial"] = serial.Serial(port=port, timeout=0, **line["settings"])
+            except serial.SerialException as e:
+                print(f"Не удалось открыть порт {port}: {str(e)}")
+                continue
+
+            units = line["units"]
+            first = next(iter(units.values()))
+            line["receiver"] = first._create_receiver(
+                unit_ids=set(units),
+                on_crc_error=lambda frame, units=units: units[frame[0]]._record_crc_error(frame),
+            )
+            for slave in units.values():
+                slave.serial = line["serial"]
+                slave.receiver = line["receiver"]
+                slave.running = True
+                slave.capture.start()
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Остановка потока и закрытие портов"""
+        if self.running:
+            self.running = False
+            self.thread.join()
+
+        for line in self.ports.values():
+            if line["serial"] is None:
+                continue
+            line["serial"].close()
+            line["serial"] = None
+            for slave in line["units"].values():
+                slave.running = False
+                slave.capture.stop()
+
+    def _loop(self):
+        """Общий цикл приёма по всем портам"""
+        lines = [line for line in self.ports.values() if line["serial"] is not None]
+
+        selector = selectors.DefaultSelector()
+        try:
+            for line in lines:
+                selector.register(line["serial"].fileno(), selectors.EVENT_READ, line)
+        except (AttributeError, io.UnsupportedOperation, OSError, ValueError):
+            selector.close()
+            selector = None
+
+        while self.running:
+            # Ждём не дольше, чем до конца ближайшего незавершённого кадра
+            timeout = self.IDLE_TIMEOUT
+            now = time.perf_counter()
+            for line in lines:
+                receiver = line["receiver"]
+                if receiver.idle:
+                    continue
+                frames = receiver.check_silence(now)
+                if frames is None:
+                    timeout = min(timeout, receiver.wait_time(now))
+                for request in frames or ():
+                    line["units"][request[0]]._handle_request(request)
+
+            if selector is not None:
+                ready = [key.data for key, _ in selector.select(timeout)]
+            else:
+                time.sleep(self.POLL_INTERVAL)
+                ready = [line for line in lines if line["serial"].in_waiting]
+
+            for line in ready:
+                self._receive(line)
+
+        if selector is not None:
+            selector.close()
+
+    def _receive(self, line):
+        """Чтение накопленных байт порта и обработка собранных кадров"""
+        ser = line["serial"]
+        data = ser.read(ser.in_waiting or 1)
+        if not data:
+            return
+
+        units = line["units"]
+        for request in line["receiver"].feed(data, time.perf_counter()):
+            units[request[0]]._handle_request(request)
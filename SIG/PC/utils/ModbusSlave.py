@@ -1,3 +1,5 @@
+import json
+import os
 import struct
 import threading
 import serial
@@ -5,6 +7,11 @@ import serial.tools.list_ports
 import time
 from crcmod import mkCrcFun
 
+from utils.RegisterBank import RegisterBank
+from utils.ResponseCache import ResponseCache
+from utils.RtuReceiver import RtuReceiver
+from utils.TrafficCapture import TrafficCapture
+
 
 class ModbusSlave:
     """
@@ -19,11 +26,56 @@ class ModbusSlave:
 
     # Функции Modbus
     READ_HOLDING_REGISTERS = 0x03
+    READ_INPUT_REGISTERS = 0x04
     WRITE_SINGLE_REGISTER = 0x06
     WRITE_MULTIPLE_REGISTERS = 0x10
+    MASK_WRITE_REGISTER = 0x16
+    READ_WRITE_MULTIPLE_REGISTERS = 0x17
+
+    # Функции, изменяющие регистры
+    WRITE_FUNCTIONS = (
+        WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_REGISTERS, MASK_WRITE_REGISTER, READ_WRITE_MULTIPLE_REGISTERS,
+    )
+
+    # Длины запросов с фиксированным размером
+    RTU_REQUEST_LENGTHS = {
+        READ_HOLDING_REGISTERS: 8,
+        READ_INPUT_REGISTERS: 8,
+        WRITE_SINGLE_REGISTER: 8,
+        MASK_WRITE_REGISTER: 10,
+    }
+
+    # Форматы полей кадра
+    ADDRESS_VALUE = struct.Struct(">HH")    # адрес + количество/значение в PDU
+    SHORT_HEADER = struct.Struct(">BBB")    # адрес, функция, счётчик байт/код исключения
+    WRITE_HEADER = struct.Struct(">BBHH")   # адрес, функция, адрес регистра, количество/значение
+    MASK_WRITE = struct.Struct(">BBHHH")    # адрес, функция, адрес регистра, маска AND, маска OR
+    READ_WRITE = struct.Struct(">HHHH")     # чтение: адрес, количество; запись: адрес, количество
+    CRC = struct.Struct("<H")
+
+    # Максимальная длина кадра RTU
+    RTU_MAX_LENGTH = 256
+
+    # Режимы приёма
+    RX_MODE_BYTE = "byte"      # побайтовое чтение порта
+    RX_MODE_FRAME = "frame"    # чтение пачками, кадры по паузе 3.5 символа
+
+    # Минимальная пауза для сброса незавершённого кадра на стороне ПК:
+    # USB-преобразователи отдают байты пачками с задержкой до 16 мс,
+    # поэтому 1.75 мс по спецификации здесь не выдерживается
+    RTU_HOST_SILENCE_MIN = 0.02
+
+    # Автоопределение порта
+    PORT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".sig_modbus_port.json")
+    PROBE_READ_TIMEOUT = 0.05   # таймаут чтения при проверке порта, с
+    PORT_CACHE_TYPES = {"port": str, "baudrate": int, "bytesize": int, "parity": str, "stopbits": (int, float)}
+    # Запрос, принятый при автоопределении, старше этого остаётся без ответа:
+    # мастер уже мог повторить его, и поздний ответ столкнётся с повтором на линии
+    DETECTED_REQUEST_MAX_AGE = 0.05
 
     def __init__(
-        self, baudrate=9600, timeout=1, slave_id=1, bytesize=8, parity="E", stopbits=1
+        self, baudrate=9600, timeout=1, slave_id=1, bytesize=8, parity="E", stopbits=1,
+        rx_mode=RX_MODE_BYTE, read_cache_size=32, registers=None, capture=None
     ):
         """
         Инициализация Modbus Slave
@@ -31,6 +83,10 @@ class ModbusSlave:
         :param baudrate: скорость для RTU
         :param timeout: таймаут ожидания данных
         :param slave_id: идентификатор устройства (1-247)
+        :param rx_mode: режим приёма (RX_MODE_BYTE или RX_MODE_FRAME)
+        :param read_cache_size: размер кэша ответов на чтение (0 - без кэша)
+        :param registers: общий банк регистров (RegisterBank), по умолчанию свой
+        :param capture: запись обмена (TrafficCapture), по умолчанию только в памяти
         """
         self.thread = None
         self.port = None
@@ -39,39 +95,86 @@ class ModbusSlave:
         self.bytesize = bytesize
         self.parity = parity
         self.stopbits = stopbits
+        self.rx_mode = rx_mode
         self.serial = serial.Serial()
+        self.receiver = None
+        self.detected_requests = []     # кадры, принятые при автоопределении порта
+        self.detected_at = 0.0          # момент их приёма (time.perf_counter())
+        self.first_response_at = None   # момент первого ответа мастеру (time.perf_counter())
+        self.capture = capture if capture is not None else TrafficCapture()
 
         self.slave_id = slave_id
         self.running = False
+        self.stop_event = threading.Event()     # stop() вызван - порт больше не открывается
+        self.start_lock = threading.Lock()      # запуск потока слейва против stop() из другого потока
         self.callbacks = {}
-        self.data_store = {
-            "holding_registers": [0] * 256,
-        }
+        self.registers = registers if registers is not None else RegisterBank(256)
+
+        # Буфер ответа, переиспользуемый для каждого запроса, и заранее
+        # созданные представления его начала для каждой длины кадра
+        self.tx_buffer = bytearray(self.RTU_MAX_LENGTH)
+        tx_view = memoryview(self.tx_buffer)
+        self.tx_frames = [tx_view[:length] for length in range(self.RTU_MAX_LENGTH + 1)]
+        self.tx_registers = self.registers.wire_view(self.tx_buffer, self.SHORT_HEADER.size)
+
+        # Кэш готовых ответов на чтение, сбрасывается по версиям банка регистров
+        self.read_cache = ResponseCache(read_cache_size) if read_cache_size else None
 
         # Инициализация CRC функции для RTU
         self.crc16 = mkCrcFun(0x18005, rev=True, initCrc=0xFFFF, xorOut=0x0000)
 
-        self.command_list = [self.WRITE_SINGLE_REGISTER, self.WRITE_MULTIPLE_REGISTERS, self.READ_HOLDING_REGISTERS]
+        self.command_list = [
+            self.WRITE_SINGLE_REGISTER, self.WRITE_MULTIPLE_REGISTERS, self.READ_HOLDING_REGISTERS,
+            self.READ_INPUT_REGISTERS, self.MASK_WRITE_REGISTER, self.READ_WRITE_MULTIPLE_REGISTERS,
+        ]
 
     def start(self):
-        """Запуск сервера Modbus Slave с автоопределением порта"""
-        self.running = True
+        """
+        Запуск сервера Modbus Slave с автоопределением порта
+
+        stop() можно вызвать из другого потока во время автоопределения:
+        оно прерывается, найденный порт закрывается, поток слейва не
+        запускается. После stop() слейв не запускается повторно.
+        """
+        with self.start_lock:
+            if self.stop_event.is_set():
+                return
+            self.running = True
 
         if hasattr(self, "serial") and self.serial.is_open:
             self.serial.close()
 
-        # Попытка автоматического определения порта
-        if self._auto_detect_port():
-            self.thread = threading.Thread(target=self._rtu_loop)
-            self.thread.daemon = True
-            self.thread.start()
+        if self.rx_mode == self.RX_MODE_FRAME:
+            loop = self._rtu_frame_loop
         else:
-            print("Не удалось найти подходящий COM-порт")
-            self.running = False
-            return
+            loop = self._rtu_loop
+
+        # Попытка автоматического определения порта
+        detected = self._auto_detect_port()
+        with self.start_lock:
+            if self.stop_event.is_set():
+                if self.serial.is_open:
+                    self.serial.close()
+                return
+            if detected:
+                self.capture.start()
+                self.thread = threading.Thread(target=loop)
+                self.thread.daemon = True
+                self.thread.start()
+            else:
+                print("Не удалось найти подходящий COM-порт")
+                self.running = False
 
     def _auto_detect_port(self, timeout=2.0):
-        """Автоматическое определение COM-порта"""
+        """
+        Автоматическое определение COM-порта
+
+        Сначала проверяется запомненный порт с запомненными параметрами,
+        затем все порты параллельно с параметрами конструктора - в том числе
+        запомненный, если его параметры устарели. Порт принимается по
+        первому корректному кадру, адресованному slave_id; сам кадр
+        сохраняется и обрабатывается первым, если ещё не устарел.
+        """
         # Получаем список доступных портов
         available_ports = serial.tools.list_ports.comports()
         test_ports = [p.device for p in available_ports]
@@ -82,42 +185,20 @@ class ModbusSlave:
 
         print(f"Доступные порты: {test_ports}")
 
-        for port in test_ports:
-            try:
-                print(f"Проверка порта {port}...")
-                ser = serial.Serial(
-                    port=port,
-                    baudrate=self.baudrate,
-                    bytesize=self.bytesize,
-                    parity=self.parity,
-                    stopbits=self.stopbits,
-                    timeout=self.timeout,
-                )
-
-                # Проверяем, есть ли входящие данные
-                start_time = time.time()
-                data_received = False
-
-                while time.time() - start_time < timeout:
-                    if ser.in_waiting > 0:
-                        data = ser.read(ser.in_waiting)
-                        print(f"Получены данные на порту {port}: {data.hex()}")
-                        data_received = True
-                        break
-                    time.sleep(0.1)
-
-                if data_received:
-                    print(f"Выбран порт {port} (обнаружена активность)")
-                    self.port = port
-                    self.serial = ser
-                    return True
-                else:
-                    print(f"Порт {port} доступен, но активность не обнаружена")
-                    ser.close()
-
-            except serial.SerialException as e:
-                print(f"Ошибка при работе с портом {port}: {str(e)}")
-                continue
+        cached = self._load_port_cache()
+        if cached and cached["port"] in test_ports:
+            print(f"Проверка запомненного порта {cached['port']}...")
+            settings = {key: cached[key] for key in ("baudrate", "bytesize", "parity", "stopbits")}
+            if self._probe_ports([cached["port"]], timeout, settings):
+                return True
+            if settings == self._settings():
+                test_ports.remove(cached["port"])
+
+        if test_ports and self._probe_ports(test_ports, timeout):
+            return True
+
+        if self.stop_event.is_set():
+            return False
 
         # Если ни один порт не подошел, пробуем использовать указанный в конфигурации
         try:
@@ -136,15 +217,140 @@ class ModbusSlave:
 
             return False
 
+    def _probe_ports(self, ports, timeout, settings=None):
+        """
+        Параллельная проверка портов
+
+        :param ports: список портов
+        :param timeout: сколько слушать каждый порт, с
+        :param settings: параметры порта (baudrate, bytesize, parity, stopbits),
+                         по умолчанию текущие
+        :return: True, если порт найден (self.serial открыт на нём)
+        """
+        if not ports:
+            return False
+        if settings is None:
+            settings = self._settings()
+
+        found = threading.Event()
+        decided = threading.Event()     # порт найден или проверены все
+        remaining = [len(ports)]
+        winner = []
+        lock = threading.Lock()
+
+        def probe(port):
+            try:
+                listen(port)
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    if not remaining[0]:
+                        decided.set()
+
+        def listen(port):
+            try:
+                print(f"Проверка порта {port}...")
+                ser = serial.Serial(port=port, timeout=self.PROBE_READ_TIMEOUT, **settings)
+            except (serial.SerialException, OSError) as e:
+                print(f"Ошибка при работе с портом {port}: {str(e)}")
+                return
+
+            receiver = self._create_receiver()
+            deadline = time.perf_counter() + timeout
+            frames = []
+            now = time.perf_counter()
+            try:
+                while (not frames and not found.is_set() and not self.stop_event.is_set()
+                       and time.perf_counter() < deadline):
+                    data = ser.read(max(ser.in_waiting, 1))
+                    now = time.perf_counter()
+                    if data:
+                        frames = receiver.feed(data, now)
+                    else:
+                        frames = receiver.check_silence(now) or []
+            except (serial.SerialException, OSError) as e:
+                print(f"Ошибка при работе с портом {port}: {str(e)}")
+
+            with lock:
+                if frames and not found.is_set():
+                    found.set()
+                    decided.set()
+                    winner.append((port, ser, frames, now))
+                    return
+
+            if not frames:
+                print(f"Порт {port} доступен, но запросы к устройству {self.slave_id} не обнаружены")
+            ser.close()
+
+        # Остальные проверки не ждём: каждая закрывает свой порт не позже чем через
+        # PROBE_READ_TIMEOUT, а принятый кадр к этому времени может устареть
+        threads = [threading.Thread(target=probe, args=(port,), daemon=True) for port in ports]
+        for thread in threads:
+            thread.start()
+        decided.wait()
+
+        if not winner:
+            return False
+
+        port, ser, frames, received = winner[0]
+        print(f"Выбран порт {port} (получен запрос к устройству {self.slave_id})")
+        ser.timeout = self.timeout
+        self.port = port
+        self.serial = ser
+        self.baudrate = settings["baudrate"]
+        self.bytesize = settings["bytesize"]
+        self.parity = settings["parity"]
+        self.stopbits = settings["stopbits"]
+        self.detected_requests = frames
+        self.detected_at = received
+        self._save_port_cache()
+        return True
+
+    def _settings(self):
+        """Текущие параметры порта"""
+        return {
+            "baudrate": self.baudrate,
+            "bytesize": self.bytesize,
+            "parity": self.parity,
+            "stopbits": self.stopbits,
+        }
+
+    def _load_port_cache(self):
+        """Чтение запомненного порта и его параметров (None, если файла нет или он испорчен)"""
+        try:
+            with open(self.PORT_CACHE_FILE, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or not all(
+                isinstance(cached.get(key), types) and not isinstance(cached.get(key), bool)
+                for key, types in self.PORT_CACHE_TYPES.items()):
+            print(f"Файл запомненного порта {self.PORT_CACHE_FILE} испорчен - не используется")
+            return None
+        return cached
+
+    def _save_port_cache(self):
+        """Запоминание выбранного порта и его параметров"""
+        try:
+            with open(self.PORT_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump({"port": self.port, **self._settings()}, f)
+        except OSError as e:
+            print(f"Не удалось сохранить порт {self.port}: {e}")
+
     def stop(self):
-        """Остановка сервера Modbus Slave"""
-        if self.running:
+        """Остановка сервера Modbus Slave (в том числе во время start() в другом потоке)"""
+        with self.start_lock:
+            self.stop_event.set()
             self.running = False
-            self.thread.join()
+            thread = self.thread
+        if thread is not None:
+            thread.join()
 
         if self.serial.is_open:
             self.serial.close()
 
+        self.capture.stop()
+
     def set_callback(self, function_code, callback):
         """
         Установка колбэка для определенной функции Modbus
@@ -154,70 +360,149 @@ class ModbusSlave:
         """
         self.callbacks[function_code] = callback
 
+    @property
+    def char_time(self):
+        """Время передачи одного символа (старт + данные + чётность + стоп), с"""
+        bits = 1 + self.bytesize + (0 if self.parity == serial.PARITY_NONE else 1) + self.stopbits
+        return bits / self.baudrate
+
+    @property
+    def frame_silence(self):
+        """Пауза между кадрами RTU: 3.5 символа, но не меньше 1.75 мс выше 19200 бод"""
+        if self.baudrate > 19200:
+            return 0.00175
+        return 3.5 * self.char_time
+
+    def _handle_detected_requests(self):
+        """Ответ на запросы, принятые при автоопределении порта"""
+        requests, self.detected_requests = self.detected_requests, []
+        if requests and time.perf_counter() - self.detected_at > self.DETECTED_REQUEST_MAX_AGE:
+            for request in requests:
+                self.capture.record(TrafficCapture.RX, request)
+            print("Запрос, принятый при автоопределении порта, устарел - ответ на повтор мастера")
+            return
+        for request in requests:
+            self._handle_request(request)
+
+    def _create_receiver(self, unit_ids=None, on_crc_error=None):
+        """
+        Сборщик кадров RTU для порта
+
+        :param unit_ids: принимаемые адреса, по умолчанию slave_id
+        :param on_crc_error: функция, получающая кадр с неверным CRC
+        """
+        return RtuReceiver(
+            self.crc16,
+            unit_ids=unit_ids if unit_ids is not None else {self.slave_id},
+            function_codes=set(self.command_list),
+            frame_length=self._get_expected_rtu_length,
+            char_time=self.char_time,
+            frame_silence=max(self.frame_silence, self.RTU_HOST_SILENCE_MIN),
+            on_crc_error=on_crc_error,
+        )
+
     def _rtu_loop(self):
-        """Основной цикл обработки запросов в режиме RTU"""
-        buffer = bytearray()
+        """
+        Основной цикл обработки запросов в режиме RTU
+
+        Порт читается по одному байту, кадры собирает RtuReceiver.
+        """
+        receiver = self._create_receiver(on_crc_error=self._record_crc_error)
+        self.receiver = receiver
+        self._handle_detected_requests()
 
         while self.running:
             # Чтение данных из последовательного порта
             data = self.serial.read(1)
+            now = time.perf_counter()
             if not data:
+                for request in receiver.check_silence(now) or ():
+                    self._handle_request(request)
                 continue
 
-            buffer.extend(data)
+            for request in receiver.feed(data, now):
+                self._handle_request(request)
 
-            if len(buffer) == 1:
-                if buffer[0] != self.slave_id:  # 0 - широковещательный адрес
-                    buffer.clear()
-                continue
+    def _rtu_frame_loop(self):
+        """
+        Цикл обработки запросов в режиме RTU с приёмом целых кадров
 
-            if len(buffer) == 2:
-                if buffer[1] not in self.command_list:
-                    buffer.clear()
-                continue
+        Из порта забирается всё накопленное в in_waiting, CRC считается
+        по мере поступления байт, границы кадров определяет RtuReceiver.
+        """
+        receiver = self._create_receiver(on_crc_error=self._record_crc_error)
+        self.receiver = receiver
+        self._handle_detected_requests()
 
-            # Проверка на полный пакет
-            expected_length = self._get_expected_rtu_length(buffer)
-            if len(buffer) < expected_length:
+        while self.running:
+            waiting = self.serial.in_waiting
+            if waiting:
+                data = self.serial.read(waiting)
+            elif receiver.idle:
+                # Ждём начало кадра блокирующим чтением, не нагружая процессор
+                data = self.serial.read(1)
+                if not data:
+                    continue
+            else:
+                # Кадр не дочитан - спим до ожидаемого конца кадра или паузы
+                now = time.perf_counter()
+                frames = receiver.check_silence(now)
+                if frames is None:
+                    time.sleep(receiver.wait_time(now))
+                for request in frames or ():
+                    self._handle_request(request)
                 continue
 
-            # Проверка CRC
-            crc_received = buffer[-2:]  # Последние 2 байта - CRC
-            crc_calculated = self._calculate_crc(buffer[:-2])
-            if crc_received != crc_calculated:
-                buffer.clear()
-                continue
+            for request in receiver.feed(data, time.perf_counter()):
+                self._handle_request(request)
 
-            # Обработка корректного пакета
-            request = buffer.copy()
-            print("REQUEST ", buffer.hex())
-            buffer.clear()
+    def _record_crc_error(self, frame):
+        self.capture.record(TrafficCapture.RX, frame, crc_ok=False)
 
-            # Формирование ответа
-            response = self._process_request(request)
-            if response:
-                print("RESPONSE ", response.hex())
-                self.serial.write(response)
+    def _handle_request(self, request):
+        """Обработка принятого кадра: ответ мастеру и вызов колбэка"""
+        received = time.perf_counter()
+        self.capture.record(TrafficCapture.RX, request)
 
-            # Вызов колбэка если он установлен
-            function_code = request[1]
-            if function_code in self.callbacks:
-                self.callbacks[function_code](request)
+        # Формирование ответа
+        response = self._process_request(request)
+        if response:
+            self.serial.write(response)
+            sent = time.perf_counter()
+            self.capture.record(TrafficCapture.TX, response, latency=sent - received)
+            if self.first_response_at is None:
+                self.first_response_at = sent
+
+        # Вызов колбэка если он установлен
+        function_code = request[1]
+        if function_code in self.callbacks:
+            self.callbacks[function_code](request)
 
     def _get_expected_rtu_length(self, data):
         """Определение ожидаемой длины пакета RTU на основе кода функции"""
         if len(data) < 2:
             return 4  # минимальная длина (адрес + функция + CRC)
 
-        # Базовые длины для разных функций
-        lengths = {
-            self.READ_HOLDING_REGISTERS: 8,
-            self.WRITE_SINGLE_REGISTER: 8,
-            self.WRITE_MULTIPLE_REGISTERS: 9 + data[6] if len(data) > 7 else 9,
-        }
-
         function_code = data[1]
-        return lengths.get(function_code, 256)  # 256 - максимальная длина по умолчанию
+        # Длину кадров записи задаёт счётчик байт; неправдоподобный заголовок
+        # (None) - помеха, ждать по нему до 264 байт нельзя
+        if function_code == self.WRITE_MULTIPLE_REGISTERS:
+            if len(data) < 7:
+                return 9
+            quantity = (data[4] << 8) | data[5]
+            if not 1 <= quantity <= 123 or data[6] != quantity * 2:
+                return None
+            return 9 + data[6]
+        if function_code == self.READ_WRITE_MULTIPLE_REGISTERS:
+            if len(data) < 11:
+                return 13
+            read_quantity = (data[4] << 8) | data[5]
+            write_quantity = (data[8] << 8) | data[9]
+            if not 1 <= read_quantity <= 125 or not 1 <= write_quantity <= 121 or data[10] != write_quantity * 2:
+                return None
+            return 13 + data[10]
+
+        return self.RTU_REQUEST_LENGTHS.get(function_code, 256)  # 256 - максимальная длина по умолчанию
 
     def _calculate_crc(self, data):
         """Вычисление CRC16 для RTU пакета"""
@@ -225,22 +510,30 @@ class ModbusSlave:
         return struct.pack("<H", crc)
 
     def _process_request(self, request):
-        """Обработка Modbus запроса и формирование ответа"""
+        """
+        Обработка Modbus запроса и формирование ответа
 
-        slave_id = request[0]
+        Ответ собирается в буфере tx_buffer и возвращается как memoryview
+        без копирования - он действителен до обработки следующего запроса.
+        """
 
-        pdu = request[1:-2]  # Исключаем адрес и CRC
+        slave_id = request[0]
 
-        function_code = pdu[0] if len(pdu) > 1 else None
+        # PDU не копируется: обработчики читают поля запроса по смещениям
+        function_code = request[1] if len(request) > 4 else None
 
         try:
             match function_code:
-                case self.READ_HOLDING_REGISTERS:
-                    return self._read_holding_registers(slave_id, pdu)
+                case self.READ_HOLDING_REGISTERS | self.READ_INPUT_REGISTERS:
+                    return self._read_registers(slave_id, function_code, request)
                 case self.WRITE_SINGLE_REGISTER:
-                    return self._write_single_register(slave_id, pdu)
+                    return self._write_single_register(slave_id, request)
                 case self.WRITE_MULTIPLE_REGISTERS:
-                    return self._write_multiple_registers(slave_id, pdu)
+                    return self._write_multiple_registers(slave_id, request)
+                case self.MASK_WRITE_REGISTER:
+                    return self._mask_write_register(slave_id, request)
+                case self.READ_WRITE_MULTIPLE_REGISTERS:
+                    return self._read_write_multiple_registers(slave_id, request)
                 case _:
                     return self._exception_response(
                         slave_id, function_code, self.ILLEGAL_FUNCTION
@@ -255,79 +548,138 @@ class ModbusSlave:
                 slave_id, function_code, self.ILLEGAL_DATA_VALUE
             )
 
-    def _write_multiple_registers(self, slave_id, pdu):
-        address = struct.unpack(">H", pdu[1:3])[0]
-        quantity = struct.unpack(">H", pdu[3:5])[0]
+    def _finish_response(self, length):
+        """Дописывание CRC после length байт буфера ответа"""
+        crc = self.crc16(self.tx_frames[length])
+        self.CRC.pack_into(self.tx_buffer, length, crc)
+        return self.tx_frames[length + 2]
 
-        reg_data = []
+    def _write_multiple_registers(self, slave_id, request):
+        address, quantity = self.ADDRESS_VALUE.unpack_from(request, 2)
+        byte_count = request[6]
 
-        for i in range(quantity):
-            data = struct.unpack(">H", pdu[6 + i * 2 : 8 + i * 2])[0]
-            self.data_store["holding_registers"][address + i] = data
-            reg_data.append(data)
+        # Данные регистров: после адреса, функции, полей и счётчика байт, до CRC
+        if (not 1 <= quantity <= 123 or byte_count != quantity * 2
+                or len(request) - 9 != byte_count):
+            return self._exception_response(
+                slave_id, self.WRITE_MULTIPLE_REGISTERS, self.ILLEGAL_DATA_VALUE
+            )
 
-        response = (
-            bytearray([slave_id, self.WRITE_MULTIPLE_REGISTERS]) + pdu[1:3] + pdu[3:5]
-        )
-        response += self._calculate_crc(response)
+        self.registers.write_from(address, quantity, request, 7)
 
-        return response
+        self.WRITE_HEADER.pack_into(
+            self.tx_buffer, 0, slave_id, self.WRITE_MULTIPLE_REGISTERS, address, quantity
+        )
+        return self._finish_response(self.WRITE_HEADER.size)
 
-    def _write_single_register(self, slave_id, pdu):
-        address = struct.unpack(">H", pdu[1:3])[0]
-        data = struct.unpack(">H", pdu[3:5])[0]
+    def _write_single_register(self, slave_id, request):
+        address, data = self.ADDRESS_VALUE.unpack_from(request, 2)
 
-        self.data_store["holding_registers"][address] = data
+        self.registers[address] = data
 
-        response = (
-            bytearray([slave_id, self.WRITE_SINGLE_REGISTER])
-            + address.to_bytes(2, "big")
-            + data.to_bytes(2, "big")
+        self.WRITE_HEADER.pack_into(
+            self.tx_buffer, 0, slave_id, self.WRITE_SINGLE_REGISTER, address, data
         )
-        response += self._calculate_crc(response)
+        return self._finish_response(self.WRITE_HEADER.size)
 
-        return response
+    def _mask_write_register(self, slave_id, request):
+        """
+        Обработка функции записи регистра по маске (0x16)
+
+        Новое значение: (текущее AND and_mask) OR (or_mask AND NOT and_mask).
+        Чтение и запись выполняются одной транзакцией банка регистров.
+        """
+        _, _, address, and_mask, or_mask = self.MASK_WRITE.unpack_from(request, 0)
 
+        with self.registers.transaction():
+            current = self.registers[address]
+            self.registers[address] = (current & and_mask) | (or_mask & ~and_mask & 0xFFFF)
 
-    def _read_holding_registers(self, slave_id, pdu):
-        """Обработка функции чтения holding регистров (0x03)"""
-        address = struct.unpack(">H", pdu[1:3])[0]
-        quantity = struct.unpack(">H", pdu[3:5])[0]
+        # Ответ повторяет запрос
+        self.MASK_WRITE.pack_into(
+            self.tx_buffer, 0, slave_id, self.MASK_WRITE_REGISTER, address, and_mask, or_mask
+        )
+        return self._finish_response(self.MASK_WRITE.size)
 
-        if quantity < 1 or quantity > 125:
+    def _read_write_multiple_registers(self, slave_id, request):
+        """
+        Обработка функции записи и чтения нескольких регистров (0x17)
+
+        Сначала выполняется запись, затем чтение - одной транзакцией,
+        поэтому в ответе уже видны только что записанные значения.
+        """
+        read_address, read_quantity, write_address, write_quantity = self.READ_WRITE.unpack_from(request, 2)
+        byte_count = request[10]
+
+        # Данные регистров: после полей и счётчика байт, до CRC
+        if (not 1 <= read_quantity <= 125 or not 1 <= write_quantity <= 121
+                or byte_count != write_quantity * 2 or len(request) - 13 != byte_count):
             return self._exception_response(
-                slave_id, self.READ_HOLDING_REGISTERS, self.ILLEGAL_DATA_VALUE
+                slave_id, self.READ_WRITE_MULTIPLE_REGISTERS, self.ILLEGAL_DATA_VALUE
             )
 
-        end_address = address + quantity - 1
-        if end_address >= len(self.data_store["holding_registers"]):
+        if (read_address + read_quantity > len(self.registers)
+                or write_address + write_quantity > len(self.registers)):
             return self._exception_response(
-                slave_id, self.READ_HOLDING_REGISTERS, self.ILLEGAL_DATA_ADDRESS
+                slave_id, self.READ_WRITE_MULTIPLE_REGISTERS, self.ILLEGAL_DATA_ADDRESS
             )
 
-        # Формирование данных ответа
-        byte_count = quantity * 2
-        registers_data = bytearray(byte_count)
+        read_bytes = read_quantity * 2
+        self.SHORT_HEADER.pack_into(
+            self.tx_buffer, 0, slave_id, self.READ_WRITE_MULTIPLE_REGISTERS, read_bytes
+        )
+        with self.registers.transaction():
+            self.registers.write_from(write_address, write_quantity, request, 11)
+            self.registers.read_into(read_address, self.tx_registers[:read_quantity])
+
+        return self._finish_response(self.SHORT_HEADER.size + read_bytes)
+
+    def _read_registers(self, slave_id, function_code, request):
+        """
+        Обработка функций чтения holding (0x03) и input (0x04) регистров
+
+        Input регистры отдельно не хранятся: обе функции читают один банк,
+        чтобы ПР200 мог опрашивать значения любой из них.
+        """
+        address, quantity = self.ADDRESS_VALUE.unpack_from(request, 2)
+
+        if quantity < 1 or quantity > 125:
+            return self._exception_response(
+                slave_id, function_code, self.ILLEGAL_DATA_VALUE
+            )
 
-        for i in range(quantity):
-            registers_data[i * 2 : (i * 2) + 2] = struct.pack(
-                ">H", self.data_store["holding_registers"][address + i]
+        end_address = address + quantity - 1
+        if end_address >= len(self.registers):
+            return self._exception_response(
+                slave_id, function_code, self.ILLEGAL_DATA_ADDRESS
             )
 
-        # Формирование ответа
+        # Версия берётся до кодирования: запись во время кодирования
+        # оставит в кэше устаревшую версию, и ответ будет пересобран
+        if self.read_cache is not None:
+            key = (slave_id, function_code, address, quantity)
+            version = self.registers.range_version(address, quantity)
+            cached = self.read_cache.get(key, version)
+            if cached is not None:
+                return cached
 
-        response = (
-            bytearray([slave_id, self.READ_HOLDING_REGISTERS, byte_count])
-            + registers_data
+        # Формирование ответа: заголовок и данные сразу в буфер
+        byte_count = quantity * 2
+        self.SHORT_HEADER.pack_into(
+            self.tx_buffer, 0, slave_id, function_code, byte_count
         )
-        response += self._calculate_crc(response)
+        self.registers.read_into(address, self.tx_registers[:quantity])
+
+        response = self._finish_response(self.SHORT_HEADER.size + byte_count)
+        if self.read_cache is not None:
+            self.read_cache.put(key, version, response)
 
         return response
 
     def _exception_response(self, slave_id, function_code, exception_code):
         """Формирование ответа с исключением"""
 
-        response = bytearray([slave_id, function_code | 0x80, exception_code])
-        response += self._calculate_crc(response)
-
-        return response
+        self.SHORT_HEADER.pack_into(
+            self.tx_buffer, 0, slave_id, function_code | 0x80, exception_code
+        )
+        return self._finish_response(self.SHORT_HEADER.size)
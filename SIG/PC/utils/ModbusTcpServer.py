@@ -0,0 +1,144 @@
+import asyncio
+import struct
+import threading
+
+from utils.ModbusSlave import ModbusSlave
+from utils.TrafficCapture import TrafficCapture
+
+
+class ModbusTcpServer:
+    """
+    Сервер Modbus TCP (MBAP) на asyncio поверх банка регистров ModbusSlave.
+
+    Запросы обрабатываются теми же обработчиками функций Modbus,
+    что и RTU, через отдельный экземпляр ModbusSlave с общим банком
+    регистров: буфер ответа и кэш у потоков TCP и RTU свои. Клиентов может
+    быть много, каждый может отправлять запросы не дожидаясь ответов -
+    ответы уходят в порядке запросов. Адрес устройства (unit id) в MBAP
+    не проверяется и возвращается в ответе как есть.
+
+    Аутентификации в Modbus TCP нет, поэтому по умолчанию сервер слушает
+    только 127.0.0.1. В режиме read_only функции записи отклоняются
+    исключением ILLEGAL_FUNCTION - для SCADA и регистраторов, которым
+    нельзя запускать стенд.
+    """
+
+    MBAP = struct.Struct(">HHHB")   # транзакция, протокол, длина, unit id
+    MAX_PDU_LENGTH = 253
+    WRITE_BUFFER_LIMIT = 64 * 1024  # выше - ждём, пока клиент заберёт ответы
+
+    def __init__(self, slave, host="127.0.0.1", port=502, read_only=False):
+        """
+        :param slave: ModbusSlave, чей банк регистров и колбэки используются
+        :param host: адрес для прослушивания ("0.0.0.0" - все интерфейсы)
+        :param port: TCP порт (ниже 1024 в Linux - только с правами root)
+        :param read_only: отклонять функции записи
+        """
+        self.slave = slave
+        self.host = host
+        self.port = port
+        self.read_only = read_only
+        self.handler = ModbusSlave(
+            slave_id=slave.slave_id, registers=slave.registers,
+            capture=TrafficCapture(verbosity=TrafficCapture.VERBOSITY_OFF, slots=1),
+        )
+
+        self.thread = None
+        self.loop = None
+        self.server = None
+        self.started = threading.Event()
+        self.clients = set()
+
+        # Счётчики
+        self.connections = 0
+        self.requests = 0
+        self.rejected = 0
+
+    def start(self):
+        """Запуск сервера в отдельном потоке со своим циклом asyncio"""
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+        self.started.wait()
+        if self.server is None:
+            raise OSError(f"Не удалось запустить Modbus TCP на {self.host}:{self.port}")
+
+    def stop(self):
+        """Остановка сервера"""
+        if self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        if self.thread is not None:
+            self.thread.join()
+
+    async def _shutdown(self):
+        self.server.close()
+        for task in self.clients:
+            task.cancel()
+        await asyncio.gather(*self.clients, return_exceptions=True)
+        self.loop.stop()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._serve_client, self.host, self.port)
+            )
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            print(f"Ошибка запуска Modbus TCP: {e}")
+            self.started.set()
+            self.loop.close()
+            return
+
+        self.started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def _serve_client(self, reader, writer):
+        """Обработка одного соединения: чтение кадров MBAP подряд"""
+        self.connections += 1
+        task = asyncio.current_task()
+        self.clients.add(task)
+        try:
+            while True:
+                header = await reader.readexactly(self.MBAP.size)
+                transaction, protocol, length, unit = self.MBAP.unpack(header)
+                # Кроме unit id нужны хотя бы код функции и один байт данных
+                if protocol != 0 or not 3 <= length <= self.MAX_PDU_LENGTH + 1:
+                    break
+
+                pdu = await reader.readexactly(length - 1)
+                writer.write(self._process(transaction, unit, pdu))
+
+                if writer.transport.get_write_buffer_size() > self.WRITE_BUFFER_LIMIT:
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            self.clients.discard(task)
+            writer.close()
+
+    def _process(self, transaction, unit, pdu):
+        """
+        Обработка PDU обработчиками RTU
+
+        Запрос оборачивается в кадр RTU (адрес + PDU + место под CRC),
+        из ответа RTU берутся адрес и PDU без CRC.
+        """
+        self.requests += 1
+        function_code = pdu[0]
+        if self.read_only and function_code in ModbusSlave.WRITE_FUNCTIONS:
+            self.rejected += 1
+            response = self.handler._exception_response(unit, function_code, ModbusSlave.ILLEGAL_FUNCTION)
+            return self.MBAP.pack(transaction, 0, len(response) - 2, unit) + response[1:-2]
+
+        request = bytes([unit]) + pdu + b"\x00\x00"
+        response = self.handler._process_request(request)
+
+        if function_code in self.slave.callbacks:
+            self.slave.callbacks[function_code](request)
+
+        return self.MBAP.pack(transaction, 0, len(response) - 2, unit) + response[1:-2]
@@ -1,94 +1,124 @@
-import tkinter as tk
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from datetime import datetime
-from tkinter import ttk
 
-class PressureGraph:
-    def __init__(self, parent, x=10, y=230, width=500, height=210):
-        self.parent = parent
-        self.time_data = []
-        self.pressure_data = []
-        self.current_x_offset = 0
-        self.max_visible_points = 8
+from utils.GraphView import GraphView
+
+class PressureGraph(GraphView):
+    """
+    График давления с прокруткой по времени (matplotlib).
+
+    В режиме blit оси, сетка и пределы рисуются один раз и кэшируются
+    как фон (copy_from_bbox); при обновлении фон восстанавливается и
+    перерисовываются только линия и подписи времени. Каждая подпись
+    растеризуется один раз и дальше копируется как готовый участок
+    изображения под нужное деление - отрисовка текста в matplotlib
+    дороже всего остального кадра. Полная перерисовка нужна только при
+    изменении размера или первом показе.
+
+    Данные, прокрутка, масштаб и пропуск скрытых графиков - в GraphView.
+    """
+
+    def __init__(self, parent, x=10, y=230, width=500, height=210, blit=True, store=None, series="pressure",
+                 span=None):
+        """
+        :param parent: фрейм графика (None - без Tk, холст Agg в памяти)
+        :param blit: перерисовывать только линию и подписи поверх кэшированного фона
+        :param store: общее хранилище истории (None - своё, данные через update_data)
+        :param series: имя показываемого ряда в хранилище
+        :param span: точек в окне по умолчанию (None - по точке на деление)
+        """
+        super().__init__(parent, x, y, width, height, store=store, series=series, span=span)
+        self.blit = blit
+        self.background = None
+        self.label_regions = {}         # подпись -> (участок изображения, x деления при отрисовке)
+        self.tick_px = []               # x делений в пикселях
 
         # Создание фигуры matplotlib
         self.fig, self.ax = plt.subplots(figsize=(width / 80, height / 80))
-        self.line, = self.ax.plot([], [], 'b-')
-        self.ax.set_xlabel("Время", fontsize=8)
+        self.line, = self.ax.plot([], [], 'b-', animated=blit)
+        self.ax.set_xlabel("Время", fontsize=8, labelpad=14 if blit else 4)
         self.ax.set_ylabel("Давление (МПа)", fontsize=8)
         self.ax.grid(True)
 
-        # Размещение графика
-        self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
-        self.canvas.get_tk_widget().place(x=x, y=y, width=width, height=height)
-
-        # Кнопки управления
-        self._create_controls(x, y + height + 10, width)
-
-    def _create_controls(self, x, y, width):
-        control_frame = ttk.Frame(self.parent)
-        control_frame.place(x=x, y=y, width=width)
-
-        self.btn_left = ttk.Button(control_frame, text="← Влево", command=self.scroll_left)
-        self.btn_left.pack(side=tk.LEFT, padx=5)
-
-        self.btn_right = ttk.Button(control_frame, text="→ Вправо", command=self.scroll_right)
-        self.btn_right.pack(side=tk.LEFT, padx=5)
-
-        self.btn_reset = ttk.Button(control_frame, text="Сброс", command=self.reset_view)
-        self.btn_reset.pack(side=tk.LEFT, padx=5)
-
-    def update_data(self, new_pressure):
-        """Обновление данных графика (вызывается извне)"""
-        current_time = datetime.now()
-        self.time_data.append(current_time)
-        self.pressure_data.append(new_pressure)
+        if blit:
+            # Статичные оси: пределы и положения делений не меняются
+            self.ax.set_xlim(0, self.max_visible_points - 1)
+            self.ax.set_ylim(*self.Y_LIMITS)
+            self.ax.set_xticks(range(self.max_visible_points))
+            self.ax.set_xticklabels([])
+            self.ax.tick_params(axis='both', labelsize=8)
+            self.tick_text = self.ax.text(0, -0.06, "", transform=self.ax.get_xaxis_transform(),
+                                          ha="center", va="top", fontsize=8, animated=True)
 
-        if self.current_x_offset == 0:
-            self._update_graph()
-
-    def _update_graph(self):
-        """Внутренний метод обновления графика"""
-        if not self.time_data:
+        # Размещение графика
+        if parent is None:
+            self.canvas = FigureCanvasAgg(self.fig)
+        else:
+            self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
+            self.canvas.get_tk_widget().place(x=x, y=y, width=width, height=height)
+
+        if blit:
+            self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _render(self, x, y):
+        self.line.set_data(x, y)
+        if self.blit:
+            if self.background is None:
+                self.canvas.draw()      # фон кэшируется в _on_draw
+            else:
+                self._blit()
             return
 
-        start_idx = max(0, len(self.time_data) - self.max_visible_points - self.current_x_offset)
-        end_idx = len(self.time_data) - self.current_x_offset
-
-        visible_times = self.time_data[start_idx:end_idx]
-        visible_pressures = self.pressure_data[start_idx:end_idx]
-        time_str = [t.strftime("%H:%M:%S") for t in visible_times]
+        self.ax.set_xlim(0, self.max_visible_points - 1)
+        self.ax.set_ylim(*self.Y_LIMITS)
 
-        self.line.set_data(range(len(time_str)), visible_pressures)
-        self.ax.set_xlim(0, len(time_str) - 1)
-        self.ax.set_ylim(0, 50)
-
-        self.ax.set_xticks(range(len(time_str)))
-        self.ax.set_xticklabels(time_str, rotation=0)
+        self.ax.set_xticks(range(len(self.labels)))
+        self.ax.set_xticklabels(self.labels, rotation=0)
         self.ax.tick_params(axis='both', labelsize=8)
 
         self.canvas.draw()
 
-    def scroll_left(self):
-        if len(self.time_data) > self.max_visible_points:
-            self.current_x_offset = min(
-                self.current_x_offset + 1,
-                len(self.time_data) - self.max_visible_points
-            )
-            self._update_graph()
-
-    def scroll_right(self):
-        self.current_x_offset = max(0, self.current_x_offset - 1)
-        self._update_graph()
-
-    def reset_view(self):
-        self.current_x_offset = 0
-        self._update_graph()
+    def _draw_artists(self):
+        self.ax.draw_artist(self.line)
+        self._draw_labels()
+
+    def _draw_labels(self):
+        """Подписи времени: готовые участки изображения, новые рисуются один раз"""
+        regions = {}
+        for i, label in enumerate(self.labels):
+            cached = self.label_regions.get(label)
+            if cached is None:
+                self.tick_text.set_text(label)
+                self.tick_text.set_x(i)
+                self.ax.draw_artist(self.tick_text)
+                bbox = self.tick_text.get_window_extent(self.canvas.get_renderer()).expanded(1.1, 1.1)
+                cached = (self.canvas.copy_from_bbox(bbox), self.tick_px[i])
+            else:
+                region, drawn_px = cached
+                x1, y1, _, _ = region.get_extents()
+                self.canvas.restore_region(region, xy=(x1 + round(self.tick_px[i] - drawn_px), y1))
+            regions[label] = cached
+
+        # Хранятся только подписи видимого окна
+        self.label_regions = regions
+
+    def _on_draw(self, event=None):
+        """Полная перерисовка (первый показ, изменение размера): новый фон"""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.tick_px = [self.ax.transData.transform((i, 0))[0] for i in range(self.max_visible_points)]
+        self.label_regions = {}
+        self._draw_artists()
+
+    def _blit(self):
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.fig.bbox)
 
     def cleanup(self):
         """Очистка ресурсов"""
+        super().cleanup()
         if hasattr(self, 'fig'):
             plt.close(self.fig)
         if hasattr(self, 'widget') and self.widget.winfo_exists():
-            self.widget.destroy()
\ No newline at end of file
+            self.widget.destroy()
@@ -0,0 +1,344 @@
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+class RegisterBank:
+    """
+    Банк holding регистров Modbus.
+
+    Регистры хранятся в непрерывном 16-битном буфере array('H'), поверх
+    которого без копирования строятся представления NumPy. Чтение и запись
+    диапазонов сразу выдают/принимают байтовый образ Modbus (big-endian),
+    float32 и uint32 лежат в паре регистров: младшее слово по меньшему адресу
+    (порядок ПР200). Буфер хранится в порядке байт машины (little-endian).
+
+    Каждый блок из 2 ** BLOCK_SHIFT регистров имеет счётчик версий, который
+    увеличивается при любой записи в блок - по нему кэши ответов понимают,
+    что данные устарели. Поэтому публичные типизированные представления
+    только для чтения, а запись идёт через методы банка.
+
+    Банк общий для потока Modbus и потока Tk. Писатели сериализуются
+    блокировкой и держат счётчик sequence нечётным на время записи
+    (sequence lock). Читатели блокировку не берут: они повторяют чтение,
+    если за это время счётчик изменился. Поток, который сам ведёт запись,
+    читает сразу - так внутри транзакции можно читать и писать вперемешку. Несколько записей, которые должны
+    быть видны только вместе, объединяются в `with bank.transaction():`.
+
+    Записанные регистры отмечаются в битовой маске dirty, которую забирает
+    интерфейс через take_dirty() - она одна на банк и рассчитана на одного
+    потребителя.
+
+    С shared_name регистры лежат в именованной разделяемой памяти: заголовок
+    SHARED_HEADER (метка, количество регистров, sequence, PID владельца) и
+    следом сами регистры. Другие процессы читают их через RegisterBankReader
+    без обращения к шине; счётчик sequence дублируется в заголовок.
+    Сегмент с тем же именем пересоздаётся, только если его владелец уже
+    завершился (остался после аварийного выхода); сегмент работающего
+    процесса не трогается - конструктор выбрасывает FileExistsError.
+    """
+
+    BLOCK_SHIFT = 1     # 2 регистра (одно float-значение) в блоке версий
+
+    # Разделяемая память
+    SHARED_MAGIC = b"SIG2"
+    SHARED_HEADER = struct.Struct("<4sIQI")     # метка, количество регистров, sequence, PID владельца
+    SHARED_SEQUENCE = struct.Struct("<Q")
+    SHARED_SEQUENCE_OFFSET = 8
+
+    def __init__(self, size=256, shared_name=None):
+        """
+        :param size: количество регистров
+        :param shared_name: имя разделяемой памяти (None - обычная память процесса)
+        """
+        self.shared = None
+        if shared_name is None:
+            self.registers = array("H", bytes(size * 2))
+        else:
+            self.shared = self._create_shared(shared_name, self.SHARED_HEADER.size + size * 2)
+            self.SHARED_HEADER.pack_into(self.shared.buf, 0, self.SHARED_MAGIC, size, 0, os.getpid())
+            self.registers = self.shared.buf[self.SHARED_HEADER.size:].cast("H")[:size]
+        self.words = np.frombuffer(self.registers, dtype=np.uint16)
+        self.versions = array("Q", bytes(8 * (((size - 1) >> self.BLOCK_SHIFT) + 1)))
+        self.dirty = 0      # бит N - регистр N изменён с последнего take_dirty()
+
+        # Sequence lock: нечётное значение - идёт запись
+        self.lock = threading.RLock()
+        self.sequence = 0
+        self._depth = 0
+        self._owner = None  # поток, ведущий запись
+
+    @classmethod
+    def _create_shared(cls, name, size):
+        """
+        Создание разделяемой памяти
+
+        Сегмент, оставшийся от завершившегося процесса, пересоздаётся.
+        Если владелец сегмента работает - FileExistsError.
+        """
+        try:
+            return shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            existing = shared_memory.SharedMemory(name)
+
+        owner = None
+        if existing.size >= cls.SHARED_HEADER.size:
+            magic, _, _, pid = cls.SHARED_HEADER.unpack_from(existing.buf, 0)
+            if magic == cls.SHARED_MAGIC:
+                owner = pid
+        if owner is not None and cls._process_alive(owner):
+            if sys.platform != "win32":
+                # Сегмент чужой: трекер этого процесса не должен удалить его при выходе
+                resource_tracker.unregister(existing._name, "shared_memory")
+            existing.close()
+            raise FileExistsError(f"Разделяемая память {name} используется процессом {owner}")
+
+        existing.close()
+        existing.unlink()
+        return shared_memory.SharedMemory(name, create=True, size=size)
+
+    @staticmethod
+    def _process_alive(pid):
+        """Работает ли процесс pid"""
+        if sys.platform == "win32":
+            # В Windows сегмент существует, только пока его держит открытым живой процесс
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def close(self):
+        """Освобождение разделяемой памяти (для банка с shared_name)"""
+        if self.shared is None:
+            return
+        self.registers = array("H", self.registers)
+        self.words = np.frombuffer(self.registers, dtype=np.uint16)
+        try:
+            self.shared.close()
+        except BufferError:
+            # На память ещё ссылаются представления floats()/uint32s() - её освободит сборщик
+            pass
+        try:
+            self.shared.unlink()
+        except FileNotFoundError:
+            # Сегмент уже удалён извне - снимаем его и с учёта трекера
+            if sys.platform != "win32":
+                resource_tracker.unregister(self.shared._name, "shared_memory")
+        self.shared = None
+
+    def _publish_sequence(self):
+        if self.shared is not None:
+            self.SHARED_SEQUENCE.pack_into(self.shared.buf, self.SHARED_SEQUENCE_OFFSET, self.sequence)
+
+    def transaction(self):
+        """Атомарная группа записей: with bank.transaction(): ..."""
+        return self
+
+    def __enter__(self):
+        self.lock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            self._owner = threading.get_ident()
+            self.sequence += 1
+            self._publish_sequence()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0:
+            self.sequence += 1
+            self._publish_sequence()
+            self._owner = None
+        self.lock.release()
+
+    def _consistent(self, func, *args):
+        """Чтение без блокировки: повтор, пока во время чтения шла запись"""
+        while True:
+            sequence = self.sequence
+            if sequence & 1:
+                if self._owner == threading.get_ident():
+                    return func(*args)
+                time.sleep(0)   # отдаём GIL писателю
+                continue
+            result = func(*args)
+            if self.sequence == sequence:
+                return result
+
+    def __len__(self):
+        return len(self.registers)
+
+    def __getitem__(self, address):
+        return self.registers[address]
+
+    def __setitem__(self, address, value):
+        with self:
+            self.registers[address] = value
+            if isinstance(address, slice):
+                start, stop, _ = address.indices(len(self.registers))
+                self._touch(start, stop - start)
+            else:
+                self._touch(address % len(self.registers), 1)
+
+    def _touch(self, address, count):
+        """Отметка диапазона изменённым и увеличение версий его блоков"""
+        if count <= 0:
+            return
+        self.dirty |= ((1 << count) - 1) << address
+        for block in range(address >> self.BLOCK_SHIFT, ((address + count - 1) >> self.BLOCK_SHIFT) + 1):
+            self.versions[block] += 1
+
+    def take_dirty(self):
+        """Забрать маску изменённых регистров и сбросить её"""
+        with self.lock:
+            dirty, self.dirty = self.dirty, 0
+        return dirty
+
+    def range_version(self, address, count):
+        """
+        Версия диапазона регистров
+
+        Сумма версий блоков: версии только растут, поэтому сумма меняется
+        при любой записи в диапазон.
+        """
+        return sum(self.versions[address >> self.BLOCK_SHIFT:((address + count - 1) >> self.BLOCK_SHIFT) + 1])
+
+    def _check_range(self, address, count):
+        if address < 0 or count < 0 or address + count > len(self.registers):
+            raise IndexError(f"Регистры {address}-{address + count - 1} вне диапазона")
+
+    def read(self, address, count):
+        """
+        Чтение диапазона регистров в байтовом образе Modbus
+
+        :param address: начальный адрес
+        :param count: количество регистров
+        :return: bytes длиной count * 2, big-endian
+        """
+        self._check_range(address, count)
+        return self._consistent(self._read, address, count)
+
+    def _read(self, address, count):
+        return self.words[address:address + count].astype(">u2").tobytes()
+
+    def snapshot(self, address, count):
+        """Согласованная копия диапазона регистров (array('H'))"""
+        self._check_range(address, count)
+        return self._consistent(self._snapshot, address, count)
+
+    def _snapshot(self, address, count):
+        return array("H", self.registers[address:address + count])
+
+    def unpack_from(self, layout, address=0):
+        """
+        Согласованное чтение регистров через struct.Struct без копирования
+
+        :param layout: struct.Struct в порядке байт машины ("<"), начиная с регистра address
+        :return: кортеж значений
+        """
+        self._check_range(address, (layout.size + 1) // 2)
+        return self._consistent(layout.unpack_from, self.registers, address * 2)
+
+    @staticmethod
+    def wire_view(buffer, offset=0):
+        """
+        Представление буфера как регистров в байтовом образе Modbus
+
+        Создаётся один раз для буфера ответа и используется в read_into().
+        """
+        return np.frombuffer(buffer, dtype=">u2", count=(len(buffer) - offset) // 2, offset=offset)
+
+    def read_into(self, address, out):
+        """
+        Чтение диапазона регистров прямо в буфер ответа
+
+        :param address: начальный адрес
+        :param out: представление из wire_view() длиной в количество регистров
+        """
+        count = len(out)
+        self._check_range(address, count)
+        self._consistent(out.__setitem__, slice(None), self.words[address:address + count])
+
+    def write(self, address, data):
+        """
+        Запись диапазона регистров из байтового образа Modbus
+
+        :param address: начальный адрес
+        :param data: байты big-endian, по 2 на регистр
+        :return: количество записанных регистров
+        """
+        count = len(data) // 2
+        self._check_range(address, count)
+        with self:
+            self.words[address:address + count] = np.frombuffer(data, dtype=">u2", count=count)
+            self._touch(address, count)
+        return count
+
+    def write_from(self, address, count, buffer, offset=0):
+        """
+        Запись диапазона регистров из байтового образа Modbus внутри буфера
+
+        :param address: начальный адрес
+        :param count: количество регистров
+        :param buffer: буфер с данными (например, весь кадр запроса)
+        :param offset: смещение данных в буфере, байт
+        """
+        self._check_range(address, count)
+        data = np.frombuffer(buffer, dtype=">u2", count=count, offset=offset)
+        with self:
+            self.words[address:address + count] = data
+            self._touch(address, count)
+
+    def _view(self, dtype, address, count):
+        self._check_range(address, count * 2)
+        return np.frombuffer(self.registers, dtype=dtype, count=count, offset=address * 2)
+
+    def floats(self, address, count=1):
+        """
+        Представление float32 поверх пар регистров (без копирования, только чтение)
+
+        Данные под представлением могут меняться параллельно; для согласованного
+        значения используйте get_float().
+        """
+        view = self._view("<f4", address, count)
+        view.flags.writeable = False
+        return view
+
+    def uint32s(self, address, count=1):
+        """Представление uint32 поверх пар регистров (без копирования, только чтение)"""
+        view = self._view("<u4", address, count)
+        view.flags.writeable = False
+        return view
+
+    def get_float(self, address):
+        """Получение float из двух регистров"""
+        view = self.floats(address)
+        return float(self._consistent(view.__getitem__, 0))
+
+    def set_float(self, address, value):
+        """Запись float в два регистра"""
+        view = self._view("<f4", address, 1)
+        with self:
+            view[0] = value
+            self._touch(address, 2)
+
+    def get_uint32(self, address):
+        """Получение uint32 из двух регистров"""
+        view = self.uint32s(address)
+        return int(self._consistent(view.__getitem__, 0))
+
+    def set_uint32(self, address, value):
+        """Запись uint32 в два регистра"""
+        view = self._view("<u4", address, 1)
+        with self:
+            view[0] = value
+            self._touch(address, 2)
@@ -0,0 +1,125 @@
+import sys
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from utils.RegisterBank import RegisterBank
+
+
+class RegisterBankReader:
+    """
+    Чтение банка регистров HMI из другого процесса.
+
+    Подключается к разделяемой памяти RegisterBank(shared_name=...) только
+    для чтения и повторяет чтение, пока во время него шла запись (sequence
+    lock, как в самом банке). Если запись не завершается за WRITE_TIMEOUT
+    (владелец, например, упал посреди записи), чтение выбрасывает
+    TimeoutError с указанием, жив ли процесс-владелец. Порядок байт, адресация и форматы float32/
+    uint32 те же, что у RegisterBank.
+
+        reader = RegisterBankReader("sig_registers")
+        pressure = reader.get_float(PRESSURE_MN1)
+    """
+
+    WRITE_TIMEOUT = 1.0     # с; запись в банк занимает микросекунды
+
+    def __init__(self, name):
+        """
+        :param name: имя разделяемой памяти банка
+        """
+        self.shared = shared_memory.SharedMemory(name)
+        if sys.platform != "win32":
+            # Сегментом владеет процесс HMI: не даём трекеру этого процесса удалить его при выходе
+            resource_tracker.unregister(self.shared._name, "shared_memory")
+
+        magic, size, _, owner = RegisterBank.SHARED_HEADER.unpack_from(self.shared.buf, 0)
+        if magic != RegisterBank.SHARED_MAGIC:
+            self.shared.close()
+            raise ValueError(f"{name} не является банком регистров SIG")
+
+        self.size = size
+        self.owner = owner      # PID процесса HMI
+        self.words = np.frombuffer(self.shared.buf, dtype=np.uint16, count=size,
+                                   offset=RegisterBank.SHARED_HEADER.size)
+        self.words.flags.writeable = False
+        self.sequence_view = np.frombuffer(self.shared.buf, dtype="<u8", count=1,
+                                           offset=RegisterBank.SHARED_SEQUENCE_OFFSET)
+
+        # Счётчики
+        self.retries = 0
+
+    def close(self):
+        self.words = None
+        self.sequence_view = None
+        self.shared.close()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def sequence(self):
+        """Счётчик записей банка (нечётный - идёт запись)"""
+        return int(self.sequence_view[0])
+
+    def consistent(self, func, *args):
+        """
+        Вызов func(*args), читающей words, без пересечения с записью
+
+        Позволяет читать прямо из words без копирования: результат
+        возвращается, только если банк не менялся во время вызова.
+        """
+        deadline = None
+        while True:
+            sequence = self.sequence
+            if sequence & 1:
+                if deadline is None:
+                    deadline = time.monotonic() + self.WRITE_TIMEOUT
+                elif time.monotonic() >= deadline:
+                    self._write_stalled()
+                time.sleep(0)
+                continue
+            result = func(*args)
+            if self.sequence == sequence:
+                return result
+            self.retries += 1
+
+    def _write_stalled(self):
+        if not RegisterBank._process_alive(self.owner):
+            raise TimeoutError(f"Процесс {self.owner}, владелец банка регистров, завершился во время записи")
+        raise TimeoutError(f"Запись в банк регистров процессом {self.owner} не завершилась "
+                           f"за {self.WRITE_TIMEOUT} с")
+
+    def _check_range(self, address, count):
+        if address < 0 or count < 0 or address + count > self.size:
+            raise IndexError(f"Регистры {address}-{address + count - 1} вне диапазона")
+
+    def snapshot(self, address=0, count=None):
+        """Согласованная копия диапазона регистров (array('H'))"""
+        if count is None:
+            count = self.size - address
+        self._check_range(address, count)
+        return self.consistent(lambda: array("H", self.words[address:address + count].tobytes()))
+
+    def read_into(self, address, out):
+        """
+        Согласованное чтение диапазона регистров в готовый массив
+
+        :param out: массив NumPy uint16 длиной в количество регистров
+        """
+        count = len(out)
+        self._check_range(address, count)
+        self.consistent(out.__setitem__, slice(None), self.words[address:address + count])
+
+    def get_float(self, address):
+        """Получение float из двух регистров"""
+        self._check_range(address, 2)
+        view = self.words[address:address + 2].view("<f4")
+        return float(self.consistent(view.__getitem__, 0))
+
+    def get_uint32(self, address):
+        """Получение uint32 из двух регистров"""
+        self._check_range(address, 2)
+        view = self.words[address:address + 2].view("<u4")
+        return int(self.consistent(view.__getitem__, 0))
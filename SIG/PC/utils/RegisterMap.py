@@ -0,0 +1,106 @@
+import struct
+
+import numpy as np
+
+from utils.constants_for_regs import F32, U16
+
+
+class RegisterMap:
+    """
+    Описание регистров HMI: адрес, тип, ограничения ввода и единица.
+
+    Строится по таблице REGISTER_FIELDS из constants_for_regs. По ней
+    заранее собирается один struct.Struct на все поля (с пропусками между
+    ними), и снимок регистров декодируется одним unpack_from прямо из
+    банка. Для массивов снимков (история, журнал) float поля декодируются
+    векторно NumPy. Запись значения идёт сразу в банк регистров по типу
+    поля, с проверкой ограничений.
+    """
+
+    FORMATS = {U16: ("H", 1), F32: ("f", 2)}    # тип -> (формат struct, регистров)
+
+    def __init__(self, fields):
+        """
+        :param fields: список (имя, адрес, тип, ограничения (min, max) или None, единица)
+        """
+        self.fields = {}
+        self.by_address = {}
+        for name, address, kind, limits, unit in fields:
+            if kind not in (U16, F32):
+                raise ValueError(f"Неизвестный тип регистра {name}: {kind}")
+            field = {"name": name, "address": address, "type": kind, "limits": limits, "unit": unit}
+            self.fields[name] = field
+            self.by_address.setdefault(address, field)
+
+        self.f32_names = [name for name, field in self.fields.items() if field["type"] == F32]
+        self.f32_index = np.array([self.fields[name]["address"] for name in self.f32_names], dtype=np.intp)
+
+        # Один формат на все поля: регистры в банке little-endian, float32
+        # младшим словом вперёд совпадает с "<f" по адресу младшего слова
+        layout = "<"
+        position = 0
+        self.layout_names = []
+        for address, field in sorted(self.by_address.items()):
+            code, width = self.FORMATS[field["type"]]
+            if address < position:
+                raise ValueError(f"Регистр {field['name']} перекрывает предыдущее поле")
+            layout += "x" * ((address - position) * 2) + code
+            position = address + width
+            self.layout_names.append(field["name"])
+        self.layout = struct.Struct(layout)
+        self.span = position    # регистры, которые нужно снять, чтобы декодировать все поля
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def limits(self, name):
+        """Ограничения ввода поля (min, max) или None"""
+        return self.fields[name]["limits"]
+
+    def decode(self, buffer):
+        """
+        Декодирование всех полей снимка регистров
+
+        :param buffer: регистры начиная с 0 в порядке байт машины (array('H'), снимок банка)
+        :return: словарь имя -> значение (int для u16, float для f32)
+        """
+        return dict(zip(self.layout_names, self.layout.unpack_from(buffer)))
+
+    def read(self, bank):
+        """Согласованное чтение всех полей прямо из банка регистров"""
+        return dict(zip(self.layout_names, bank.unpack_from(self.layout)))
+
+    def decode_floats(self, words):
+        """
+        Векторное декодирование float полей из массива снимков
+
+        :param words: массив NumPy uint16 (..., регистры начиная с 0), например история снимков
+        :return: массив float32 (..., len(f32_names)) в порядке f32_names
+        """
+        words = np.asarray(words, dtype=np.uint16)
+        low = words[..., self.f32_index].astype(np.uint32)
+        high = words[..., self.f32_index + 1].astype(np.uint32)
+        return (low | (high << 16)).view(np.float32)
+
+    def check(self, name, value):
+        """Проверка значения по ограничениям поля (0 допустим всегда, как в диалогах ввода)"""
+        limits = self.fields[name]["limits"]
+        if limits is not None and value != 0 and not limits[0] <= value <= limits[1]:
+            raise ValueError(f"{name}: допустимый диапазон {limits[0]}-{limits[1]}, получено {value}")
+
+    def encode(self, bank, name, value):
+        """Запись значения поля прямо в банк регистров"""
+        self.check(name, value)
+        field = self.fields[name]
+        if field["type"] == F32:
+            bank.set_float(field["address"], value)
+        else:
+            bank[field["address"]] = int(value)
+
+    def encode_many(self, bank, values):
+        """Запись нескольких полей одной транзакцией банка"""
+        for name, value in values.items():
+            self.check(name, value)
+        with bank.transaction():
+            for name, value in values.items():
+                self.encode(bank, name, value)
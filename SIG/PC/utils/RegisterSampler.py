@@ -0,0 +1,122 @@
+import collections
+import threading
+import time
+
+
+class RegisterSampler:
+    """
+    Сбор значений регистров с частотой, не связанной с перерисовкой графиков.
+
+    Поля RegisterMap (например PRESSURE_MN1, PRESSURE_MN2, SPEED) снимаются
+    одним согласованным чтением банка регистров:
+    - в своём потоке с частотой rate (10-100 Гц);
+    - или по каждой записи мастера - on_write() вызывается из потока
+      Modbus сразу после записи, точка снимается, только если запись
+      затронула собираемые регистры.
+
+    Время точки - монотонные часы в момент чтения (для on_write - момент
+    записи), приведённые к времени с начала эпохи на старте сборщика:
+    перевод системных часов не ломает порядок точек. Точки копятся в
+    потокобезопасной очереди ограниченной длины; поток Tk забирает их
+    пачкой drain() в TimeSeriesStore со своей, меньшей частотой.
+    Подписчики (subscribe) получают каждую точку сразу в потоке сбора -
+    например, журнал давлений SigCsvLogger, которому нужны все точки,
+    а не только дошедшие до графиков.
+    """
+
+    RATE_MIN_MAX = (10, 100)
+    QUEUE_SECONDS = 10      # точек в очереди - на столько секунд при наибольшей частоте
+
+    def __init__(self, registers, register_map, names, rate=20):
+        """
+        :param registers: банк регистров (RegisterBank)
+        :param register_map: описание регистров (RegisterMap)
+        :param names: имена собираемых полей
+        :param rate: частота сбора, Гц (None - только по записи мастера)
+        """
+        if rate is not None and not self.RATE_MIN_MAX[0] <= rate <= self.RATE_MIN_MAX[1]:
+            raise ValueError(f"Частота сбора {rate} Гц вне диапазона "
+                             f"{self.RATE_MIN_MAX[0]}-{self.RATE_MIN_MAX[1]} Гц")
+        self.registers = registers
+        self.register_map = register_map
+        self.names = tuple(names)
+        self.rate = rate
+        self.queue = collections.deque(maxlen=self.RATE_MIN_MAX[1] * self.QUEUE_SECONDS)
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.listeners = []
+
+        # Диапазон регистров собираемых полей - для проверки, затронут ли он записью
+        addresses = [register_map[name]["address"] for name in self.names]
+        self.address = min(addresses)
+        self.count = max(addresses) + 2 - self.address
+        self.version = None
+
+        # Монотонные часы -> время с начала эпохи
+        self.clock_offset = time.time_ns() - time.monotonic_ns()
+
+        # Счётчики
+        self.sampled = 0
+        self.dropped = 0
+
+    def start(self):
+        self.clock_offset = time.time_ns() - time.monotonic_ns()
+        if self.rate is not None and self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def subscribe(self, listener):
+        """
+        Вызов listener(время, значения) на каждую точку (до start)
+
+        Вызывается в потоке сбора или Modbus - должен быть быстрым.
+        """
+        self.listeners.append(listener)
+
+    def _loop(self):
+        """Сбор с постоянной частотой: сроки от старта, без накопления ошибки"""
+        period = 1 / self.rate
+        deadline = time.monotonic()
+        while not self.stop_event.is_set():
+            self.sample()
+            deadline += period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                self.stop_event.wait(delay)
+            else:
+                deadline = time.monotonic()     # отстали - без серии догоняющих чтений
+
+    def on_write(self, request=None):
+        """Колбэк записи мастера (поток Modbus): точка, если изменились собираемые регистры"""
+        version = self.registers.range_version(self.address, self.count)
+        if version != self.version:
+            self.version = version
+            self.sample()
+
+    def sample(self):
+        """Одна точка: согласованное чтение полей и время чтения"""
+        timestamp = time.monotonic_ns() + self.clock_offset
+        fields = self.register_map.read(self.registers)
+        values = {name: fields[name] for name in self.names}
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append((timestamp, values))
+        self.sampled += 1
+        for listener in self.listeners:
+            listener(timestamp, values)
+
+    def drain(self, store):
+        """Перенос накопленных точек в хранилище истории (поток Tk), число точек"""
+        points = []
+        while self.queue:
+            points.append(self.queue.popleft())
+        if points:
+            store.extend(points)
+        return len(points)
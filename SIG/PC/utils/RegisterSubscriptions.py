@@ -0,0 +1,30 @@
+class RegisterSubscriptions:
+    """
+    Подписки обработчиков на изменения регистров.
+
+    Каждый обработчик связан с битовой маской своих регистров. dispatch()
+    получает маску изменённых регистров (RegisterBank.take_dirty())
+    и вызывает только те обработчики, чьи регистры попали в неё.
+    """
+
+    ALL = -1    # маска "изменилось всё" для полного обновления
+
+    def __init__(self):
+        self.handlers = []
+
+    def subscribe(self, address, handler, count=1):
+        """
+        :param address: начальный регистр
+        :param handler: функция без аргументов
+        :param count: количество регистров (2 для float)
+        """
+        mask = ((1 << count) - 1) << address
+        self.handlers.append((mask, handler))
+
+    def dispatch(self, dirty):
+        """Вызов обработчиков изменённых регистров"""
+        if not dirty:
+            return
+        for mask, handler in self.handlers:
+            if dirty & mask:
+                handler()
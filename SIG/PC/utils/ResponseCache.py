@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    LRU-кэш закодированных ответов на чтение регистров.
+
+    Ключ - (адрес устройства, начальный регистр, количество), вместе с
+    ответом хранится версия диапазона из RegisterBank.range_version().
+    Запись с другой версией считается устаревшей и не выдаётся.
+    """
+
+    def __init__(self, size=32):
+        """
+        :param size: максимальное количество хранимых ответов
+        """
+        self.size = size
+        self.entries = OrderedDict()
+
+        # Счётчики
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """
+        Получение ответа из кэша
+
+        :return: байты ответа или None, если ответа нет или он устарел
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version, response):
+        """Сохранение ответа с версией диапазона"""
+        self.entries[key] = (version, bytes(response))
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,172 @@
+class RtuReceiver:
+    """
+    Сборщик кадров Modbus RTU из потока байт.
+
+    Байты подаются пачками (всё, что накопилось в порту), CRC считается
+    по мере поступления. Кадр считается принятым, как только набрана
+    ожидаемая длина и остаток CRC равен нулю.
+
+    Если начало буфера не удалось разобрать (чужой адрес, неизвестная
+    функция, неправдоподобный заголовок, ошибка CRC), приёмник не ждёт
+    паузы, а ищет дальше в буфере следующую правдоподобную пару (адрес,
+    функция) и проверяет кадр с неё заново - так кадр, пришедший вплотную
+    за помехой, не теряется. Незавершённый кадр сбрасывается паузой в 3.5
+    символа; перед сбросом в его остатке так же ищутся целые кадры -
+    помеха могла обещать длинный кадр, а за ней пришёл настоящий.
+    """
+
+    CRC_INIT = 0xFFFF
+
+    def __init__(self, crc16, unit_ids, function_codes, frame_length, char_time, frame_silence,
+                 on_crc_error=None):
+        """
+        :param crc16: функция CRC16 Modbus (crcmod), принимает (data, crc)
+        :param unit_ids: адреса устройств, кадры которых принимаются
+        :param function_codes: поддерживаемые коды функций
+        :param frame_length: функция определения ожидаемой длины кадра по его началу
+                             (None - заголовок неправдоподобен, это помеха)
+        :param char_time: время передачи одного символа, с
+        :param frame_silence: пауза между кадрами (3.5 символа), с
+        :param on_crc_error: функция, получающая кадр с неверным CRC
+        """
+        self.crc16 = crc16
+        self.unit_ids = unit_ids
+        self.function_codes = function_codes
+        self.frame_length = frame_length
+        self.char_time = char_time
+        self.frame_silence = frame_silence
+        self.on_crc_error = on_crc_error
+
+        self.buffer = bytearray()
+        self.crc = self.CRC_INIT
+        self.checked = 0        # сколько байт буфера уже учтено в CRC
+        self.resynced = False   # текущий кадр найден поиском, а не после паузы
+        self.last_rx = 0.0
+
+        # Счётчики
+        self.frames = 0
+        self.crc_errors = 0     # кадры с неверным CRC, начатые после паузы
+        self.dropped = 0        # незавершённые кадры, сброшенные паузой
+        self.recovered = 0      # кадры, найденные поиском после помехи
+        self.lost = 0           # кадры, начатые после паузы и отброшенные
+
+    @property
+    def idle(self):
+        """Нет начатого кадра - можно блокироваться в ожидании первого байта"""
+        return not self.buffer
+
+    @property
+    def pending(self):
+        """Сколько байт нужно дочитать до конца текущего кадра"""
+        return max((self.frame_length(self.buffer) or 0) - len(self.buffer), 1)
+
+    def feed(self, data, now):
+        """
+        Добавление принятых байт
+
+        :param data: принятые байты
+        :param now: время приёма (time.perf_counter)
+        :return: список полностью принятых кадров с верным CRC
+        """
+        frames = self.check_silence(now) or []
+        self.last_rx = now
+
+        self.buffer += data
+        frames += self._parse()
+        return frames
+
+    def _parse(self):
+        """Выделение из буфера целых кадров с верным CRC"""
+        frames = []
+        while self.buffer:
+            if self.buffer[0] not in self.unit_ids:
+                self._resync()
+                continue
+
+            if len(self.buffer) < 2:
+                break
+
+            if self.buffer[1] not in self.function_codes:
+                self._resync()
+                continue
+
+            expected = self.frame_length(self.buffer)
+            if expected is None:
+                self._resync()
+                continue
+
+            end = min(len(self.buffer), expected)
+            if end > self.checked:
+                self.crc = self.crc16(bytes(self.buffer[self.checked:end]), self.crc)
+                self.checked = end
+
+            if len(self.buffer) < expected:
+                break
+
+            # Остаток CRC по кадру вместе с его CRC равен нулю
+            if self.crc != 0:
+                # Неверный кадр-кандидат после поиска - это просто помеха
+                if not self.resynced:
+                    self.crc_errors += 1
+                    self.lost += 1
+                    if self.on_crc_error is not None:
+                        self.on_crc_error(bytes(self.buffer[:expected]))
+                self._resync()
+                continue
+
+            frames.append(bytes(self.buffer[:expected]))
+            del self.buffer[:expected]
+            self._reset_crc()
+            self.frames += 1
+            if self.resynced:
+                self.recovered += 1
+                self.resynced = False
+
+        return frames
+
+    def check_silence(self, now):
+        """
+        Проверка паузы между кадрами
+
+        Незавершённый кадр сбрасывается, но байты за его началом разбираются
+        заново: целые кадры в них возвращаются, остальное отбрасывается.
+
+        :return: None, если паузы ещё нет; иначе список кадров, найденных
+                 в сброшенном остатке (обычно пустой)
+        """
+        if now - self.last_rx < self.frame_silence:
+            return None
+
+        frames = []
+        if self.buffer:
+            self.dropped += 1
+            if not self.resynced:
+                self.lost += 1
+            while self.buffer:
+                self._resync()
+                frames += self._parse()
+        self._reset_crc()
+        self.resynced = False
+        return frames
+
+    def wait_time(self, now):
+        """Сколько можно спать до следующей проверки порта"""
+        silence_left = self.frame_silence - (now - self.last_rx)
+        return max(min(self.pending * self.char_time, silence_left), 0.0)
+
+    def _resync(self):
+        """Отбросить начало буфера до следующей правдоподобной пары (адрес, функция)"""
+        buffer = self.buffer
+        start = 1
+        while start < len(buffer):
+            if buffer[start] in self.unit_ids and (
+                    start + 1 == len(buffer) or buffer[start + 1] in self.function_codes):
+                break
+            start += 1
+        del buffer[:start]
+        self._reset_crc()
+        self.resynced = True
+
+    def _reset_crc(self):
+        self.crc = self.CRC_INIT
+        self.checked = 0
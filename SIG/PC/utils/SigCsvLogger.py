@@ -0,0 +1,169 @@
+import collections
+import os
+import threading
+import time
+
+
+class SigCsvLogger:
+    """
+    Запись давлений в CSV формата SIG с фоновой записью и ротацией файлов.
+
+    Файлы читает построитель графиков SIG/Graph (plot_built._read_sig_csv):
+    разделитель ";", десятичная точка, столбцы Date;Time;Pressure 1;Pressure 2.
+    Дата пишется как ГГГГ-ММ-ДД, время - ЧЧ:ММ:СС.ммм: Date и Time
+    склеиваются и разбираются pandas.to_datetime без формата, и только
+    такая запись однозначна (ДД.ММ.ГГГГ разбиралась бы как месяц.день)
+    и сохраняет миллисекунды точек при 100 Гц.
+
+    На горячем пути (log, поток сборщика или Modbus) точка только
+    добавляется в очередь ограниченной длины. Фоновый поток раз в
+    FLUSH_INTERVAL форматирует накопленные точки и пишет их одним вызовом
+    write, раз в FSYNC_INTERVAL делает fsync. Новый файл начинается, когда
+    текущий вырос до rotate_bytes или старше rotate_seconds. Если поток
+    записи не успевает и очередь переполняется, старые точки теряются и
+    учитываются в счётчике lost.
+    """
+
+    HEADER = "Date;Time;Pressure 1;Pressure 2\n"
+    FILE_NAME_FORMAT = "%d-%m-%Y_%H-%M-%S"     # как у файлов испытаний SIG
+    FLUSH_INTERVAL = 0.5
+    FSYNC_INTERVAL = 5.0
+    QUEUE_POINTS = 100 * 60     # минута при 100 Гц
+
+    def __init__(self, directory, columns=("PRESSURE_MN1", "PRESSURE_MN2"), rotate_bytes=64 * 2 ** 20,
+                 rotate_seconds=24 * 3600, decimals=2):
+        """
+        :param directory: каталог файлов журнала (создаётся при запуске)
+        :param columns: поля точки для столбцов Pressure 1 и Pressure 2
+        :param rotate_bytes: размер файла, после которого начинается новый (None - без ограничения)
+        :param rotate_seconds: длительность файла, с (None - без ограничения)
+        :param decimals: знаков после точки в давлениях
+        """
+        self.directory = directory
+        self.columns = tuple(columns)
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.value_format = f"{{:.{decimals}f}}"
+        self.queue = collections.deque(maxlen=self.QUEUE_POINTS)
+
+        self.file = None
+        self.file_path = None
+        self.file_started = None    # время первой точки файла, с от начала эпохи
+        self.file_bytes = 0
+        self.last_fsync = 0.0
+        self.prefix_second = None   # секунда, для которой построен prefix
+        self.prefix = ""            # "дата;чч:мм:сс" этой секунды
+
+        self.thread = None
+        self.stop_event = threading.Event()
+
+        # Счётчики
+        self.logged = 0
+        self.written = 0
+        self.lost = 0
+        self.files = 0
+        self.errors = 0
+
+    def start(self):
+        """Запуск фоновой записи"""
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._flush_loop, name="SigCsvLogger", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Остановка фоновой записи со сбросом оставшихся точек на диск"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+        self._flush()
+        self._close_file()
+
+    def log(self, timestamp, values):
+        """
+        Точка в очередь записи (из любого потока)
+
+        :param timestamp: время точки, нс от начала эпохи
+        :param values: значения полей по именам (нужны columns)
+        """
+        if len(self.queue) == self.queue.maxlen:
+            self.lost += 1
+        self.queue.append((timestamp, values[self.columns[0]], values[self.columns[1]]))
+        self.logged += 1
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.FLUSH_INTERVAL):
+            self._flush()
+
+    def _flush(self):
+        """Запись в файл накопившихся точек"""
+        points = []
+        while self.queue:
+            points.append(self.queue.popleft())
+        if not points:
+            return
+
+        try:
+            lines = []
+            for timestamp, first, second in points:
+                seconds, nanoseconds = divmod(timestamp, 1_000_000_000)
+                if self.file is None or self._rotation_due(seconds):
+                    self._write_lines(lines)
+                    lines = []
+                    self._open_file(seconds)
+                if seconds != self.prefix_second:
+                    self.prefix_second = seconds
+                    self.prefix = time.strftime("%Y-%m-%d;%H:%M:%S", time.localtime(seconds))
+                lines.append(f"{self.prefix}.{nanoseconds // 1_000_000:03d};"
+                             f"{self.value_format.format(first)};{self.value_format.format(second)}\n")
+            self._write_lines(lines)
+
+            if time.monotonic() - self.last_fsync >= self.FSYNC_INTERVAL:
+                os.fsync(self.file.fileno())
+                self.last_fsync = time.monotonic()
+        except OSError as e:
+            self.errors += 1
+            print(f"Ошибка записи журнала давлений {self.file_path}: {e}")
+            self._close_file()
+
+    def _rotation_due(self, seconds):
+        return ((self.rotate_bytes is not None and self.file_bytes >= self.rotate_bytes)
+                or (self.rotate_seconds is not None and seconds - self.file_started >= self.rotate_seconds))
+
+    def _write_lines(self, lines):
+        if lines:
+            data = "".join(lines)
+            self.file.write(data)
+            self.file.flush()
+            self.file_bytes += len(data)    # строки ASCII - байт столько же, сколько символов
+            self.written += len(lines)
+
+    def _open_file(self, seconds):
+        """Новый файл журнала, названный по времени первой точки"""
+        self._close_file()
+        os.makedirs(self.directory, exist_ok=True)
+        name = time.strftime(self.FILE_NAME_FORMAT, time.localtime(seconds))
+        path = os.path.join(self.directory, f"{name}.csv")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{name}_{suffix}.csv")
+            suffix += 1
+
+        self.file = open(path, "w", encoding="ascii", newline="")
+        self.file.write(self.HEADER)
+        self.file_path = path
+        self.file_started = seconds
+        self.file_bytes = len(self.HEADER)
+        self.files += 1
+
+    def _close_file(self):
+        if self.file is not None:
+            try:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+            except OSError as e:
+                print(f"Ошибка закрытия журнала давлений {self.file_path}: {e}")
+            self.file = None
+            self.last_fsync = time.monotonic()
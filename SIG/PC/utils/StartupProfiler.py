@@ -0,0 +1,63 @@
+import threading
+import time
+
+
+class StartupProfiler:
+    """
+    Профиль запуска HMI по этапам.
+
+    Каждый поток запуска (поток Tk, поток запуска Modbus) отмечает конец
+    своих этапов (mark): этап длится от предыдущей отметки того же потока.
+    Вехи (milestone) - моменты, ради которых всё затевается: первая
+    отрисовка окна, первый ответ мастеру Modbus. Все времена - в мс от
+    origin (обычно начало импорта App), так что этапы двух потоков
+    видны на одной шкале.
+    """
+
+    def __init__(self, origin=None):
+        """
+        :param origin: начало отсчёта (time.perf_counter()), по умолчанию - сейчас
+        """
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.lock = threading.Lock()
+        self.phases = []        # (поток, этап, начало, конец), с от origin
+        self.milestones = {}    # веха -> время от origin, с
+        self.last_marks = {}    # поток -> время его последней отметки
+
+    def begin(self):
+        """Начало отсчёта этапов текущего потока (для потоков, запущенных позже origin)"""
+        with self.lock:
+            self.last_marks[threading.current_thread().name] = time.perf_counter()
+
+    def mark(self, name):
+        """Конец этапа name текущего потока"""
+        now = time.perf_counter()
+        thread = threading.current_thread().name
+        with self.lock:
+            start = self.last_marks.get(thread, self.origin)
+            self.phases.append((thread, name, start - self.origin, now - self.origin))
+            self.last_marks[thread] = now
+
+    def milestone(self, name, at=None):
+        """
+        Отметка вехи (повторная отметка той же вехи не меняет время)
+
+        :param at: момент вехи (time.perf_counter()), по умолчанию - сейчас
+        """
+        at = at if at is not None else time.perf_counter()
+        with self.lock:
+            self.milestones.setdefault(name, at - self.origin)
+
+    def report(self):
+        """Текст отчёта: этапы по времени начала, затем вехи"""
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[2])
+            milestones = sorted(self.milestones.items(), key=lambda item: item[1])
+
+        lines = ["Запуск HMI, мс от начала импорта:",
+                 f"  {'поток':<14}{'этап':<34}{'начало':>8}{'длит.':>8}"]
+        for thread, name, start, end in phases:
+            lines.append(f"  {thread:<14}{name:<34}{start * 1e3:>8.0f}{(end - start) * 1e3:>8.0f}")
+        for name, at in milestones:
+            lines.append(f"  {name}: {at * 1e3:.0f} мс")
+        return "\n".join(lines)
@@ -0,0 +1,420 @@
+import json
+import os
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+class TimeSeriesStore:
+    """
+    Общая история измерений для графиков.
+
+    Одна временная шкала на все ряды. Данные лежат в кольцевом буфере
+    фиксированной ёмкости: время - int64 (нс с начала эпохи), значения
+    каждого ряда - float32. Добавление точки и выборка окна не зависят
+    от накопленной истории, память постоянна при сколь угодно долгих
+    испытаниях. Вытесняемые точки при заданном spill_path дописываются
+    в файл блоками (записи time int64 + ряды float32, см. record_dtype и
+    read_spill), иначе отбрасываются. Файл свой на каждый запуск: чужой
+    файл по тому же пути не перезаписывается, новый получает суффикс _1,
+    _2, ... (spill_path - фактический путь). В начале файла SPILL_MAGIC
+    (с номером версии) и описание полей записи, по которому read_spill
+    читает файл независимо от текущего набора рядов.
+
+    Параллельно по мере поступления точек строится пирамида агрегатов:
+    на уровне k точки объединяются в интервалы по LEVEL_FACTOR**k точек,
+    для каждого хранятся время первой точки, минимум, максимум и среднее
+    каждого ряда. Уровень обновляется только при закрытии интервала
+    предыдущего уровня, поэтому добавление точки почти не дорожает.
+    envelope() выбирает самый подробный уровень, на котором окно
+    укладывается в заданное число интервалов: любое окно, от последних
+    секунд до всего испытания, выдаётся за время, не зависящее от
+    длины истории, и пики давления не теряются при прореживании.
+
+    Графики (PressureGraph) не копируют данные, а читают окно из общего
+    хранилища и подписываются на добавление точек. Индексы window() и
+    labels() считаются от самой старой хранимой точки, индексы
+    envelope() и time_at() - от начала истории. Все методы вызываются из
+    потока Tk.
+    """
+
+    DEFAULT_CAPACITY = 86400    # сутки опроса раз в секунду
+    LABELS_CACHE_SIZE = 1024
+    LEVEL_FACTOR = 8            # во сколько раз интервал уровня длиннее предыдущего
+    LEVELS = 6                  # уровни пирамиды: интервалы 8 ... 8**6 точек
+    LEVEL_CAPACITY = 4096       # интервалов на уровне
+    SPILL_MAGIC = b"SIGHST1\n"
+    SPILL_LAYOUT_LENGTH = struct.Struct("<I")  # длина описания полей (JSON) после метки
+
+    def __init__(self, series_names, capacity=DEFAULT_CAPACITY, spill_path=None, spill_block=4096):
+        """
+        :param series_names: имена рядов, например ("PRESSURE_MN1", "PRESSURE_MN2")
+        :param capacity: число хранимых в памяти точек
+        :param spill_path: файл для вытесняемых точек (None - отбрасывать); существующий не перезаписывается
+        :param spill_block: точек в одной записи в файл
+        """
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.series = {name: np.full(capacity, np.nan, dtype=np.float32) for name in series_names}
+        self.count = 0          # всего добавлено точек
+        self.listeners = []
+        self._labels = {}       # секунда -> подпись времени
+
+        self.spill_path = None
+        self.spill_block = min(spill_block, capacity)
+        self.spilled = 0        # точек записано в файл (от самой первой)
+        self._spill_file = self._open_spill(spill_path) if spill_path else None
+
+        # Пирамида агрегатов: закрытые интервалы в кольцах и открытый интервал каждого уровня
+        self.levels = []
+        for level in range(1, self.LEVELS + 1):
+            self.levels.append({
+                "points": self.LEVEL_FACTOR ** level,   # точек в интервале
+                "count": 0,                             # закрыто интервалов
+                "times": np.zeros(self.LEVEL_CAPACITY, dtype=np.int64),
+                "min": {}, "max": {}, "mean": {},
+            })
+        for name in self.series:
+            self._add_level_series(name)
+        self._open = [None] * self.LEVELS
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def first(self):
+        """Номер самой старой хранимой точки от начала истории"""
+        return max(0, self.count - self.capacity)
+
+    @property
+    def record_dtype(self):
+        """Формат записи в файле вытеснения"""
+        return np.dtype([("time", "<i8")] + [(name, "<f4") for name in self.series])
+
+    def add_series(self, name):
+        """Новый ряд; для уже накопленных точек значение неизвестно (nan)"""
+        if name not in self.series:
+            if self.spilled:
+                raise ValueError(f"Ряд {name} нельзя добавить: часть истории уже записана в файл")
+            self.series[name] = np.full(self.capacity, np.nan, dtype=np.float32)
+            self._add_level_series(name)
+            for bucket in self._open:
+                if bucket is not None:
+                    bucket["stats"][name] = [None, None, 0.0, 0]
+        return self.series[name]
+
+    def _add_level_series(self, name):
+        for level in self.levels:
+            for key in ("min", "max", "mean"):
+                level[key][name] = np.full(self.LEVEL_CAPACITY, np.nan, dtype=np.float32)
+
+    def append(self, values, timestamp=None):
+        """
+        Добавление точки во все ряды
+
+        :param values: словарь имя ряда -> значение (отсутствующие ряды получают nan)
+        :param timestamp: время точки, нс с начала эпохи (по умолчанию - текущее)
+        """
+        self._append(values, timestamp)
+        for listener in self.listeners:
+            listener()
+
+    def extend(self, points):
+        """
+        Добавление пачки точек с одним оповещением подписчиков
+
+        :param points: последовательность (время, нс; словарь значений)
+        """
+        for timestamp, values in points:
+            self._append(values, timestamp)
+        for listener in self.listeners:
+            listener()
+
+    def _append(self, values, timestamp):
+        if self._spill_file and self.count - self.spilled >= self.capacity:
+            self._spill(self.spill_block)
+
+        position = self.count % self.capacity
+        timestamp = time.time_ns() if timestamp is None else timestamp
+        self.times[position] = timestamp
+        for name, data in self.series.items():
+            data[position] = values.get(name, np.nan)
+        self.count += 1
+        self._aggregate(timestamp, values)
+
+    def _aggregate(self, timestamp, values):
+        """Учёт точки в открытом интервале первого уровня"""
+        bucket = self._open[0]
+        if bucket is None:
+            bucket = self._open[0] = self._new_bucket(timestamp)
+        for name, stats in bucket["stats"].items():
+            value = values.get(name)
+            if value is None or value != value:     # нет значения или nan
+                continue
+            if stats[3]:
+                if value < stats[0]:
+                    stats[0] = value
+                elif value > stats[1]:
+                    stats[1] = value
+            else:
+                stats[0] = stats[1] = value
+            stats[2] += value
+            stats[3] += 1
+        bucket["points"] += 1
+        if bucket["points"] == self.levels[0]["points"]:
+            self._close(0)
+
+    def _new_bucket(self, timestamp):
+        # Статистика ряда: [минимум, максимум, сумма, число значений]
+        return {"time": timestamp, "points": 0, "stats": {name: [None, None, 0.0, 0] for name in self.series}}
+
+    def _close(self, level_index):
+        """Закрытие интервала уровня: запись в кольцо и учёт в интервале следующего уровня"""
+        level = self.levels[level_index]
+        bucket = self._open[level_index]
+        self._open[level_index] = None
+        position = level["count"] % self.LEVEL_CAPACITY
+        level["times"][position] = bucket["time"]
+        for name, (low, high, total, number) in bucket["stats"].items():
+            level["min"][name][position] = low if number else np.nan
+            level["max"][name][position] = high if number else np.nan
+            level["mean"][name][position] = total / number if number else np.nan
+        level["count"] += 1
+
+        if level_index + 1 == self.LEVELS:
+            return
+        upper = self._open[level_index + 1]
+        if upper is None:
+            upper = self._open[level_index + 1] = self._new_bucket(bucket["time"])
+        for name, stats in bucket["stats"].items():
+            low, high, total, number = stats
+            if not number:
+                continue
+            merged = upper["stats"][name]
+            if merged[3]:
+                merged[0] = min(merged[0], low)
+                merged[1] = max(merged[1], high)
+            else:
+                merged[0], merged[1] = low, high
+            merged[2] += total
+            merged[3] += number
+        upper["points"] += bucket["points"]
+        if upper["points"] == self.levels[level_index + 1]["points"]:
+            self._close(level_index + 1)
+
+    def envelope(self, name, start, end, max_points=400):
+        """
+        Огибающая ряда на окне точек [start, end) не более чем из max_points интервалов
+
+        Берутся исходные точки, если окно в них укладывается, иначе самый
+        подробный уровень пирамиды. Последний интервал может быть ещё
+        открытым (неполным).
+
+        :param start: номер первой точки окна от начала истории (см. count, first)
+        :param end: номер точки после окна
+        :return: словарь массивов одной длины: index (номер первой точки
+            интервала), time (время первой точки, нс), min, max, mean
+        """
+        start = max(0, start)
+        end = min(self.count, end)
+        if end - start <= max_points and start >= self.first:
+            times, values = self.window(name, start - self.first, end - self.first)
+            return {"index": np.arange(start, end), "time": times, "min": values, "max": values, "mean": values}
+
+        for level_index, level in enumerate(self.levels):
+            # Уровень подходит, если хранит начало окна и окно укладывается в max_points
+            points = level["points"]
+            first_bin = start // points
+            end_bin = -(-end // points)
+            oldest = level["count"] - self.LEVEL_CAPACITY
+            if first_bin >= oldest and end_bin - first_bin <= max_points or level_index + 1 == self.LEVELS:
+                first_bin = max(first_bin, oldest)
+                break
+
+        # Закрытые интервалы из кольца уровня
+        length = max(0, min(end_bin, level["count"]) - first_bin)
+        result = {"index": np.arange(first_bin, first_bin + length) * points,
+                  "time": self._level_slice(level["times"], first_bin, length)}
+        for key in ("min", "max", "mean"):
+            result[key] = self._level_slice(level[key][name], first_bin, length)
+
+        # Открытый интервал - в конце окна
+        if end_bin > level["count"]:
+            opened = self._open_stats(level_index, name)
+            if opened is not None:
+                timestamp, low, high, mean = opened
+                result["index"] = np.append(result["index"], level["count"] * points)
+                result["time"] = np.append(result["time"], timestamp)
+                result["min"] = np.append(result["min"], np.float32(low))
+                result["max"] = np.append(result["max"], np.float32(high))
+                result["mean"] = np.append(result["mean"], np.float32(mean))
+        return result
+
+    def _open_stats(self, level_index, name):
+        """
+        Статистика открытого интервала уровня вместе с ещё не закрытыми
+        интервалами нижних уровней: (время, минимум, максимум, среднее) или None
+        """
+        timestamp = None
+        low = high = None
+        total = 0.0
+        number = 0
+        for bucket in self._open[level_index::-1]:
+            if bucket is None:
+                continue
+            if timestamp is None:
+                timestamp = bucket["time"]
+            bucket_low, bucket_high, bucket_total, bucket_number = bucket["stats"][name]
+            if bucket_number:
+                low = bucket_low if low is None else min(low, bucket_low)
+                high = bucket_high if high is None else max(high, bucket_high)
+                total += bucket_total
+                number += bucket_number
+        if not number:
+            return None
+        return timestamp, low, high, total / number
+
+    def _level_slice(self, data, first_bin, length):
+        """Копия length интервалов кольца уровня, начиная с интервала first_bin"""
+        first = first_bin % self.LEVEL_CAPACITY
+        last = first + length
+        if last <= self.LEVEL_CAPACITY:
+            return data[first:last].copy()
+        return np.concatenate((data[first:], data[:last - self.LEVEL_CAPACITY]))
+
+    def time_at(self, index):
+        """Время точки с номером index от начала истории (для вытесненных - время начала интервала)"""
+        if index >= self.first:
+            return int(self.times[index % self.capacity])
+        for level in self.levels:
+            oldest = level["count"] - self.LEVEL_CAPACITY
+            bin_index = index // level["points"]
+            if bin_index >= oldest or level is self.levels[-1]:
+                return int(level["times"][max(bin_index, oldest) % self.LEVEL_CAPACITY])
+
+    def _slice(self, data, start, end):
+        """Копия точек [start, end) кольцевого буфера data, не более двух срезов"""
+        start = max(0, start)
+        end = min(len(self), end)
+        if end <= start:
+            return data[:0].copy()
+        first = (self.first + start) % self.capacity
+        last = first + (end - start)
+        if last <= self.capacity:
+            return data[first:last].copy()
+        return np.concatenate((data[first:], data[:last - self.capacity]))
+
+    def window(self, name, start, end):
+        """
+        Время и значения ряда в диапазоне точек [start, end)
+
+        :return: (время int64, нс; значения float32) - копии, буфер может быть перезаписан
+        """
+        return self._slice(self.times, start, end), self._slice(self.series[name], start, end)
+
+    def labels(self, start, end):
+        """Подписи времени "%H:%M:%S" точек [start, end)"""
+        return [self.label(timestamp) for timestamp in self._slice(self.times, start, end).tolist()]
+
+    def label(self, timestamp, fmt="%H:%M:%S"):
+        """
+        Подпись времени; строка формируется один раз на секунду и формат
+
+        %f в формате - миллисекунды (три цифры), такие подписи формируются
+        один раз на миллисекунду.
+        """
+        unit = 1_000_000 if "%f" in fmt else 1_000_000_000
+        key = (timestamp // unit, fmt)
+        label = self._labels.get(key)
+        if label is None:
+            if len(self._labels) >= self.LABELS_CACHE_SIZE:
+                self._labels.clear()
+            seconds, millis = divmod(key[0] * unit, 1_000_000_000)
+            if "%f" in fmt:
+                fmt = fmt.replace("%f", f"{millis // 1_000_000:03d}")
+            label = datetime.fromtimestamp(seconds).strftime(fmt)
+            self._labels[key] = label
+        return label
+
+    def _open_spill(self, path):
+        """Новый файл вытеснения: история прошлых запусков (например, до сбоя HMI) сохраняется"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        name, extension = os.path.splitext(path)
+        suffix = 1
+        while True:
+            try:
+                file = open(path, "xb")
+                break
+            except FileExistsError:
+                path = f"{name}_{suffix}{extension}"
+                suffix += 1
+        self.spill_path = path
+        return file
+
+    def _spill(self, points):
+        """Запись в файл самых старых ещё не записанных точек"""
+        if self._spill_file.tell() == 0:
+            # Набор рядов с этого момента не меняется (add_series) - описание полей окончательное
+            layout = json.dumps(self.record_dtype.descr).encode("ascii")
+            self._spill_file.write(self.SPILL_MAGIC + self.SPILL_LAYOUT_LENGTH.pack(len(layout)) + layout)
+        start = self.spilled - self.first
+        end = min(start + points, len(self))
+        records = np.empty(end - start, dtype=self.record_dtype)
+        records["time"] = self._slice(self.times, start, end)
+        for name, data in self.series.items():
+            records[name] = self._slice(data, start, end)
+        records.tofile(self._spill_file)
+        self.spilled += end - start
+
+    def flush(self):
+        """Запись в файл вытеснения всех хранимых точек (например, перед закрытием)"""
+        if self._spill_file:
+            self._spill(self.count - self.spilled)
+            self._spill_file.flush()
+
+    def close(self):
+        self.flush()
+        if self._spill_file:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def read_spill(self):
+        """Вся записанная в файл за этот запуск история - структурированный массив record_dtype"""
+        if self._spill_file:
+            self._spill_file.flush()
+        if not os.path.getsize(self.spill_path):
+            return np.empty(0, dtype=self.record_dtype)
+        return read_spill(self.spill_path)
+
+    def subscribe(self, listener):
+        """Вызов listener() после каждой добавленной точки"""
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+
+def read_spill(path):
+    """
+    Чтение файла вытеснения TimeSeriesStore
+
+    :return: структурированный массив: time (нс с начала эпохи) и ряды, записанные в файл
+    """
+    magic = TimeSeriesStore.SPILL_MAGIC
+    with open(path, "rb") as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"{path} не является файлом истории SIG (версии {magic[-2:-1].decode()})")
+        header = f.read(TimeSeriesStore.SPILL_LAYOUT_LENGTH.size)
+        if len(header) < TimeSeriesStore.SPILL_LAYOUT_LENGTH.size:
+            raise ValueError(f"{path}: заголовок файла истории обрезан")
+        (length,) = TimeSeriesStore.SPILL_LAYOUT_LENGTH.unpack(header)
+        try:
+            dtype = np.dtype([tuple(field) for field in json.loads(f.read(length))])
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"{path}: неверное описание полей файла истории: {e}")
+        return np.fromfile(f, dtype=dtype)
@@ -0,0 +1,222 @@
+import os
+import struct
+import sys
+import threading
+import time
+
+
+class TrafficCapture:
+    """
+    Кольцевой буфер обмена Modbus с фоновой записью в бинарный файл.
+
+    Каждая запись - время приёма/передачи, направление, признак верного CRC,
+    время обработки запроса и сами байты кадра. На горячем пути запись
+    только копируется в заранее выделенный буфер; в файл записи сбрасывает
+    фоновый поток раз в FLUSH_INTERVAL. Если поток не успевает и кольцо
+    переполняется, старые записи теряются и учитываются в счётчике lost.
+
+    Формат файла: MAGIC, затем записи RECORD (время, направление, флаги,
+    длина, время обработки) и следом length байт кадра.
+
+    Файл дописывается между запусками, но не больше max_bytes: заполненный
+    файл переименовывается в path.1 (прежний path.1 - в path.2 и так до
+    backups), и запись продолжается в новый файл. На диске остаётся не
+    больше (backups + 1) * max_bytes захвата.
+    """
+
+    # Направление
+    RX = 0
+    TX = 1
+
+    # Флаги записи
+    FLAG_CRC_OK = 0x01
+
+    # Уровни подробности
+    VERBOSITY_OFF = 0       # ничего не сохраняется
+    VERBOSITY_CAPTURE = 1   # кольцевой буфер и файл
+    VERBOSITY_PRINT = 2     # то же и вывод каждого кадра в консоль
+
+    MAGIC = b"SIGCAP1\n"
+    RECORD = struct.Struct("<dBBHf")    # время, направление, флаги, длина, обработка
+    MAX_FRAME_LENGTH = 256
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path=None, verbosity=VERBOSITY_CAPTURE, slots=4096, max_bytes=None, backups=3):
+        """
+        :param path: файл для записи захвата (None - только кольцевой буфер)
+        :param verbosity: уровень подробности
+        :param slots: количество записей в кольцевом буфере
+        :param max_bytes: размер файла, после которого он уходит в архив (None - без ограничения)
+        :param backups: сколько архивных файлов path.1 ... path.N хранить
+        """
+        self.path = path
+        self.verbosity = verbosity
+        self.slots = slots
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.slot_size = self.RECORD.size + self.MAX_FRAME_LENGTH
+        self.ring = bytearray(slots * self.slot_size)
+        self.ring_view = memoryview(self.ring)
+
+        self.written = 0    # сколько записей добавлено всего
+        self.flushed = 0    # сколько из них обработано потоком записи
+        self.lost = 0
+
+        self.file = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        """Открытие файла и запуск фоновой записи"""
+        if self.path is None or self.verbosity == self.VERBOSITY_OFF:
+            return
+
+        self._open_file()
+        if self.max_bytes is not None and self.file.tell() >= self.max_bytes:
+            self._rotate()
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._flush_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Остановка фоновой записи со сбросом оставшихся записей"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+        if self.file is not None:
+            self._flush()
+            self.file.close()
+            self.file = None
+
+    def record(self, direction, frame, crc_ok=True, latency=0.0):
+        """
+        Запись кадра в кольцевой буфер
+
+        :param direction: RX или TX
+        :param frame: байты кадра
+        :param crc_ok: верен ли CRC кадра
+        :param latency: время обработки запроса (для ответа), с
+        """
+        if self.verbosity == self.VERBOSITY_OFF:
+            return
+
+        if self.verbosity >= self.VERBOSITY_PRINT:
+            print("REQUEST " if direction == self.RX else "RESPONSE ", frame.hex())
+
+        length = len(frame)
+        if length > self.MAX_FRAME_LENGTH:
+            length = self.MAX_FRAME_LENGTH
+            frame = frame[:length]
+        offset = (self.written % self.slots) * self.slot_size
+        self.RECORD.pack_into(
+            self.ring, offset, time.time(), direction,
+            self.FLAG_CRC_OK if crc_ok else 0, length, latency,
+        )
+        data_offset = offset + self.RECORD.size
+        self.ring[data_offset:data_offset + length] = frame
+        self.written += 1
+
+    def records(self):
+        """Записи, находящиеся сейчас в кольцевом буфере (от старых к новым)"""
+        end = self.written
+        for index in range(max(0, end - self.slots), end):
+            yield self._decode_slot(index % self.slots)
+
+    def _decode_slot(self, slot):
+        offset = slot * self.slot_size
+        timestamp, direction, flags, length, latency = self.RECORD.unpack_from(self.ring, offset)
+        data_offset = offset + self.RECORD.size
+        return timestamp, direction, bool(flags & self.FLAG_CRC_OK), latency, bytes(self.ring[data_offset:data_offset + length])
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.FLUSH_INTERVAL):
+            self._flush()
+
+    def _flush(self):
+        """Запись в файл накопившихся записей"""
+        end = self.written
+        if end - self.flushed > self.slots:
+            self.lost += end - self.flushed - self.slots
+            self.flushed = end - self.slots
+
+        # Записи копируются сразу: record пишет в кольцо без блокировки
+        first = self.flushed
+        chunks = []
+        for index in range(first, end):
+            offset = (index % self.slots) * self.slot_size
+            length = min(self.RECORD.unpack_from(self.ring, offset)[3], self.MAX_FRAME_LENGTH)
+            chunks.append(bytes(self.ring_view[offset:offset + self.RECORD.size + length]))
+        self.flushed = end
+
+        # Слот записи index перезаписывается с началом записи index + slots (запись
+        # written может идти прямо сейчас): такие копии могли захватить заголовок
+        # одного кадра и байты другого
+        overtaken = min(self.written - self.slots + 1 - first, len(chunks))
+        if overtaken > 0:
+            self.lost += overtaken
+            chunks = chunks[overtaken:]
+
+        if chunks:
+            self.file.write(b"".join(chunks))
+            self.file.flush()
+            if self.max_bytes is not None and self.file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _open_file(self):
+        self.file = open(self.path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(self.MAGIC)
+
+    def _rotate(self):
+        """Заполненный файл - в архив path.1, старые архивы сдвигаются, лишний удаляется"""
+        self.file.close()
+        try:
+            for index in range(self.backups, 0, -1):
+                source = f"{self.path}.{index - 1}" if index > 1 else self.path
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index}")
+            if self.backups == 0:
+                os.remove(self.path)
+        except OSError as e:
+            print(f"Не удалось перенести файл захвата {self.path} в архив: {e}")
+        self._open_file()
+
+
+def read_capture(path):
+    """
+    Чтение файла захвата
+
+    :return: генератор (время, направление, crc_ok, время обработки, байты кадра)
+    """
+    with open(path, "rb") as f:
+        if f.read(len(TrafficCapture.MAGIC)) != TrafficCapture.MAGIC:
+            raise ValueError(f"{path} не является файлом захвата SIG")
+
+        while True:
+            header = f.read(TrafficCapture.RECORD.size)
+            if len(header) < TrafficCapture.RECORD.size:
+                return
+            timestamp, direction, flags, length, latency = TrafficCapture.RECORD.unpack(header)
+            yield timestamp, direction, bool(flags & TrafficCapture.FLAG_CRC_OK), latency, f.read(length)
+
+
+def main(path):
+    """Вывод файла захвата в текстовом виде"""
+    for timestamp, direction, crc_ok, latency, frame in read_capture(path):
+        moment = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+        millis = int((timestamp % 1) * 1000)
+        arrow = "->" if direction == TrafficCapture.RX else "<-"
+        status = "" if crc_ok else " CRC!"
+        handling = f" {latency * 1e3:.2f} мс" if direction == TrafficCapture.TX else ""
+        print(f"{moment}.{millis:03d} {arrow} {frame.hex(' ')}{status}{handling}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Использование: python -m utils.TrafficCapture <файл захвата>")
+        sys.exit(1)
+    main(sys.argv[1])
@@ -0,0 +1,65 @@
+import queue
+
+
+class UiDispatcher:
+    """
+    Передача вызовов из фоновых потоков в главный цикл Tk.
+
+    Фоновый поток только кладёт вызов в потокобезопасную очередь и никогда
+    не ждёт интерфейс. Очередь разбирается таймером Tk after раз в interval
+    мс; одинаковые обработчики, пришедшие за один тик, схлопываются
+    в один вызов с аргументами последнего из них.
+    """
+
+    def __init__(self, root, interval=50):
+        """
+        :param root: виджет Tk, в цикле которого выполняются вызовы
+        :param interval: период разбора очереди, мс
+        """
+        self.root = root
+        self.interval = interval
+        self.queue = queue.SimpleQueue()
+        self.after_id = None
+
+        # Счётчики
+        self.posted = 0
+        self.dispatched = 0
+
+    def post(self, handler, *args):
+        """Поставить вызов handler(*args) в очередь (из любого потока)"""
+        self.posted += 1
+        self.queue.put((handler, args))
+
+    def wrap(self, handler):
+        """Обёртка над handler, которая вместо вызова ставит его в очередь"""
+        return lambda *args: self.post(handler, *args)
+
+    def start(self):
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval, self._drain)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _drain(self):
+        """Разбор очереди в потоке Tk"""
+        pending = {}
+        while True:
+            try:
+                handler, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            # Повторная постановка переносит обработчик в конец порядка вызова
+            pending.pop(handler, None)
+            pending[handler] = args
+
+        for handler, args in pending.items():
+            self.dispatched += 1
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"Ошибка в обработчике {handler}: {e}")
+
+        self.after_id = self.root.after(self.interval, self._drain)
@@ -40,4 +40,38 @@ VALVE = 32                          # Клапан
 FREQ_MANUAL_MIN_MAX = [25, 100]
 PRESSURE_END_MIN_MAX = [0, 38]
 TIME_WAIT_MIN_MAX = [0, 999]
-PRESSURE_SPEED_MIN_MAX = [0, 5]
\ No newline at end of file
+PRESSURE_SPEED_MIN_MAX = [0, 5]
+
+
+# ОПИСАНИЕ РЕГИСТРОВ (utils.RegisterMap): имя, адрес, тип, ограничения ввода, единица
+
+U16 = "u16"     # один регистр, целое без знака
+F32 = "f32"     # float32 в двух регистрах, младшее слово по меньшему адресу (ПР200)
+
+REGISTER_FIELDS = [
+    ("CURRENT_FRAME_REG", CURRENT_FRAME_REG, U16, None, ""),
+    ("START_AUTOMAT_N3_MANUAL_REG", START_AUTOMAT_N3_MANUAL_REG, U16, None, ""),
+    ("START_MODE_MANUAL_REG", START_MODE_MANUAL_REG, U16, None, ""),
+    ("START_AUTOMAT_N3_STAT_REG", START_AUTOMAT_N3_STAT_REG, U16, None, ""),
+    ("START_MODE_STAT_REG", START_MODE_STAT_REG, U16, None, ""),
+    ("START_AUTOMAT_N3_CYCLE_REG", START_AUTOMAT_N3_CYCLE_REG, U16, None, ""),
+    ("START_MODE_CYCLE_REG", START_MODE_CYCLE_REG, U16, None, ""),
+    ("PRESSURE_MN1", PRESSURE_MN1, F32, None, "МПа"),
+    ("PRESSURE_MN2", PRESSURE_MN2, F32, None, "МПа"),
+    ("SPEED", SPEED, F32, None, "МПа/с"),
+    ("FREQ_MANUAL", FREQ_MANUAL, U16, FREQ_MANUAL_MIN_MAX, "%"),
+    ("PRESSURE_END_STAT", PRESSURE_END_STAT, F32, PRESSURE_END_MIN_MAX, "МПа"),
+    ("PRESSURE_MID_STAT", PRESSURE_MID_STAT, F32, PRESSURE_END_MIN_MAX, "МПа"),
+    ("PRESSURE_SPEED_STAT", PRESSURE_SPEED_STAT, F32, PRESSURE_SPEED_MIN_MAX, "МПа/с"),
+    ("TIME_WAIT_1_STAT", TIME_WAIT_1_STAT, U16, TIME_WAIT_MIN_MAX, "с"),
+    ("TIME_WAIT_2_STAT", TIME_WAIT_2_STAT, U16, TIME_WAIT_MIN_MAX, "с"),
+    ("PRESSURE_END_CYCLE", PRESSURE_END_CYCLE, F32, PRESSURE_END_MIN_MAX, "МПа"),
+    ("PRESSURE_SPEED_CYCLE", PRESSURE_SPEED_CYCLE, F32, PRESSURE_SPEED_MIN_MAX, "МПа/с"),
+    ("TIME_PAUSE_CYCLE", TIME_PAUSE_CYCLE, U16, TIME_WAIT_MIN_MAX, "с"),
+    ("NUMBER_OF_CYCLES", NUMBER_OF_CYCLES, U16, None, ""),
+    ("DROP_NUMBER_OF_CYCLES", DROP_NUMBER_OF_CYCLES, U16, None, ""),
+    ("WARNING_SCREENS", WARNING_SCREENS, U16, None, ""),
+    ("WARNING_BUTTON_BLOCK", WARNING_BUTTON_BLOCK, U16, None, ""),
+    ("WORK", WORK, U16, None, ""),
+    ("CYCLES_NEED_CYCLE", CYCLES_NEED_CYCLE, U16, TIME_WAIT_MIN_MAX, ""),
+]